@@ -0,0 +1,16 @@
+"""
+Benchmarks do Efeso. Cada módulo pode ser executado isoladamente, ex.:
+
+    python -m benchmarks.cpf --n 1000000
+
+A suíte dos caminhos quentes (benchmarks.suite) roda pelo comando, com
+linha de base em JSON:
+
+    python manage.py benchmark --size 10000 --size 100000 -o base.json
+    python manage.py benchmark --size 10000 --size 100000 --baseline base.json
+
+Carga ponta a ponta (usuários simultâneos contra o gunicorn), com
+latências p50/p95/p99 por endpoint:
+
+    python -m benchmarks.load --spawn --mode wsgi --workers 4 --users 50 -o wsgi-4.json
+"""
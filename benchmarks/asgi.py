@@ -0,0 +1,118 @@
+"""
+Throughput e latência (p50/p99) do mesmo conjunto de endpoints servido pelo
+gunicorn em modo WSGI (gthread) e ASGI (uvicorn), com N conexões simultâneas.
+
+Cria um SQLite temporário (migrate + pacientes), sobe um servidor por modo
+com a mesma quantidade de workers e dispara requests com keep-alive:
+
+    python -m benchmarks.asgi --connections 200 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.httpclient import ERRORS, ROOT, HttpClient, gunicorn, summarize
+from benchmarks.load import login
+
+USERNAME = PASSWORD = "benchmark"
+PATHS = [
+    "/",
+    "/pacientes/",
+    "/pacientes/busca/?" + urlencode({"q": "paciente 0042"}),
+    "/pacientes/lookup/?" + urlencode({"contato": "(11) 90000-0042"}),
+]
+
+
+def _env(db_path, **extra):
+    return {
+        **os.environ,
+        "DJANGO_SECRET_KEY": os.environ.get("DJANGO_SECRET_KEY", "benchmark"),
+        "USE_SQLITE": "1",
+        "SQLITE_NAME": str(db_path),
+        "DJANGO_ALLOWED_HOSTS": "127.0.0.1,localhost",
+        "GUNICORN_ACCESSLOG": "",
+        **extra,
+    }
+
+
+def prepare_db(db_path, n):
+    env = _env(db_path)
+    subprocess.run([sys.executable, "manage.py", "migrate", "-v0"], cwd=ROOT, env=env, check=True)
+    script = (
+        "from core.models import Clinic\n"
+        "from benchmarks.projections import populate\n"
+        "clinic = Clinic.objects.create(name='Default', slug='default')\n"
+        "from django.contrib.auth import get_user_model\n"
+        f"user = get_user_model().objects.create_user({USERNAME!r}, password={PASSWORD!r}, is_staff=True)\n"
+        "user.clinics.add(clinic)\n"
+        f"populate(clinic, {n})\n"
+    )
+    subprocess.run([sys.executable, "manage.py", "shell", "-c", script], cwd=ROOT, env=env, check=True)
+
+
+async def _client(url, deadline, latencies, errors):
+    client = HttpClient(url)
+    # As páginas de pacientes são só para a equipe
+    await login(client, USERNAME, PASSWORD)
+    while time.perf_counter() < deadline:
+        path = random.choice(PATHS)
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+        except ERRORS:
+            errors.append(path)
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status != 200:
+            errors.append(path)
+    client.close()
+
+
+async def load(port, connections, duration):
+    latencies, errors = [], []
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(_client(url, deadline, latencies, errors) for _ in range(connections)))
+    return summarize(latencies, len(errors), duration)
+
+
+def run_mode(mode, db_path, port, args):
+    env = _env(
+        db_path, SERVER_MODE=mode,
+        GUNICORN_WORKERS=str(args.workers), GUNICORN_THREADS=str(args.threads),
+    )
+    with gunicorn(port, env):
+        asyncio.run(load(port, args.connections, 2))  # aquecimento
+        return asyncio.run(load(port, args.connections, args.duration))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="Threads per WSGI (gthread) worker.")
+    parser.add_argument("--patients", type=int, default=20_000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite3"
+        prepare_db(db_path, args.patients)
+        results = {mode: run_mode(mode, db_path, args.port + i, args) for i, mode in enumerate(("wsgi", "asgi"))}
+
+    print(f"{args.connections} connections, {args.duration:.0f}s, {args.workers} workers")
+    for mode, r in results.items():
+        print(f"{mode:<5} {r['rps']:8.1f} req/s  p50 {r['p50_ms']:8.1f} ms  p99 {r['p99_ms']:8.1f} ms  "
+              f"requests={r['requests']} errors={r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
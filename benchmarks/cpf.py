@@ -0,0 +1,86 @@
+"""
+Compara a validação de CPF antiga (re.sub + validate_docbr.CPF() por chamada)
+com validate_cpf() e a API em lote validate_cpfs().
+
+    python -m benchmarks.cpf --n 1000000
+"""
+import argparse
+import random
+import re
+import time
+
+from django.core.exceptions import ValidationError
+from validate_docbr import CPF
+
+from patients.validators import np, validate_cpf, validate_cpfs
+
+
+def make_inputs(n, seed=0):
+    """Mistura CPFs válidos/inválidos, com e sem máscara."""
+    rng = random.Random(seed)
+    generator = CPF()
+    pool = [generator.generate(mask=i % 2 == 0) for i in range(1000)]
+    values = []
+    for _ in range(n):
+        cpf = rng.choice(pool)
+        if rng.random() < 0.2:
+            cpf = cpf[:-1] + str((int(cpf[-1]) + 1) % 10)
+        values.append(cpf)
+    return values
+
+
+def legacy_validate(value):
+    """Implementação anterior a validate_cpfs(), mantida como referência."""
+    cpf_digits = re.sub(r"\D", "", value)
+    if cpf_digits == "":
+        return
+    if len(cpf_digits) != 11:
+        raise ValidationError("CPF deve ter 11 dígitos.")
+    if not CPF().validate(cpf_digits):
+        raise ValidationError("CPF inválido.")
+
+
+def _loop(func, values):
+    rejected = 0
+    for value in values:
+        try:
+            func(value)
+        except ValidationError:
+            rejected += 1
+    return rejected
+
+
+def run(n):
+    values = make_inputs(n)
+    cases = [
+        ("legacy (re.sub + CPF())", lambda: _loop(legacy_validate, values)),
+        ("validate_cpf loop", lambda: _loop(validate_cpf, values)),
+        ("validate_cpfs", lambda: sum(e is not None for e in validate_cpfs(values, vectorized=False))),
+    ]
+    if np is not None:
+        cases.append(
+            ("validate_cpfs (numpy)", lambda: sum(e is not None for e in validate_cpfs(values, vectorized=True)))
+        )
+
+    results = []
+    for name, func in cases:
+        started = time.perf_counter()
+        rejected = func()
+        results.append({"name": name, "seconds": time.perf_counter() - started, "rejected": rejected})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    results = run(args.n)
+    baseline = results[0]["seconds"]
+    for r in results:
+        print(f"{r['name']:<28} {r['seconds']:8.3f}s  {args.n / r['seconds']:>12,.0f}/s  "
+              f"x{baseline / r['seconds']:5.1f}  rejected={r['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Detecção de duplicatas (patients.duplicates): tempo por clínica e quantas
+das duplicatas plantadas foram achadas. Os pacientes têm nomes, telefones e
+nascimentos aleatórios; uma fração recebe uma cópia com erro de digitação no
+nome e, às vezes, sem CPF ou com outro telefone.
+
+    DJANGO_SECRET_KEY=x USE_SQLITE=1 python -m benchmarks.duplicates --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.projections import _setup
+
+FIRST = ["Ana", "Maria", "João", "José", "Carla", "Pedro", "Lucas", "Julia", "Marcos", "Paula",
+         "Rafael", "Beatriz", "Gabriel", "Larissa", "Felipe", "Camila", "Bruno", "Fernanda", "Tiago", "Renata"]
+LAST = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Ferreira", "Rodrigues",
+        "Almeida", "Costa", "Gomes", "Martins", "Araújo", "Barbosa", "Ribeiro", "Alves", "Cardoso", "Rocha", "Dias"]
+
+
+def _typo(name, rng):
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def populate(clinic, n, duplicate_rate=0.05, seed=1):
+    """Cria `n` pacientes (mais as cópias) e devolve os pares plantados (índices)."""
+    from core.bulk import bulk_insert
+    from patients.models import Patient
+
+    rng = random.Random(seed)
+    patients, planted = [], []
+    for i in range(n):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)}"
+        birth = date(1940, 1, 1) + timedelta(days=rng.randrange(30000))
+        phone = f"11 9{rng.randrange(10**8):08d}"
+        patients.append(dict(full_name=name, cpf=f"{i:011d}", whatsapp_phone=phone, birth_date=birth))
+        if rng.random() < duplicate_rate:
+            copy = dict(patients[-1], full_name=_typo(name, rng))
+            # Sem CPF ou com o CPF mascarado (cadastro legado)
+            cpf = copy["cpf"]
+            copy["cpf"] = "" if rng.random() < 0.5 else f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+            if rng.random() < 0.5:
+                copy["whatsapp_phone"] = f"11 9{rng.randrange(10**8):08d}"
+            planted.append((len(patients) - 1, len(patients)))
+            patients.append(copy)
+    objs = [Patient(clinic=clinic, **p) for p in patients]
+    bulk_insert(Patient, objs, batch_size=5000)
+    ids = list(Patient.objects.filter(clinic=clinic).order_by("pk").values_list("pk", flat=True))
+    return {(ids[a], ids[b]) for a, b in planted}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    _setup()
+    from django.db import connection
+
+    from core.models import Clinic
+    from patients.duplicates import find_duplicates
+    from patients.models import DuplicateCandidate
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        for n in args.sizes:
+            clinic = Clinic.objects.create(name=f"Benchmark {n}", slug=f"benchmark-{n}")
+            planted = populate(clinic, n)
+            started = time.perf_counter()
+            stats = find_duplicates(clinic, workers=args.workers)
+            seconds = time.perf_counter() - started
+            found = set(DuplicateCandidate.objects.filter(clinic=clinic).values_list("patient_a_id", "patient_b_id"))
+            total = clinic.patients.count()
+            print(
+                f"{total:>9} patients  {seconds:6.1f}s  {total / seconds:8.0f} patients/s  "
+                f"{stats['pairs']:>6} pairs  recall {len(found & planted) / len(planted):.1%}  "
+                f"precision {len(found & planted) / max(len(found), 1):.1%}"
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
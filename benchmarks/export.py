@@ -0,0 +1,87 @@
+"""
+Exportação de pacientes (patients.export): linhas/s e pico de memória em
+CSV e XLSX para clínicas de tamanhos diferentes. A memória deve ficar igual
+entre os tamanhos; para comparação, o caminho ingênuo (lista de instâncias
+do modelo + csv) cresce com a clínica.
+
+    DJANGO_SECRET_KEY=x USE_SQLITE=1 python -m benchmarks.export --sizes 10000 100000
+"""
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+
+from benchmarks.projections import _setup, populate
+
+
+def _drain(chunks):
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+def _naive(clinic, fields):
+    from patients.models import Patient
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for patient in list(Patient.objects.filter(clinic=clinic).order_by("pk")):
+        writer.writerow([getattr(patient, f) for f in fields])
+    return len(buffer.getvalue())
+
+
+def _measure(func):
+    started = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def run(clinic, n):
+    from patients.export import DEFAULT_FIELDS, export_chunks
+
+    cases = [
+        ("csv (stream)", lambda: _drain(export_chunks(clinic, "csv"))),
+        ("xlsx (stream)", lambda: _drain(export_chunks(clinic, "xlsx"))),
+        ("csv (list of models)", lambda: _naive(clinic, DEFAULT_FIELDS)),
+    ]
+    results = []
+    for name, func in cases:
+        seconds, peak = _measure(func)
+        results.append({"patients": n, "name": name, "rows_per_s": n / seconds, "peak_mb": peak / 2**20})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args(argv)
+
+    _setup()
+    from django.db import connection
+
+    from core.models import Clinic
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    results = []
+    try:
+        for n in args.sizes:
+            clinic = Clinic.objects.create(name=f"Benchmark {n}", slug=f"benchmark-{n}")
+            populate(clinic, n)
+            results += run(clinic, n)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    for r in results:
+        print(f"{r['patients']:>9} patients  {r['name']:<22} {r['rows_per_s']:9.0f} rows/s  peak {r['peak_mb']:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Cliente HTTP/1.1 assíncrono mínimo para os testes de carga (benchmarks.asgi,
+benchmarks.load): uma conexão keep-alive por cliente, cookies (sessão e
+CSRF do Django), corpo com Content-Length ou chunked. Só asyncio, sem
+dependências: o gerador de carga gasta pouca CPU por request e não atrapalha
+o servidor medido quando rodam na mesma máquina.
+
+Também tem os utilitários comuns: percentis das latências e subir o
+gunicorn com a configuração do projeto (gunicorn.conf.py).
+"""
+import asyncio
+import gzip
+import math
+import os
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+# Erros de rede/protocolo: a conexão é descartada e o request conta como erro
+ERRORS = (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, IndexError)
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        body = self.body
+        if self.headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body.decode("utf-8", "replace")
+
+
+class HttpClient:
+    """Uma conexão keep-alive com `base_url`, reaberta quando o servidor fecha."""
+
+    def __init__(self, base_url, *, timeout=30, headers=None):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError(f"Só http:// é suportado: {base_url}")
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Host": url.netloc, "Accept-Encoding": "gzip", **(headers or {})}
+        self.cookies = {}
+        self._reader = self._writer = None
+
+    async def request(self, method, path, *, body=b"", headers=None) -> Response:
+        try:
+            return await asyncio.wait_for(self._request(method, path, body, headers or {}), self.timeout)
+        except ERRORS:
+            self.close()
+            raise
+
+    async def get(self, path, params=None, **kwargs) -> Response:
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, data, **kwargs) -> Response:
+        headers = {"Content-Type": "application/x-www-form-urlencoded", **kwargs.pop("headers", {})}
+        return await self.request("POST", path, body=urlencode(data).encode(), headers=headers, **kwargs)
+
+    async def _request(self, method, path, body, headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {self.prefix}{path} HTTP/1.1"]
+        lines += [f"{name}: {value}" for name, value in {**self.headers, **headers}.items()]
+        if self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if body or method == "POST":
+            lines.append(f"Content-Length: {len(body)}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        response_headers = {}
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                cookie, _, _ = value.partition(";")
+                key, _, val = cookie.partition("=")
+                self.cookies[key.strip()] = val.strip()
+            else:
+                response_headers[name] = value
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            data = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked()
+        elif "content-length" in response_headers:
+            data = await self._reader.readexactly(int(response_headers["content-length"]))
+        else:  # sem tamanho: o corpo vai até o servidor fechar
+            data = await self._reader.read()
+            response_headers["connection"] = "close"
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return Response(status, response_headers, data)
+
+    async def _read_chunked(self) -> bytes:
+        parts = []
+        while True:
+            size = int((await self._reader.readline()).split(b";")[0], 16)
+            if not size:
+                while await self._reader.readline() not in (b"\r\n", b""):  # trailers
+                    pass
+                return b"".join(parts)
+            parts.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def percentile(values, q) -> float:
+    """Percentil `q` (0-100) por posição, de uma lista já ordenada."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def summarize(latencies, errors, duration) -> dict:
+    """Throughput e latências (ms) de uma lista de durações em segundos."""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration if duration else 0.0,
+        "mean_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+        **{f"p{q}_ms": 1000 * percentile(latencies, q) for q in (50, 95, 99)},
+        "max_ms": 1000 * latencies[-1] if latencies else 0.0,
+    }
+
+
+def wait_for_port(port, host="127.0.0.1", timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(asyncio.wait_for(asyncio.open_connection(host, port), 1))
+            return
+        except (OSError, asyncio.TimeoutError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+@contextmanager
+def gunicorn(port, env=None):
+    """gunicorn com o gunicorn.conf.py do projeto (como o CMD do Dockerfile) em 127.0.0.1:`port`."""
+    env = {**os.environ, **(env or {}), "GUNICORN_BIND": f"127.0.0.1:{port}"}
+    server = subprocess.Popen(["gunicorn", "-c", "gunicorn.conf.py"], cwd=ROOT, env=env)
+    try:
+        wait_for_port(port)
+        yield server
+    finally:
+        server.terminate()
+        server.wait()
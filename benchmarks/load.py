@@ -0,0 +1,277 @@
+"""
+Teste de carga ponta a ponta: usuários simultâneos contra o servidor de
+verdade (gunicorn + Django + banco), não contra funções isoladas.
+
+Cada usuário virtual faz login no admin e repete, até o fim do tempo, um
+sorteio ponderado entre a home, o changelist de pacientes no admin, a busca
+por nome e o cadastro de paciente pelo admin (POST). Sai throughput e
+latências p50/p95/p99 por endpoint, gravadas em JSON para comparar
+configurações (classe e quantidade de workers):
+
+    # contra um servidor no ar (ex.: o container do Dockerfile)
+    python -m benchmarks.load --url http://127.0.0.1:8000 --users 50 --duration 60 -o gthread-4.json
+
+    # sobe o gunicorn local com o gunicorn.conf.py, no banco do ambiente atual
+    python -m benchmarks.load --spawn --mode asgi --workers 4 --users 50 -o asgi-4.json
+
+    python -m benchmarks.load --compare gthread-4.json asgi-4.json
+
+Credenciais: --username/--password ou DJANGO_SUPERUSER_USERNAME e
+DJANGO_SUPERUSER_PASSWORD (as do create_initial_tenant). O cadastro cria
+pacientes "Carga ..." na clínica: rode numa base de teste (ver seed_data).
+O gerador é um processo só; com muitos workers, rode-o em outra máquina
+para não disputar CPU com o servidor medido.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.httpclient import ERRORS, HttpClient, gunicorn, summarize
+from patients.validators import cpf_from_number
+
+# Peso de cada endpoint no sorteio (sobrescreva com --mix home=3,create=0)
+MIX = {"home": 3, "changelist": 2, "search": 3, "create": 1}
+# Nomes e sobrenomes frequentes (os mesmos do seed_data)
+SEARCH_TERMS = ["maria", "ana silva", "jose", "joao santos", "oliveira", "souza", "pereira lima",
+                "francisca", "carlos", "gabriel", "rodrigues", "ferreira", "juliana", "lucas alves"]
+_CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class Scenario:
+    """Endpoints de um usuário: cada um devolve o status recebido e o esperado."""
+
+    def __init__(self, client, clinic, rng):
+        self.client = client
+        self.clinic = clinic
+        self.rng = rng
+        # Páginas da UI: a clínica vem do prefixo /c/<slug>/ (core.tenancy)
+        self.ui = f"/c/{clinic['slug']}" if clinic["slug"] else ""
+
+    async def home(self):
+        return (await self.client.get(f"{self.ui}/")).status, 200
+
+    async def changelist(self):
+        response = await self.client.get("/admin/patients/patient/", {"clinic__id__exact": self.clinic["id"]})
+        return response.status, 200
+
+    async def search(self):
+        response = await self.client.get(f"{self.ui}/pacientes/busca/", {"q": self.rng.choice(SEARCH_TERMS)})
+        return response.status, 200
+
+    async def create(self):
+        # Fora do rng semeado: outra rodada não pode repetir os CPFs já cadastrados
+        n = random.randrange(10**8)
+        response = await self.client.post("/admin/patients/patient/add/", {
+            "csrfmiddlewaretoken": self.client.cookies.get("csrftoken", ""),
+            "clinic": self.clinic["id"],
+            "full_name": f"Carga {self.rng.choice(SEARCH_TERMS).title()} {n}",
+            # Base alta: não colide com os CPFs de teste mais comuns
+            "cpf": cpf_from_number(900_000_000 + n % 99_999_999),
+            "whatsapp_phone": f"(11) 9{n % 10**8:08d}",
+            "gender": self.rng.choice(("female", "male")),
+            "insurance_name": "Particular",
+            "_save": "Salvar",
+        })
+        # Sucesso redireciona; 200 é o formulário de volta com erros
+        return response.status, 302
+
+
+async def login(client, username, password):
+    response = await client.get("/admin/login/")
+    match = _CSRF_INPUT.search(response.text)
+    response = await client.post("/admin/login/", {
+        "csrfmiddlewaretoken": match.group(1) if match else client.cookies.get("csrftoken", ""),
+        "username": username,
+        "password": password,
+        "next": "/admin/",
+    })
+    if response.status != 302:
+        raise RuntimeError(f"login as {username!r} failed (HTTP {response.status})")
+
+
+async def resolve_clinics(url, args) -> list:
+    """[{"slug", "id"}]: o id (para o admin) vem do autocomplete de clínicas."""
+    client = HttpClient(url)
+    try:
+        await login(client, args.username, args.password)
+        clinics = []
+        for slug in args.clinic or [""]:
+            response = await client.get("/admin/autocomplete/", {
+                "app_label": "patients", "model_name": "patient", "field_name": "clinic", "term": slug,
+            })
+            results = json.loads(response.text).get("results", []) if response.status == 200 else []
+            if not results:
+                raise RuntimeError(f"clinic {slug or '(default)'!r} not found")
+            clinics.append({"slug": slug, "id": results[0]["id"]})
+        return clinics
+    finally:
+        client.close()
+
+
+async def _user(number, url, clinic, args, mix, started, samples, errors, statuses):
+    rng = random.Random(f"{args.seed}:{number}")
+    # Entrada escalonada ao longo do --ramp-up
+    await asyncio.sleep(args.ramp_up * number / args.users)
+    client = HttpClient(url, timeout=args.timeout)
+    scenario = Scenario(client, clinic, rng)
+    names, weights = list(mix), list(mix.values())
+    deadline = started + args.warmup + args.duration
+    try:
+        await login(client, args.username, args.password)
+    except (RuntimeError, *ERRORS):
+        errors["login"] += 1
+        return
+    while (now := time.perf_counter()) < deadline:
+        name = rng.choices(names, weights)[0]
+        try:
+            status, expected = await getattr(scenario, name)()
+        except ERRORS as exc:
+            status, expected = type(exc).__name__, None
+        elapsed = time.perf_counter() - now
+        if now >= started + args.warmup:  # o aquecimento não entra na conta
+            samples[name].append(elapsed)
+            if status != expected:
+                errors[name] += 1
+                statuses[name][str(status)] += 1
+        if args.think:
+            await asyncio.sleep(rng.expovariate(1 / args.think))
+    client.close()
+
+
+async def load(url, args) -> dict:
+    mix = {name: weight for name, weight in parse_mix(args.mix).items() if weight > 0}
+    clinics = await resolve_clinics(url, args)
+    samples, errors = defaultdict(list), defaultdict(int)
+    # Status (ou exceção) das falhas, por endpoint
+    statuses = defaultdict(lambda: defaultdict(int))
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _user(i, url, clinics[i % len(clinics)], args, mix, started, samples, errors, statuses)
+        for i in range(args.users)
+    ))
+    return {
+        "endpoints": {name: summarize(samples[name], errors[name], args.duration) for name in mix},
+        "total": summarize(
+            [s for values in samples.values() for s in values], sum(errors.values()), args.duration,
+        ),
+        "failures": {name: dict(counts) for name, counts in statuses.items()},
+        "login_errors": errors["login"],
+    }
+
+
+def parse_mix(text) -> dict:
+    mix = dict(MIX)
+    for item in filter(None, (text or "").split(",")):
+        name, _, weight = item.partition("=")
+        if name not in MIX:
+            raise SystemExit(f"unknown endpoint in --mix: {name} (choose from {', '.join(MIX)})")
+        mix[name] = float(weight)
+    return mix
+
+
+def report(result, out=sys.stdout):
+    meta = result["meta"]
+    out.write(f"{meta['label']}: {meta['users']} users, {meta['duration']:.0f}s\n")
+    for name, stats in [*result["endpoints"].items(), ("total", result["total"])]:
+        out.write(
+            f"  {name:<11} {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.1f}  p95 {stats['p95_ms']:7.1f}  "
+            f"p99 {stats['p99_ms']:7.1f} ms  requests={stats['requests']} errors={stats['errors']}\n"
+        )
+    for name, counts in result.get("failures", {}).items():
+        out.write(f"  {name} failures: {', '.join(f'{k} x{v}' for k, v in sorted(counts.items()))}\n")
+    if result.get("login_errors"):
+        out.write(f"  {result['login_errors']} users could not log in\n")
+
+
+def compare(paths, out=sys.stdout):
+    """Uma linha por (endpoint, arquivo): mesmas métricas lado a lado."""
+    results = []
+    for path in paths:
+        with open(path) as f:
+            results.append(json.load(f))
+    names = list(dict.fromkeys(name for r in results for name in r["endpoints"])) + ["total"]
+    width = max(len(r["meta"]["label"]) for r in results)
+    for name in names:
+        out.write(f"{name}\n")
+        for r in results:
+            stats = r["total"] if name == "total" else r["endpoints"].get(name)
+            if stats is None:
+                continue
+            out.write(
+                f"  {r['meta']['label']:<{width}} {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.1f}  "
+                f"p95 {stats['p95_ms']:7.1f}  p99 {stats['p99_ms']:7.1f} ms  errors={stats['errors']}\n"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server to test (ignored with --spawn).")
+    parser.add_argument("--spawn", action="store_true", help="Start gunicorn locally with gunicorn.conf.py.")
+    parser.add_argument("--mode", choices=("wsgi", "asgi"), default="wsgi", help="SERVER_MODE with --spawn.")
+    parser.add_argument("--workers", type=int, default=2, help="GUNICORN_WORKERS with --spawn.")
+    parser.add_argument("--threads", type=int, default=4, help="GUNICORN_THREADS (gthread) with --spawn.")
+    parser.add_argument("--port", type=int, default=8766, help="Port for --spawn.")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds before measuring (not counted).")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Spread user start over this many seconds.")
+    parser.add_argument("--think", type=float, default=0, help="Mean pause between a user's requests (s).")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout (s).")
+    parser.add_argument("--mix", help="Endpoint weights, e.g. home=3,changelist=2,search=3,create=1.")
+    parser.add_argument("--clinic", action="append", help="Clinic slug; users are spread over them. Repeatable.")
+    parser.add_argument("--username", default=os.environ.get("DJANGO_SUPERUSER_USERNAME", "admin"))
+    parser.add_argument("--password", default=os.environ.get("DJANGO_SUPERUSER_PASSWORD"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", help="Name of this run in the results (default: server config).")
+    parser.add_argument("--output", "-o", help="Write the results JSON here.")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS", help="Compare saved results and exit.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(args.compare)
+        return
+    if not args.password:
+        parser.error("--password (or DJANGO_SUPERUSER_PASSWORD) is required")
+    if args.users < 1 or args.duration <= 0:
+        parser.error("--users and --duration must be positive")
+
+    server = {"url": args.url}
+    if args.spawn:
+        server = {"url": f"http://127.0.0.1:{args.port}", "mode": args.mode,
+                  "workers": args.workers, "threads": args.threads if args.mode == "wsgi" else None}
+        env = {"SERVER_MODE": args.mode, "GUNICORN_WORKERS": str(args.workers),
+               "GUNICORN_THREADS": str(args.threads), "GUNICORN_ACCESSLOG": ""}
+        with gunicorn(args.port, env):
+            result = asyncio.run(load(server["url"], args))
+    else:
+        result = asyncio.run(load(args.url, args))
+
+    default_label = f"{args.mode} {args.workers}w" if args.spawn else args.url
+    result["meta"] = {
+        "label": args.label or default_label,
+        "server": server,
+        "users": args.users,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "think": args.think,
+        "mix": parse_mix(args.mix),
+        "clinics": args.clinic or [],
+        "python": platform.python_version(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Custo do MetricsMiddleware (core.metrics): requests/s na listagem de
+pacientes pelo handler WSGI completo, com e sem o middleware, alternando
+rodadas para o ruído afetar os dois lados igual. Com METRICS_DIR, inclui a
+gravação do snapshot em disco.
+
+    DJANGO_SECRET_KEY=x USE_SQLITE=1 python -m benchmarks.metrics --requests 2000
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from benchmarks.projections import _setup, populate
+
+
+def _rate(client, path, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        client.get(path)
+    return n / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--patients", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    _setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.contrib.auth import get_user_model
+    from django.test import Client, override_settings
+
+    from core.models import Clinic
+
+    with_metrics = list(settings.MIDDLEWARE)
+    without = [m for m in with_metrics if m != "core.metrics.MetricsMiddleware"]
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    rates = {"without": [], "with": []}
+    try:
+        clinic = Clinic.objects.create(name="Default", slug=settings.TENANT_DEFAULT_SLUG)
+        populate(clinic, args.patients)
+        # A listagem é só para a equipe da clínica
+        staff = get_user_model().objects.create_user("benchmark", is_staff=True)
+        staff.clinics.add(clinic)
+        with override_settings(ALLOWED_HOSTS=["*"], METRICS_DIR=tempfile.mkdtemp()):
+            cases = [("without", without), ("with", with_metrics)]
+            for _ in range(args.rounds):
+                cases.reverse()
+                for name, middleware in cases:
+                    with override_settings(MIDDLEWARE=middleware):
+                        client = Client()
+                        client.force_login(staff)
+                        client.get("/pacientes/")  # aquece
+                        rates[name].append(_rate(client, "/pacientes/", args.requests // args.rounds))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    base, measured = statistics.median(rates["without"]), statistics.median(rates["with"])
+    print(f"without middleware {base:8.0f} req/s")
+    print(f"with middleware    {measured:8.0f} req/s   overhead {100 * (base - measured) / base:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
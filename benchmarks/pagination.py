@@ -0,0 +1,73 @@
+"""
+Latência da listagem de pacientes por profundidade de página: OFFSET (como o
+changelist do admin) vs. keyset (core.pagination, usado em ui.patient_list).
+
+    DJANGO_SECRET_KEY=x USE_SQLITE=1 python -m benchmarks.pagination --n 500000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.projections import _setup, populate
+
+
+def _time(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def run(clinic, pages, per_page, repeat):
+    from core.pagination import FORWARD, KeysetPaginator, encode_cursor
+    from patients.models import Patient
+
+    qs = Patient.objects.for_clinic(clinic).list_rows()
+    paginator = KeysetPaginator(qs, "full_name", per_page)
+    ordered = qs.order_by("full_name", "id")
+    results = []
+    for number in pages:
+        offset = (number - 1) * per_page
+        cursor = None
+        if offset:
+            last = ordered[offset - 1]  # fora da medição: só para montar o cursor
+            cursor = encode_cursor(FORWARD, last.full_name, last.id)
+        results.append({
+            "page": number,
+            "offset_ms": 1000 * _time(lambda: list(ordered[offset:offset + per_page]), repeat),
+            "keyset_ms": 1000 * _time(lambda: paginator.page(cursor), repeat),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=500_000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    _setup()
+    from django.db import connection
+
+    from core.models import Clinic
+
+    last_page = args.n // args.per_page
+    pages = sorted({p for p in (1, 10, 100, 1000, 10_000, last_page) if p <= last_page})
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        clinic = Clinic.objects.create(name="Benchmark", slug="benchmark")
+        populate(clinic, args.n)
+        results = run(clinic, pages, args.per_page, args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    for r in results:
+        print(f"page {r['page']:>6}  OFFSET {r['offset_ms']:8.2f} ms   keyset {r['keyset_ms']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Mede tempo e memória de percorrer os pacientes de uma clínica como instâncias
+completas do modelo vs. as projeções nomeadas de PatientQuerySet.
+
+Cria um banco de teste (o do settings atual, com prefixo test_), popula e apaga:
+
+    DJANGO_SECRET_KEY=x USE_SQLITE=1 python -m benchmarks.projections --n 100000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+
+def _setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "efeso.settings")
+    import django
+
+    django.setup()
+
+
+def populate(clinic, n):
+    from core.bulk import bulk_insert
+    from patients.models import Patient
+
+    notes = "Observação clínica longa. " * 20
+    patients = (
+        Patient(
+            clinic=clinic,
+            full_name=f"Paciente {i:06d}",
+            cpf=f"{i:011d}",
+            whatsapp_phone=f"11 9{i:08d}",
+            email=f"paciente{i}@example.com",
+            notes=notes,
+        )
+        for i in range(n)
+    )
+    bulk_insert(Patient, patients, batch_size=5000)
+
+
+def _measure(func):
+    # Tempo e memória em execuções separadas: tracemalloc deixa tudo várias vezes mais lento.
+    started = time.perf_counter()
+    rows = func()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, rows
+
+
+def run(clinic):
+    from patients.models import Patient
+
+    qs = Patient.objects.for_clinic(clinic).order_by("pk")
+    cases = [
+        ("model instances (list)", lambda: len(list(qs.all()))),
+        ("model instances (iterator)", lambda: sum(1 for _ in qs.iterator(chunk_size=2000))),
+        ("summary (list)", lambda: len(list(qs.summary()))),
+        ("list_rows (list)", lambda: len(list(qs.list_rows()))),
+        ("summary (iterator)", lambda: sum(1 for _ in qs.summary().iterator(chunk_size=2000))),
+    ]
+    results = []
+    for name, func in cases:
+        seconds, peak, rows = _measure(func)
+        results.append({"name": name, "seconds": seconds, "peak_mb": peak / 2**20, "rows": rows})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    _setup()
+    from django.db import connection
+
+    from core.models import Clinic
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        clinic = Clinic.objects.create(name="Benchmark", slug="benchmark")
+        populate(clinic, args.n)
+        results = run(clinic)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    for r in results:
+        print(f"{r['name']:<28} {r['seconds']:7.3f}s  peak {r['peak_mb']:8.1f} MiB  rows={r['rows']}")
+
+
+if __name__ == "__main__":
+    main()
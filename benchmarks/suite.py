@@ -0,0 +1,349 @@
+"""
+Suíte de micro-benchmarks dos caminhos quentes de pacientes: validação de
+CPF, criação (unitária e em lote), colisão de CPF, buscas filtradas por
+clínica e o changelist do admin. Rodada pelo comando `manage.py benchmark`,
+que cria um banco de teste, popula com `size` pacientes e compara com uma
+linha de base em JSON.
+
+Cada caso repete uma operação `ops` vezes por rodada; o resultado é a
+mediana das rodadas, em µs por operação. As rodadas rodam numa transação
+desfeita no fim (o banco populado não muda entre casos), então o custo do
+COMMIT não entra. Números só são comparáveis na mesma máquina, no mesmo
+banco (SQLite/PostgreSQL) e com o mesmo tamanho.
+
+Alguns casos têm uma meta de latência por operação (`target_ms`, ex.: a
+busca por nome em menos de 50 ms com 1M de pacientes no PostgreSQL);
+missed_targets() lista os que passaram dela.
+"""
+import itertools
+import platform
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+import django
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, override_settings
+
+from benchmarks.duplicates import FIRST, LAST
+
+CLINICS = 10
+SEED_BATCH = 10_000
+CASES = {}
+
+
+def case(name, ops, target_ms=None):
+    """Registra `func(ctx) -> callable`: o callable faz `ops` operações."""
+    def register(func):
+        CASES[name] = (func, ops, target_ms)
+        return func
+    return register
+
+
+def _name(n):
+    return f"{FIRST[n % len(FIRST)]} {LAST[n // len(FIRST) % len(LAST)]} {LAST[n * 7 % len(LAST)]} {n}"
+
+
+def _phone(n):
+    return f"11 9{n:08d}"
+
+
+def seed(size):
+    """`size` pacientes espalhados por CLINICS clínicas; devolve as clínicas."""
+    from core.bulk import bulk_insert
+    from core.models import Clinic
+    from core.testing import analyze
+    from patients.models import Patient
+    from patients.validators import cpf_from_number
+
+    clinics = Clinic.objects.bulk_create(Clinic(name=f"Benchmark {i}", slug=f"benchmark-{i}") for i in range(CLINICS))
+    born = date(1950, 1, 1)
+    rows = (
+        Patient(
+            clinic=clinics[n % CLINICS],
+            full_name=_name(n),
+            cpf=cpf_from_number(n + 1),
+            whatsapp_phone=_phone(n),
+            email=f"p{n}@example.com",
+            birth_date=born + timedelta(days=n % 25_000),
+            gender=("female", "male")[n % 2],
+        )
+        for n in range(size)
+    )
+    while batch := list(islice(rows, SEED_BATCH)):
+        bulk_insert(Patient, batch, batch_size=SEED_BATCH)
+    analyze(Clinic, Patient)
+    return clinics
+
+
+class Context:
+    """Dados dos casos: a clínica medida e amostras de pacientes que existem nela."""
+
+    def __init__(self, clinics, size, seed=0):
+        from patients.validators import cpf_from_number
+
+        self.clinic = clinics[0]
+        self.size = size
+        self.rng = random.Random(seed)
+        # Pacientes da clínica 0: n múltiplo de CLINICS
+        existing = range(0, size, CLINICS)
+        self.sample = self.rng.sample(existing, min(500, len(existing)))
+        self.cpfs = [cpf_from_number(n + 1) for n in self.sample]
+        # CPFs que não existem no banco
+        self._fresh = itertools.count(500_000_001)
+
+    def fresh_cpf(self):
+        from patients.validators import cpf_from_number
+
+        return cpf_from_number(next(self._fresh))
+
+    def cycle(self, values, n):
+        return list(islice(itertools.cycle(values), n))
+
+
+def _new_patient(ctx, cpf):
+    from patients.models import Patient
+
+    return Patient(clinic=ctx.clinic, full_name="Paciente Novo", cpf=cpf, whatsapp_phone="11 98888-7777")
+
+
+@case("cpf.validate", ops=10_000)
+def _cpf_validate(ctx):
+    from patients.validators import validate_cpf
+
+    values = [ctx.fresh_cpf() for _ in range(8_000)] + [f"{n:011d}" for n in range(2_000)]
+    values = [f"{v[:3]}.{v[3:6]}.{v[6:9]}-{v[9:]}" if i % 2 else v for i, v in enumerate(values)]
+
+    def run():
+        for value in values:
+            try:
+                validate_cpf(value)
+            except ValidationError:
+                pass
+    return run
+
+
+@case("cpf.validate_batch", ops=10_000)
+def _cpf_validate_batch(ctx):
+    from patients.validators import validate_cpfs
+
+    values = [ctx.fresh_cpf() for _ in range(10_000)]
+    return lambda: validate_cpfs(values)
+
+
+@case("patient.full_clean", ops=200)
+def _full_clean(ctx):
+    patients = [_new_patient(ctx, ctx.fresh_cpf()) for _ in range(200)]
+
+    def run():
+        for patient in patients:
+            patient.full_clean()
+    return run
+
+
+@case("patient.save", ops=200)
+def _save(ctx):
+    cpfs = [ctx.fresh_cpf() for _ in range(200)]
+
+    def run():
+        for cpf in cpfs:
+            _new_patient(ctx, cpf).save()
+    return run
+
+
+@case("patient.bulk_insert", ops=1_000)
+def _bulk_insert(ctx):
+    from core.bulk import bulk_insert
+    from patients.models import Patient
+
+    cpfs = [ctx.fresh_cpf() for _ in range(1_000)]
+    return lambda: bulk_insert(Patient, [_new_patient(ctx, cpf) for cpf in cpfs])
+
+
+@case("patient.cpf_collision.clean", ops=200)
+def _collision_clean(ctx):
+    cpfs = ctx.cycle(ctx.cpfs, 200)
+
+    def run():
+        for cpf in cpfs:
+            try:
+                _new_patient(ctx, cpf).full_clean()
+            except ValidationError:
+                pass
+    return run
+
+
+@case("patient.cpf_collision.save", ops=200)
+def _collision_save(ctx):
+    # CPF mascarado de um paciente existente: save() tenta o normalizado,
+    # a constraint acusa e ele grava o valor original (caminho legado)
+    masked = [f"{c[:3]}.{c[3:6]}.{c[6:9]}-{c[9:]}" for c in ctx.cycle(ctx.cpfs, 200)]
+
+    def run():
+        for cpf in masked:
+            try:
+                with transaction.atomic():
+                    _new_patient(ctx, cpf).save()
+            except IntegrityError:
+                pass
+    return run
+
+
+@case("lookup.by_cpf", ops=500)
+def _by_cpf(ctx):
+    from patients.models import Patient
+
+    cpfs = ctx.cycle(ctx.cpfs, 500)
+
+    def run():
+        for cpf in cpfs:
+            Patient.objects.get_by_cpf(ctx.clinic, cpf)
+    return run
+
+
+@case("lookup.contact", ops=500)
+def _contact(ctx):
+    from patients.models import Patient
+
+    phones = [_phone(n) for n in ctx.cycle(ctx.sample, 500)]
+
+    def run():
+        for phone in phones:
+            list(Patient.objects.find_by_contact(ctx.clinic, phone))
+    return run
+
+
+@case("lookup.search_name", ops=100, target_ms=50)
+def _search_name(ctx):
+    from patients.search import search_patients
+
+    names = [" ".join(_name(n).split()[:2]) for n in ctx.cycle(ctx.sample, 100)]
+
+    def run():
+        for name in names:
+            search_patients(ctx.clinic, name)
+    return run
+
+
+@case("lookup.search_name_typo", ops=100, target_ms=50)
+def _search_name_typo(ctx):
+    from patients.search import search_patients
+
+    # Como a recepção digita: minúsculo, sem acento, com a última letra trocada
+    names = [" ".join(_name(n).split()[:2]).lower()[:-1] + "x" for n in ctx.cycle(ctx.sample, 100)]
+
+    def run():
+        for name in names:
+            search_patients(ctx.clinic, name)
+    return run
+
+
+def _admin_client():
+    from django.contrib.auth import get_user_model
+
+    user = get_user_model().objects.filter(username="benchmark").first()
+    if user is None:
+        user = get_user_model().objects.create_superuser("benchmark", "benchmark@example.com", None)
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+@case("admin.changelist", ops=10)
+def _changelist(ctx):
+    client = _admin_client()
+    url = f"/admin/patients/patient/?clinic__id__exact={ctx.clinic.pk}"
+
+    def run():
+        for _ in range(10):
+            client.get(url)
+    return run
+
+
+@case("admin.changelist_search", ops=10)
+def _changelist_search(ctx):
+    client = _admin_client()
+    queries = [" ".join(_name(n).split()[:2]) for n in ctx.cycle(ctx.sample, 10)]
+    url = f"/admin/patients/patient/?clinic__id__exact={ctx.clinic.pk}&q="
+
+    def run():
+        for query in queries:
+            client.get(url + query)
+    return run
+
+
+def measure(func, ops, repeat) -> dict:
+    samples = []
+    for i in range(repeat + 1):
+        with transaction.atomic():
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if i:  # a primeira rodada só aquece
+            samples.append(elapsed / ops)
+    median = statistics.median(samples)
+    return {"ops": ops, "median_us": median * 1e6, "min_us": min(samples) * 1e6, "ops_per_s": 1 / median}
+
+
+def selected(only=None) -> list:
+    """Nomes dos casos, filtrados por prefixo (ex.: "lookup", "patient.save")."""
+    return [name for name in CASES if not only or any(name.startswith(prefix) for prefix in only)]
+
+
+def run(size, only=None, repeat=5, clinics=None) -> dict:
+    """Popula (se `clinics` não vier) e mede os casos; {caso: estatísticas}."""
+    clinics = clinics or seed(size)
+    ctx = Context(clinics, size)
+    results = {}
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        for name in selected(only):
+            func, ops, target_ms = CASES[name]
+            results[name] = measure(func(ctx), ops, repeat)
+            if target_ms is not None:
+                results[name]["target_ms"] = target_ms
+    return results
+
+
+def metadata() -> dict:
+    return {
+        "vendor": connection.vendor,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def missed_targets(current) -> list:
+    """Casos cuja mediana passou da meta de latência: [(tamanho, caso, meta_ms, mediana_ms)]."""
+    missed = []
+    for size, cases in current["results"].items():
+        for name, stats in cases.items():
+            target = stats.get("target_ms")
+            if target is not None and stats["median_us"] / 1000 > target:
+                missed.append((size, name, target, stats["median_us"] / 1000))
+    return missed
+
+
+def compare(current, baseline, threshold) -> list:
+    """
+    Casos mais lentos que a base além de `threshold` (0.15 = 15%):
+    [(tamanho, caso, base_us, atual_us, variação)]. Só compara o que
+    existe nos dois e foi medido no mesmo banco.
+    """
+    if baseline.get("meta", {}).get("vendor") != current.get("meta", {}).get("vendor"):
+        return []
+    regressions = []
+    for size, cases in current["results"].items():
+        for name, stats in cases.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if not base:
+                continue
+            change = stats["median_us"] / base["median_us"] - 1
+            if change > threshold:
+                regressions.append((size, name, base["median_us"], stats["median_us"], change))
+    return regressions
@@ -1,10 +1,57 @@
 from django.contrib import admin
-from .models import Clinic
+from .models import Clinic, SlowQuery
+from .pagination import EstimatedCountPaginator
+
+
+class AutocompleteListFilter(admin.RelatedFieldListFilter):
+    """
+    Filtro por FK que não carrega todos os objetos relacionados na barra
+    lateral: mostra só o selecionado e um campo de autocomplete (o mesmo
+    endpoint de autocomplete_fields, que usa o search_fields do admin
+    relacionado). Requer que o admin relacionado tenha search_fields.
+    """
+
+    template = "admin/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.app_label = model._meta.app_label
+        self.model_name = model._meta.model_name
+        self.field_name = field.name
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        if not self.lookup_val:
+            return []
+        related = field.remote_field.model._default_manager
+        return [(obj.pk, str(obj)) for obj in related.filter(pk__in=self.lookup_val)]
 
 
 @admin.register(Clinic)
 class ClinicAdmin(admin.ModelAdmin):
     list_display = ("name", "slug", "active", "created_at")
     list_filter = ("active",)
+    # Usado também pelo autocomplete de clínica no admin de pacientes
     search_fields = ("name", "slug")
+    autocomplete_fields = ("members",)
     ordering = ("name",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """Queries lentas capturadas por core.slowqueries (só leitura)."""
+    list_display = ("created_at", "source", "duration_ms", "database", "fingerprint")
+    list_filter = ("database",)
+    search_fields = ("source", "fingerprint")
+    ordering = ("-created_at",)
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,12 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
 
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import install_query_recorder
+        from .slowqueries import install_slow_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid="core.metrics")
+        connection_created.connect(install_slow_query_recorder, dispatch_uid="core.slowqueries")
@@ -0,0 +1,95 @@
+"""
+Helpers de escrita em massa.
+
+`bulk_insert()` grava instâncias já validadas usando `COPY ... FROM STDIN` no
+PostgreSQL (muito mais rápido que INSERTs) e cai para `bulk_create()` nos
+demais bancos (SQLite em dev/testes).
+
+Atenção: nenhum dos caminhos chama `Model.save()`. Quem usa estes helpers é
+responsável por normalizar os campos antes (ex.: CPF só com dígitos).
+"""
+import io
+
+from django.db import connections, router
+from django.dispatch import Signal
+
+# Enviado depois de um COPY (sender=model, objs, using), que não passa por
+# bulk_create(): modelos que reagem a inserções em massa (ex.: contadores)
+# sobrescrevem bulk_create() e escutam este sinal.
+copy_inserted = Signal()
+
+
+def _copy_escape(value) -> str:
+    if value is None:
+        return r"\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    value = str(value)
+    # Caso comum (texto sem caracteres especiais) sem os quatro replace()
+    if "\\" not in value and "\t" not in value and "\n" not in value and "\r" not in value:
+        return value
+    return (
+        value
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(model, objs, connection) -> str:
+    """
+    Linhas de `objs` no formato texto do COPY (colunas de copy_columns()).
+    Não precisa de conexão aberta: dá para montar em outro processo.
+    """
+    fields = copy_columns(model)
+    buf = io.StringIO()
+    for obj in objs:
+        values = []
+        for field in fields:
+            # pre_save cuida de auto_now/auto_now_add
+            value = field.pre_save(obj, add=True)
+            values.append(_copy_escape(field.get_db_prep_save(value, connection)))
+        buf.write("\t".join(values))
+        buf.write("\n")
+    return buf.getvalue()
+
+
+def copy_columns(model) -> list:
+    return [f for f in model._meta.concrete_fields if not f.primary_key]
+
+
+def copy_from(model, data, connection) -> None:
+    """Grava `data` (saída de copy_rows()) com COPY ... FROM STDIN."""
+    qn = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        qn(model._meta.db_table),
+        ", ".join(qn(f.column) for f in copy_columns(model)),
+    )
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            raw.copy_expert(sql, io.StringIO(data))
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(data)
+
+
+def bulk_insert(model, objs, *, batch_size=1000, use_copy=True, using=None) -> int:
+    """
+    Insere `objs` e retorna quantas linhas foram gravadas.
+    Não preenche a PK das instâncias quando usa COPY.
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    if use_copy and connection.vendor == "postgresql":
+        copy_from(model, copy_rows(model, objs, connection), connection)
+        copy_inserted.send(sender=model, objs=objs, using=using)
+    else:
+        model.objects.using(using).bulk_create(objs, batch_size=batch_size)
+    return len(objs)
@@ -0,0 +1,154 @@
+"""
+Cache em dois níveis para leituras de detalhe (Clinic, Patient).
+
+1. Local: LRUCache do processo (core.lru), sem rede, TTL curto.
+2. Compartilhado: o backend CACHES["default"] (Redis em produção, LocMem nos
+   testes e em dev), comum a todos os workers e réplicas.
+
+As chaves são por clínica e versionadas: `<nome>:<clínica>:<versão>:<chave>`.
+A versão de cada clínica fica no nível compartilhado; invalidate_clinic() a
+incrementa, o que invalida de uma vez todas as entradas da clínica (usado
+nos caminhos em massa, como QuerySet.update(), que não sabem quais linhas
+mudaram). invalidate() apaga uma entrada só (save()/delete()).
+
+Invalidação no nível local só vale para o processo que escreveu; nos outros
+workers o TTL local (CACHE_LOCAL_TTL) limita o atraso, como no cache de
+tenants. Uma falha do backend compartilhado não derruba a leitura: conta
+como miss e a leitura vai ao banco.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .lru import LRUCache
+
+_MISSING = object()
+
+# Todos os caches de dois níveis do processo, por nome (para /internal/cache-stats/)
+registry = {}
+
+
+class TwoTierCache:
+    def __init__(self, name, local=None, shared_ttl=None, alias="default"):
+        self.name = name
+        self.local = local if local is not None else LRUCache(
+            maxsize=getattr(settings, "CACHE_LOCAL_SIZE", 1024),
+            ttl=getattr(settings, "CACHE_LOCAL_TTL", 5),
+        )
+        self.shared_ttl = shared_ttl if shared_ttl is not None else getattr(settings, "CACHE_SHARED_TTL", 300)
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.sets = self.invalidations = self.errors = 0
+        registry[name] = self
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _version_key(self, clinic_id):
+        return f"{self.name}:{clinic_id}:version"
+
+    def _version(self, clinic_id):
+        key = self._version_key(clinic_id)
+        version = self.shared.get(key)
+        if version is None:
+            # Começa no relógio (ms), não em 1: se o backend despejar a versão,
+            # a nova ainda é maior que todas as anteriores e nada antigo volta.
+            self.shared.add(key, int(time.time() * 1000), timeout=None)
+            version = self.shared.get(key)
+        return version
+
+    def _shared_key(self, clinic_id, key):
+        return f"{self.name}:{clinic_id}:{self._version(clinic_id)}:{key}"
+
+    def get(self, clinic_id, key, default=None):
+        value = self.local.get((clinic_id, key), _MISSING)
+        if value is not _MISSING:
+            return value
+        try:
+            value = self.shared.get(self._shared_key(clinic_id, key), _MISSING)
+        except Exception:
+            self._count("errors")
+            value = _MISSING
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("hits")
+        self.local.set((clinic_id, key), value)
+        return value
+
+    def set(self, clinic_id, key, value):
+        self.local.set((clinic_id, key), value)
+        try:
+            self.shared.set(self._shared_key(clinic_id, key), value, self.shared_ttl)
+        except Exception:
+            self._count("errors")
+        else:
+            self._count("sets")
+
+    def get_or_set(self, clinic_id, key, loader):
+        """Valor em cache ou `loader()`; None não é guardado."""
+        value = self.get(clinic_id, key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            if value is not None:
+                self.set(clinic_id, key, value)
+        return value
+
+    def invalidate(self, clinic_id, key):
+        self.local.delete((clinic_id, key))
+        self._count("invalidations")
+        try:
+            self.shared.delete(self._shared_key(clinic_id, key))
+        except Exception:
+            self._count("errors")
+
+    def invalidate_clinic(self, clinic_id):
+        """Todas as entradas da clínica, neste processo e no nível compartilhado."""
+        self.local.delete_where_key(lambda key: key[0] == clinic_id)
+        self._count("invalidations")
+        try:
+            self._version(clinic_id)
+            self.shared.incr(self._version_key(clinic_id))
+        except Exception:
+            self._count("errors")
+
+    def clear(self):
+        """Esvazia o nível local (o compartilhado expira pelo TTL)."""
+        self.local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "local": self.local.stats(),
+            "shared": {
+                "backend": type(self.shared).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "sets": self.sets,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+                # Despejos do backend (só Redis informa; é do servidor inteiro)
+                "evictions": self._shared_evictions(),
+            },
+        }
+
+    def _shared_evictions(self):
+        client = getattr(self.shared, "_cache", None)
+        if not hasattr(client, "get_client"):
+            return None
+        try:
+            return client.get_client().info("stats").get("evicted_keys")
+        except Exception:
+            return None
+
+
+def all_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in registry.items()}
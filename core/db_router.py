@@ -0,0 +1,159 @@
+"""
+Leituras em réplicas, escritas no primário.
+
+- Leituras dos modelos de REPLICA_ROUTED_MODELS (Patient, Clinic) vão para
+  uma réplica saudável de DATABASE_REPLICAS; todo o resto, e toda escrita,
+  vai para "default".
+- Read-your-writes: depois de qualquer escrita, o resto do request (ou do
+  processo, fora de requests) lê do primário. PrimaryStickinessMiddleware
+  grava um cookie para que os requests seguintes do mesmo cliente também
+  leiam do primário por REPLICA_STICKY_SECONDS.
+- Dentro de uma transação no primário as leituras também ficam nele.
+- Réplicas com atraso acima de REPLICA_MAX_LAG_SECONDS (ou fora do ar) são
+  ignoradas; o atraso é medido no máximo a cada REPLICA_LAG_CHECK_INTERVAL
+  segundos por processo. Sem réplica saudável, lê do primário.
+
+Para testar localmente: duas bases PostgreSQL (POSTGRES_REPLICA_HOSTS) ou
+dois arquivos SQLite (USE_SQLITE=1 e SQLITE_REPLICA_NAME, ver settings).
+"""
+import contextvars
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .lru import LRUCache
+
+PRIMARY = "default"
+PIN_COOKIE = "efeso_primary"
+
+# Atraso de replicação em segundos (0 se a base não estiver em recovery)
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_pinned = contextvars.ContextVar("efeso_pinned_to_primary", default=False)
+_wrote = contextvars.ContextVar("efeso_wrote", default=False)
+
+lag_cache = LRUCache(maxsize=64, ttl=getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 5))
+
+
+def replica_aliases() -> list:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+def pin_to_primary():
+    """Faz as próximas leituras deste request (ou contexto) irem ao primário."""
+    _pinned.set(True)
+
+
+def measure_lag(alias) -> float:
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0  # SQLite: a "réplica" é só outro arquivo
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def replica_lag(alias) -> float:
+    lag = lag_cache.get(alias)
+    if lag is None:
+        try:
+            lag = measure_lag(alias)
+        except DatabaseError:
+            lag = float("inf")  # fora do ar: tratada como atrasada até a próxima checagem
+        lag_cache.set(alias, lag)
+    return lag
+
+
+def healthy_replicas() -> list:
+    max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 5)
+    return [alias for alias in replica_aliases() if replica_lag(alias) <= max_lag]
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in getattr(settings, "REPLICA_ROUTED_MODELS", ()):
+            return PRIMARY
+        if _pinned.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        _wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Réplicas recebem o schema pela replicação
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Lê do primário no request que escreveu e, via cookie, nos requests
+    seguintes do mesmo cliente durante REPLICA_STICKY_SECONDS.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._start(request)
+        try:
+            return self._finish(self.get_response(request))
+        finally:
+            self._reset(tokens)
+
+    async def __acall__(self, request):
+        # As escritas rodam em sync_to_async, que devolve as contextvars alteradas
+        tokens = self._start(request)
+        try:
+            return self._finish(await self.get_response(request))
+        finally:
+            self._reset(tokens)
+
+    def _start(self, request):
+        return _pinned.set(self._pinned_by_cookie(request)), _wrote.set(False)
+
+    def _reset(self, tokens):
+        _pinned.reset(tokens[0])
+        _wrote.reset(tokens[1])
+
+    def _finish(self, response):
+        window = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+        if _wrote.get() and window > 0:
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time() + window)),
+                max_age=window, httponly=True, samesite="Lax",
+            )
+        return response
+
+    def _pinned_by_cookie(self, request) -> bool:
+        try:
+            return int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
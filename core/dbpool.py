@@ -0,0 +1,32 @@
+"""
+Estatísticas dos pools de conexão (OPTIONS["pool"] no DATABASES, ver settings).
+
+Cada processo tem os seus pools; os números são deste worker desde o início.
+Para dimensionar: `requests_queued`/`avg_wait_ms` altos ou `saturation`
+perto de 1 pedem max_size maior (ou menos threads por worker); lembre que o
+total de conexões no PostgreSQL é workers x max_size (por alias).
+"""
+from django.db import connections
+
+
+def pool_stats(alias) -> dict | None:
+    """Estatísticas do pool de `alias`, ou None se ele não usa pool."""
+    connection = connections[alias]
+    if not connection.settings_dict.get("OPTIONS", {}).get("pool"):
+        return None
+    pool = connection.pool
+    stats = pool.get_stats()
+    in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    queued = stats.get("requests_queued", 0)
+    return {
+        **stats,
+        "in_use": in_use,
+        "saturation": in_use / pool.max_size if pool.max_size else 0.0,
+        "queued_ratio": queued / requests if requests else 0.0,
+        "avg_wait_ms": stats.get("requests_wait_ms", 0) / queued if queued else 0.0,
+    }
+
+
+def all_pool_stats() -> dict:
+    return {alias: stats for alias in connections if (stats := pool_stats(alias)) is not None}
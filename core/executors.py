@@ -0,0 +1,33 @@
+"""
+Executors para jobs em lotes (busca de duplicatas, geração de dados sintéticos).
+
+process_pool(1) roda as tarefas no próprio processo, sem pool: testes,
+SQLite e bases pequenas não pagam o custo de subir processos.
+"""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+class InlineExecutor:
+    """Mesma interface usada do ProcessPoolExecutor, executando na hora."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def process_pool(workers):
+    """
+    (executor, número de workers): ProcessPoolExecutor com `workers` processos
+    (None: todas as CPUs), ou InlineExecutor se for 1.
+    """
+    workers = workers or os.cpu_count() or 1
+    executor = InlineExecutor() if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    return executor, workers
@@ -0,0 +1,175 @@
+"""
+Exportação em streaming: CSV e XLSX gerados em pedaços, sem montar o
+arquivo (nem a lista de linhas) em memória.
+
+- csv_chunks(): texto CSV em blocos de algumas centenas de linhas.
+- xlsx_chunks(): um .xlsx de uma planilha, escrito com zipfile num destino
+  sem seek (ZIP com data descriptors) e entregue conforme é comprimido.
+  Células como texto inline (sem sharedStrings, que exigiria guardar todas
+  as strings até o fim).
+- streaming_response(): StreamingHttpResponse que transmite em WSGI e ASGI.
+  No ASGI o Django consumiria um iterador síncrono inteiro numa lista antes
+  de enviar; aqui cada pedaço é puxado por sync_to_async, na mesma thread
+  (a conexão e o cursor do banco são dela).
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+CSV_CHUNK_ROWS = 500
+XLSX_FLUSH_BYTES = 64 * 1024
+
+# Planilhas executam células que começam com estes caracteres como fórmula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Telefones e números (+55 11 ..., -3,5) não são fórmulas
+_NUMERIC_LIKE = re.compile(r"^[+-][\d\s().,/-]*$")
+# Caracteres de controle proibidos em XML 1.0
+_XML_INVALID = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_safe(text):
+    if text.startswith(_FORMULA_PREFIXES) and not _NUMERIC_LIKE.match(text):
+        return "'" + text
+    return text
+
+
+def csv_chunks(header, rows, chunk_rows=CSV_CHUNK_ROWS):
+    """Gera o CSV (com BOM, para o Excel reconhecer UTF-8) em blocos de texto."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    for n, row in enumerate(rows, start=1):
+        writer.writerow([_csv_safe(cell_text(value)) for value in row])
+        if n % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _Sink:
+    """Destino do zipfile sem seek/tell: guarda só o que ainda não foi entregue."""
+
+    def __init__(self):
+        self._parts = []
+        self.size = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self.size = 0
+        return data
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+
+
+def _xlsx_cell(value) -> str:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = _XML_INVALID.sub("", cell_text(value))
+    if not text:
+        return "<c/>"
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values) -> bytes:
+    return ("<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>").encode()
+
+
+def xlsx_chunks(header, rows, sheet_name="Planilha1", flush_bytes=XLSX_FLUSH_BYTES):
+    """Gera os bytes de um .xlsx conforme as linhas são escritas e comprimidas."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name[:31], {'"': "&quot;"})))
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header))
+            for row in rows:
+                sheet.write(_xlsx_row(row))
+                if sink.size >= flush_bytes:
+                    yield sink.take()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.take()
+
+
+async def _async_chunks(chunks):
+    step = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (chunk := await step(chunks, done)) is not done:
+        yield chunk
+
+
+def streaming_response(request, chunks, content_type, filename):
+    """Resposta de download que transmite `chunks` (gerador síncrono) pedaço a pedaço."""
+    content = _async_chunks(iter(chunks)) if isinstance(request, ASGIRequest) else chunks
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
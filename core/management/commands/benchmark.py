@@ -0,0 +1,115 @@
+import json
+import sys
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks import suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the patient hot-path micro-benchmarks (CPF validation, patient creation, CPF collisions, "
+        "tenant-filtered lookups, admin changelist) on a fresh test database seeded with --size patients. "
+        "Writes the results as JSON and fails when a case is slower than --baseline by more than --threshold, "
+        "or (on PostgreSQL) misses its latency target, such as name search under 50 ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size", type=int, action="append",
+            help="Patients to seed (e.g. 10000, 100000, 1000000). Repeatable; default 10000.",
+        )
+        parser.add_argument("--only", action="append", help="Only cases starting with this prefix. Repeatable.")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case (median is reported).")
+        parser.add_argument("--output", "-o", help="Write the results JSON here ('-' for stdout).")
+        parser.add_argument("--baseline", help="Results JSON from a previous run to compare against.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.15,
+            help="Allowed slowdown vs. the baseline before failing (0.15 = 15%%).",
+        )
+        parser.add_argument("--list", action="store_true", help="List the cases and exit.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name in suite.selected(options["only"]):
+                self.stdout.write(name)
+            return
+        if not suite.selected(options["only"]):
+            raise CommandError("No benchmark case matches --only.")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read baseline: {exc}")
+
+        # Relatório vai para stderr quando o JSON sai no stdout
+        self.out = self.stderr if options["output"] == "-" else self.stdout
+        sizes = options["size"] or [10_000]
+        results = {"meta": suite.metadata(), "results": {}}
+        # Banco de teste descartável: nunca mede (nem apaga) os dados reais
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            for size in sizes:
+                call_command("flush", interactive=False, verbosity=0)
+                self.out.write(f"Seeding {size} patients...")
+                results["results"][str(size)] = suite.run(size, options["only"], options["repeat"])
+                self._report(size, results["results"][str(size)], baseline)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["output"]:
+            text = json.dumps(results, indent=2, sort_keys=True) + "\n"
+            if options["output"] == "-":
+                sys.stdout.write(text)
+            else:
+                with open(options["output"], "w") as f:
+                    f.write(text)
+
+        missed = suite.missed_targets(results)
+        if missed:
+            lines = [
+                f"  {name} @ {size}: {median:.1f} ms/op (target {target} ms)"
+                for size, name, target, median in missed
+            ]
+            # As metas valem para o PostgreSQL (índices); no SQLite é só informativo
+            if connection.vendor == "postgresql":
+                raise CommandError("Latency targets missed:\n" + "\n".join(lines))
+            self.out.write(self.style.WARNING(
+                f"Latency targets missed on {connection.vendor} (enforced on PostgreSQL only):\n" + "\n".join(lines)
+            ))
+
+        if baseline is None:
+            return
+        if baseline.get("meta", {}).get("vendor") != connection.vendor:
+            self.out.write(self.style.WARNING(
+                f"Baseline was measured on {baseline.get('meta', {}).get('vendor')}, not {connection.vendor}; "
+                "not compared."
+            ))
+            return
+        regressions = suite.compare(results, baseline, options["threshold"])
+        if regressions:
+            lines = [
+                f"  {name} @ {size}: {base:.1f} -> {now:.1f} µs/op ({change:+.0%})"
+                for size, name, base, now, change in regressions
+            ]
+            raise CommandError("Benchmark regressions:\n" + "\n".join(lines))
+        self.out.write(self.style.SUCCESS(f"No regressions above {options['threshold']:.0%}."))
+
+    def _report(self, size, cases, baseline):
+        base_cases = (baseline or {}).get("results", {}).get(str(size), {})
+        self.out.write(f"{size} patients ({connection.vendor})")
+        for name, stats in cases.items():
+            line = f"  {name:<30} {stats['median_us']:>12.1f} µs/op {stats['ops_per_s']:>12,.0f} ops/s"
+            base = base_cases.get(name)
+            if base:
+                line += f"  {stats['median_us'] / base['median_us'] - 1:+.0%} vs baseline"
+            if "target_ms" in stats:
+                line += f"  (target {stats['target_ms']} ms)"
+            self.out.write(line)
@@ -0,0 +1,250 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+
+from core.bulk import bulk_insert
+from core.models import Clinic, JobCheckpoint
+from patients.models import Patient
+from patients.validators import normalize_cpfs, validate_cpfs
+
+# Campos que nunca vêm do arquivo
+EXCLUDED_FIELDS = {"id", "clinic", "created_at", "updated_at"}
+TRUE_VALUES = {"1", "true", "t", "sim", "s", "yes", "y"}
+JOB_NAME = "import_patients"
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports patients for one clinic from a CSV or JSONL file, streaming the input in batches. "
+        "Rows whose CPF already exists in the clinic are skipped, so re-running is safe. "
+        "Progress is checkpointed in the database together with each batch, so an interrupted "
+        "import resumes after the last committed record."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (header = Patient field names) or JSONL file.")
+        parser.add_argument("--clinic", required=True, help="Slug of the target clinic.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--delimiter", default=",")
+        parser.add_argument("--encoding", default="utf-8-sig")
+        parser.add_argument("--reject-file", help="Defaults to <path>.rejects.csv")
+        parser.add_argument(
+            "--checkpoint", help="Checkpoint name (default: derived from the clinic and the file's absolute path).",
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+        parser.add_argument("--no-copy", action="store_true", help="Use INSERTs even on PostgreSQL.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"File not found: {path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        try:
+            clinic = Clinic.objects.get(slug=options["clinic"])
+        except Clinic.DoesNotExist:
+            raise CommandError(f"Clinic '{options['clinic']}' does not exist.")
+
+        fmt = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        reject_path = options["reject_file"] or f"{path}.rejects.csv"
+        scope = options["checkpoint"] or f"{clinic.pk}:{hashlib.sha1(os.path.abspath(path).encode()).hexdigest()}"
+
+        checkpoints = JobCheckpoint.objects.filter(job=JOB_NAME, scope=scope)
+        if options["restart"]:
+            checkpoints.delete()
+        checkpoint, created = checkpoints.get_or_create(job=JOB_NAME, scope=scope)
+        if checkpoint.done:
+            self.stdout.write(f"{path} was already imported ({checkpoint.changed} rows). Use --restart to run again.")
+            return
+        if checkpoint.last_pk:
+            self.stdout.write(f"Resuming after record {checkpoint.last_pk}...")
+
+        self.fields = {
+            f.name: f for f in Patient._meta.concrete_fields if f.editable and f.name not in EXCLUDED_FIELDS
+        }
+        self.clinic = clinic
+        self.use_copy = not options["no_copy"]
+        self.seen_cpfs = set()
+
+        reject_is_new = checkpoint.last_pk == 0 or not os.path.exists(reject_path)
+        started = time.monotonic()
+        processed = 0
+
+        with open(path, encoding=options["encoding"], newline="") as fh, \
+                open(reject_path, "w" if reject_is_new else "a", encoding="utf-8", newline="") as reject_fh:
+            rejects = csv.writer(reject_fh)
+            if reject_is_new:
+                rejects.writerow(["record", "reason", "data"])
+
+            records = self._read(fh, fmt, options["delimiter"])
+            records = islice(records, checkpoint.last_pk, None)
+
+            while True:
+                batch = list(islice(records, options["batch_size"]))
+                if not batch:
+                    break
+
+                to_insert, duplicates, rejected = self._prepare_batch(batch)
+                # Rejeitados antes do commit: um crash aqui no máximo repete linhas no arquivo de rejeitos
+                for record_no, reason, data in rejected:
+                    rejects.writerow([record_no, reason, json.dumps(data, ensure_ascii=False, default=str)])
+                reject_fh.flush()
+
+                # Checkpoint na mesma transação dos INSERTs: retomar nunca reimporta um lote
+                # já gravado (linhas sem CPF não teriam como ser deduplicadas)
+                with transaction.atomic():
+                    inserted = bulk_insert(Patient, to_insert, use_copy=self.use_copy)
+                    checkpoint.last_pk = batch[-1][0]
+                    checkpoint.processed += len(batch)
+                    checkpoint.changed += inserted
+                    checkpoint.skipped += duplicates
+                    checkpoint.failed += len(rejected)
+                    checkpoint.save()
+
+                processed += len(batch)
+                if options["verbosity"] >= 2:
+                    self.stdout.write(
+                        f"  {checkpoint.last_pk} records ({self._rate(processed, started):.0f} rows/s)"
+                    )
+
+        checkpoint.done = True
+        checkpoint.save(update_fields=["done", "updated_at"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {checkpoint.changed} patients into '{clinic.slug}' "
+            f"({checkpoint.skipped} duplicates skipped, {checkpoint.failed} rejected) "
+            f"at {self._rate(processed, started):.0f} rows/s."
+        ))
+        if checkpoint.failed:
+            self.stdout.write(f"Rejected rows written to {reject_path}")
+
+    # -- leitura -------------------------------------------------------------
+
+    def _read(self, fh, fmt, delimiter):
+        """Gera (número do registro, dict) sem carregar o arquivo em memória."""
+        if fmt == "csv":
+            for record_no, row in enumerate(csv.DictReader(fh, delimiter=delimiter), start=1):
+                yield record_no, row
+            return
+
+        for record_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                yield record_no, None
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = {"__raw__": line}
+            yield record_no, row
+
+    # -- conversão / validação ---------------------------------------------------
+
+    def _build(self, row):
+        """Converte um registro do arquivo em Patient (sem salvar). Levanta ValidationError."""
+        if not isinstance(row, dict) or "__raw__" in row:
+            raise ValidationError("Registro ilegível.")
+
+        values = {}
+        for name, raw in row.items():
+            field = self.fields.get(name)
+            if field is None:
+                continue
+            value = "" if raw is None else raw
+            if isinstance(value, str):
+                value = value.strip()
+
+            if isinstance(field, models.DateField):
+                value = self._parse_date(value)
+            elif isinstance(field, models.BooleanField):
+                value = str(value).lower() in TRUE_VALUES
+            elif not isinstance(value, str):
+                value = str(value)
+            if name == "state":
+                value = value.upper()
+            values[name] = value
+
+        patient = Patient(clinic=self.clinic, **values)
+        # CPF é validado em lote em _import_batch
+        patient.clean_fields(exclude=["clinic", "cpf"])
+        return patient
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        if isinstance(value, str) and re.fullmatch(r"\d{2}/\d{2}/\d{4}", value):
+            try:
+                return datetime.strptime(value, "%d/%m/%Y").date()
+            except ValueError:
+                raise ValidationError(f"Data inválida: {value}")
+        return value
+
+    @staticmethod
+    def _reason(exc: ValidationError) -> str:
+        if hasattr(exc, "error_dict"):
+            return "; ".join(f"{field}: {' '.join(msgs)}" for field, msgs in exc.message_dict.items())
+        return " ".join(exc.messages)
+
+    # -- escrita -------------------------------------------------------------
+
+    def _prepare_batch(self, batch):
+        """Lote do arquivo -> (pacientes a inserir, duplicados, rejeitados)."""
+        rejected = []
+        candidates = []  # (record_no, row, patient)
+
+        for record_no, row in batch:
+            if row is None:
+                continue
+            try:
+                patient = self._build(row)
+            except (ValidationError, TypeError, ValueError) as exc:
+                reason = self._reason(exc) if isinstance(exc, ValidationError) else str(exc)
+                rejected.append((record_no, reason, row))
+                continue
+            candidates.append((record_no, row, patient))
+
+        valid = []
+        cpfs = list(normalize_cpfs(patient.cpf for _, _, patient in candidates))
+        for (record_no, row, patient), digits, error in zip(candidates, cpfs, validate_cpfs(cpfs)):
+            if error:
+                rejected.append((record_no, f"cpf: {error}", row))
+                continue
+            patient.cpf = digits
+            valid.append(patient)
+
+        # Uma única consulta por lote contra a constraint uniq_patient_cpf_per_clinic.
+        # cpf_digits cobre também os registros legados que ficaram mascarados.
+        batch_cpfs = {p.cpf for p in valid if p.cpf}
+        existing = set(
+            Patient.objects.filter(clinic=self.clinic, cpf_digits__in=batch_cpfs).values_list("cpf_digits", flat=True)
+        ) if batch_cpfs else set()
+
+        to_insert = []
+        duplicates = 0
+        for patient in valid:
+            if patient.cpf:
+                if patient.cpf in existing or patient.cpf in self.seen_cpfs:
+                    duplicates += 1
+                    continue
+                self.seen_cpfs.add(patient.cpf)
+            to_insert.append(patient)
+
+        rejected.sort(key=lambda r: r[0])
+        return to_insert, duplicates, rejected
+
+    @staticmethod
+    def _rate(rows, started):
+        elapsed = time.monotonic() - started
+        return rows / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,67 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+
+from core import startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepares a container to serve: waits for the database, applies pending migrations "
+        "(one replica at a time) and collects static files only when they changed. "
+        "Prints the time spent in each phase."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--wait-timeout", type=float, default=float(os.getenv("STARTUP_DB_TIMEOUT", "60")),
+            help="Seconds to wait for the database (default: STARTUP_DB_TIMEOUT or 60).",
+        )
+        parser.add_argument(
+            "--skip-wait", action="store_true",
+            help="Do not wait for the database (image build: collectstatic only).",
+        )
+        parser.add_argument(
+            "--lock-timeout", type=float, default=float(os.getenv("STARTUP_MIGRATION_LOCK_TIMEOUT", "600")),
+            help="Seconds to wait for another replica's migrations (default: STARTUP_MIGRATION_LOCK_TIMEOUT or 600).",
+        )
+        parser.add_argument("--skip-migrate", action="store_true")
+        parser.add_argument("--skip-collectstatic", action="store_true")
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        verbosity = options["verbosity"]
+        phases = startup.Phases()
+
+        with phases.phase("wait_for_db") as record:
+            if options["skip_wait"]:
+                record["status"] = "disabled"
+            else:
+                try:
+                    attempts = startup.wait_for_db(alias, timeout=options["wait_timeout"])
+                except OperationalError as exc:
+                    raise CommandError(f"Database '{alias}' not reachable after {options['wait_timeout']:.0f}s: {exc}")
+                record["status"] = f"{attempts} attempt{'s' if attempts != 1 else ''}"
+
+        with phases.phase("migrate") as record:
+            if options["skip_migrate"]:
+                record["status"] = "disabled"
+            else:
+                try:
+                    applied = startup.migrate(alias, verbosity=verbosity, lock_timeout=options["lock_timeout"])
+                except startup.MigrationLockTimeout as exc:
+                    raise CommandError(str(exc))
+                if not applied:
+                    record["status"] = "skipped (up to date)"
+
+        with phases.phase("collectstatic") as record:
+            if options["skip_collectstatic"]:
+                record["status"] = "disabled"
+            elif not startup.collectstatic(verbosity=max(verbosity - 1, 0)):
+                record["status"] = "skipped (unchanged)"
+
+        for r in phases.records:
+            self.stdout.write(f"  {r['name']:<14} {r['seconds']:7.3f}s  {r['status']}")
+        self.stdout.write(self.style.SUCCESS(f"Startup ready in {phases.total:.3f}s."))
@@ -0,0 +1,339 @@
+"""
+Métricas por view no formato de exposição de texto do Prometheus.
+
+MetricsMiddleware mede, por view (nome da rota): a latência do request
+(histograma), quantas queries SQL ele fez e quanto tempo passou no banco, e
+queries repetidas no mesmo request (mesmo SQL, com ou sem parâmetros
+diferentes). Um SQL repetido METRICS_N_PLUS_ONE_THRESHOLD vezes ou mais
+conta como N+1 e é registrado no log "core.metrics".
+
+As queries são contadas por um execute_wrapper instalado em cada conexão ao
+abrir (signal connection_created); ele lê o request atual de uma contextvar,
+então também vale para o ORM dentro de sync_to_async (views async). Fora de
+um request (comandos, shell) custa só um ContextVar.get().
+
+Vários processos (workers do gunicorn): cada um grava um snapshot dos seus
+números em METRICS_DIR, no máximo a cada METRICS_FLUSH_INTERVAL segundos e
+ao sair; /metrics soma os arquivos de todos. Quando um worker sai, o
+child_exit do gunicorn.conf.py soma o arquivo dele em exited.json e o apaga
+(retire_process): os contadores nunca diminuem e o diretório não cresce a
+cada worker reciclado. O on_starting limpa o diretório quando o servidor
+sobe. Sem METRICS_DIR
+(runserver, testes) os números são só do processo.
+
+A latência vai até a view devolver a resposta; o envio de respostas em
+streaming não entra.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Soma dos workers que já saíram (retire_process)
+EXITED_FILENAME = "exited.json"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dump(self):
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+
+class Histogram(Counter):
+    """Contagens por faixa (não cumulativas) + soma + total; a exposição acumula."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1  # depois do último limite: +Inf
+        series[-2] += value
+        series[-1] += 1
+
+
+class Registry:
+    """Métricas deste processo, mais o snapshot em disco para somar entre processos."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self._process()
+
+    def _process(self):
+        self.pid = os.getpid()
+        # pid + início: um worker novo que reaproveita o pid não apaga o arquivo do antigo
+        self.filename = f"{self.pid}-{time.time_ns()}.json"
+        self.last_flush = 0.0
+        for metric in self.metrics.values():
+            metric.values.clear()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def check_fork(self):
+        # Depois de um fork o filho herdaria (e somaria de novo) os números do pai
+        if os.getpid() != self.pid:
+            with self.lock:
+                if os.getpid() != self.pid:
+                    self._process()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {name: metric.dump() for name, metric in self.metrics.items()}
+
+    def flush(self, directory=None, force=False):
+        directory = directory or getattr(settings, "METRICS_DIR", "")
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_flush < getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0):
+            return
+        self.last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        _write(os.path.join(directory, self.filename), self.snapshot())
+
+    def collect(self, directory=None) -> dict:
+        """{métrica: {labels: valores}} somando todos os processos."""
+        directory = directory or getattr(settings, "METRICS_DIR", "")
+        snapshots = [self.snapshot()]
+        if directory and os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                if filename.endswith(".json") and filename != self.filename:
+                    snapshots.append(_read(os.path.join(directory, filename)))
+        merged = merge_snapshots(snapshots)
+        return {name: merged.get(name, {}) for name in self.metrics}
+
+    def render(self, directory=None) -> str:
+        merged = self.collect(directory)
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(merged[name].items()):
+                pairs = [f'{k}="{_escape(v)}"' for k, v in zip(metric.labelnames, labels)]
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip((*map(_number, metric.buckets), "+Inf"), value):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{_labels(pairs + [le])} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-2])}")
+                lines.append(f"{name}_count{_labels(pairs)} {_number(value[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _read(path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path, snapshot):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def merge_snapshots(snapshots) -> dict:
+    """{métrica: {labels: valores}} somando snapshots no formato de Registry.snapshot()."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, series in snapshot.items():
+            target = merged.setdefault(name, {})
+            for labels, value in series:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    current = target.get(key)
+                    target[key] = [a + b for a, b in zip(current, value)] if current else list(value)
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+
+def retire_process(directory, pid):
+    """Soma os arquivos do processo pid (que já saiu) em exited.json e os apaga.
+
+    Roda no master do gunicorn (child_exit), um worker por vez; o pid só é
+    reaproveitado depois disso.
+    """
+    try:
+        paths = [
+            os.path.join(directory, filename) for filename in os.listdir(directory)
+            if filename.startswith(f"{pid}-") and filename.endswith(".json")
+        ]
+    except OSError:
+        return
+    if not paths:
+        return
+    exited = os.path.join(directory, EXITED_FILENAME)
+    merged = merge_snapshots(_read(path) for path in [exited, *paths])
+    _write(exited, {name: [[list(labels), value] for labels, value in series.items()] for name, series in merged.items()})
+    for path in paths:
+        os.remove(path)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    "efeso_http_request_duration_seconds", "Latência dos requests, por view.",
+    ("view", "method", "status"), LATENCY_BUCKETS,
+))
+queries_per_request = registry.register(Histogram(
+    "efeso_db_queries_per_request", "Queries SQL por request, por view.", ("view",), QUERY_COUNT_BUCKETS,
+))
+query_seconds = registry.register(Counter(
+    "efeso_db_query_seconds_total", "Tempo gasto em queries SQL, por view.", ("view",),
+))
+duplicate_queries = registry.register(Counter(
+    "efeso_db_duplicate_queries_total", "Queries com SQL repetido dentro do mesmo request, por view.", ("view",),
+))
+n_plus_one = registry.register(Counter(
+    "efeso_db_n_plus_one_total", "Requests com algum SQL repetido acima do limite de N+1, por view.", ("view",),
+))
+
+
+class QueryStats:
+    """Queries de um request: total, tempo e quantas vezes cada SQL apareceu."""
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+
+_current = ContextVar("metrics_query_stats", default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    """execute_wrapper: soma a query ao request atual, se houver."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.seconds += perf_counter() - started
+        stats.count += 1
+        stats.statements[sql] = stats.statements.get(sql, 0) + 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created: instala record_queries uma vez por conexão."""
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+def _view_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else "unresolved"
+
+
+class MetricsMiddleware:
+    """Latência e SQL por view (ver o docstring do módulo). Vai logo depois dos estáticos."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.n_plus_one_threshold = getattr(settings, "METRICS_N_PLUS_ONE_THRESHOLD", 5)
+        if getattr(settings, "METRICS_DIR", ""):
+            atexit.register(registry.flush, force=True)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started, token = self._start()
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            self._finish(request, response, started, token)
+
+    async def __acall__(self, request):
+        started, token = self._start()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            self._finish(request, response, started, token)
+
+    def _start(self):
+        registry.check_fork()
+        return perf_counter(), _current.set(QueryStats())
+
+    def _finish(self, request, response, started, token):
+        elapsed = perf_counter() - started
+        stats = _current.get()
+        _current.reset(token)
+        view = _view_label(request)
+        method = request.method if request.method in METHODS else "other"
+        status = str(response.status_code) if response is not None else "500"
+        repeated = max(stats.statements.values(), default=0)
+        with registry.lock:
+            request_duration.observe((view, method, status), elapsed)
+            queries_per_request.observe((view,), stats.count)
+            if stats.count:
+                query_seconds.inc((view,), stats.seconds)
+            if repeated > 1:
+                duplicate_queries.inc((view,), stats.count - len(stats.statements))
+            if repeated >= self.n_plus_one_threshold:
+                n_plus_one.inc((view,))
+        if repeated >= self.n_plus_one_threshold:
+            sql = max(stats.statements, key=stats.statements.get)
+            logger.warning("N+1 em %s: %d x %s", view, repeated, sql[:300])
+        registry.flush()
+
@@ -0,0 +1,51 @@
+"""
+Operações de migration para tabelas grandes.
+
+`AddIndexOnline` cria o índice com CREATE INDEX CONCURRENTLY no PostgreSQL,
+sem travar escritas na tabela; nos outros bancos é um AddIndex comum. A
+migration que usa esta operação precisa declarar `atomic = False`.
+
+`RunSQLOnPostgres` roda SQL específico do PostgreSQL (extensões, índices GIN)
+e não faz nada nos outros bancos.
+"""
+from django.db import migrations
+
+
+class AddIndexOnline(migrations.AddIndex):
+    def _concurrently(self, schema_editor) -> bool:
+        return schema_editor.connection.vendor == "postgresql"
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if self._concurrently(schema_editor):
+            if schema_editor.connection.in_atomic_block:
+                raise RuntimeError("AddIndexOnline requires a migration with atomic = False.")
+            schema_editor.add_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if self._concurrently(schema_editor):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+    def describe(self):
+        return f"Create index {self.index.name} on {self.model_name} (concurrently on PostgreSQL)"
+
+
+class RunSQLOnPostgres(migrations.RunSQL):
+    """RunSQL que só executa no PostgreSQL (índices GIN, extensões etc.)."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
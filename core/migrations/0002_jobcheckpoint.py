@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("job", models.CharField(max_length=80, verbose_name="Job")),
+                (
+                    "scope",
+                    models.CharField(
+                        blank=True, default="", max_length=80, verbose_name="Escopo"
+                    ),
+                ),
+                (
+                    "last_pk",
+                    models.BigIntegerField(
+                        default=0, verbose_name="Último ID processado"
+                    ),
+                ),
+                (
+                    "processed",
+                    models.BigIntegerField(default=0, verbose_name="Processados"),
+                ),
+                (
+                    "changed",
+                    models.BigIntegerField(default=0, verbose_name="Alterados"),
+                ),
+                (
+                    "skipped",
+                    models.BigIntegerField(default=0, verbose_name="Ignorados"),
+                ),
+                ("done", models.BooleanField(default=False, verbose_name="Concluído")),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Atualizado em"),
+                ),
+            ],
+            options={
+                "verbose_name": "Checkpoint de job",
+                "verbose_name_plural": "Checkpoints de jobs",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("job", "scope"), name="uniq_job_checkpoint_scope"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_jobcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        db_index=True, max_length=16, verbose_name="Impressão digital"
+                    ),
+                ),
+                ("sql", models.TextField(verbose_name="SQL")),
+                ("duration_ms", models.FloatField(verbose_name="Duração (ms)")),
+                ("plan", models.TextField(blank=True, verbose_name="Plano")),
+                ("source", models.CharField(max_length=200, verbose_name="Origem")),
+                ("database", models.CharField(max_length=40, verbose_name="Banco")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="Criado em"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Query lenta",
+                "verbose_name_plural": "Queries lentas",
+            },
+        ),
+    ]
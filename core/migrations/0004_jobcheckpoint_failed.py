@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_slowquery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobcheckpoint",
+            name="failed",
+            field=models.BigIntegerField(default=0, verbose_name="Com erro"),
+        ),
+    ]
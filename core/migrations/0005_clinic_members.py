@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_jobcheckpoint_failed"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clinic",
+            name="members",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="clinics",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Membros",
+            ),
+        ),
+    ]
@@ -1,5 +1,23 @@
 
-from django.db import models
+from functools import partial
+
+from django.conf import settings
+from django.db import models, router, transaction
+
+
+class ClinicQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # save()/delete() invalidam via core.signals; update() não manda sinais
+        from .tenancy import invalidate_clinic
+
+        db = self._db or router.db_for_write(self.model, **self._hints)
+        clinics = list(self.using(db).only("pk"))
+        result = super().update(**kwargs)
+        for clinic in clinics:
+            transaction.on_commit(partial(invalidate_clinic, clinic), using=db)
+        return result
+
+    update.alters_data = True
 
 
 class Clinic(models.Model):
@@ -11,6 +29,12 @@ class Clinic(models.Model):
     slug = models.SlugField("Slug", max_length=80, unique=True)
 
     active = models.BooleanField("Ativa", default=True)
+    # Quem pode ver os pacientes da clínica (superusuários veem todas): core.tenancy.is_member
+    members = models.ManyToManyField(
+        settings.AUTH_USER_MODEL, related_name="clinics", blank=True, verbose_name="Membros",
+    )
+
+    objects = ClinicQuerySet.as_manager()
 
     created_at = models.DateTimeField("Criado em", auto_now_add=True)
     updated_at = models.DateTimeField("Atualizado em", auto_now=True)
@@ -24,4 +48,55 @@ class Clinic(models.Model):
         ]
 
     def __str__(self) -> str:
-        return self.name
\ No newline at end of file
+        return self.name
+
+class JobCheckpoint(models.Model):
+    """
+    Progresso de jobs longos em lotes (ex.: normalize_patient_cpfs), para que
+    possam ser interrompidos e retomados. `scope` separa partes independentes
+    do mesmo job (ex.: uma clínica). Em import_patients, last_pk é o número do
+    último registro do arquivo já gravado.
+    """
+    job = models.CharField("Job", max_length=80)
+    scope = models.CharField("Escopo", max_length=80, default="", blank=True)
+
+    last_pk = models.BigIntegerField("Último ID processado", default=0)
+    processed = models.BigIntegerField("Processados", default=0)
+    changed = models.BigIntegerField("Alterados", default=0)
+    skipped = models.BigIntegerField("Ignorados", default=0)
+    failed = models.BigIntegerField("Com erro", default=0)
+    done = models.BooleanField("Concluído", default=False)
+
+    updated_at = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "Checkpoint de job"
+        verbose_name_plural = "Checkpoints de jobs"
+        constraints = [
+            models.UniqueConstraint(fields=["job", "scope"], name="uniq_job_checkpoint_scope"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.job}[{self.scope}] @ {self.last_pk}"
+
+
+class SlowQuery(models.Model):
+    """
+    Query acima de SLOW_QUERY_MS, com o plano (EXPLAIN) e quem a executou
+    (view ou comando). Gravada por core.slowqueries; o plano pode conter
+    valores dos filtros, então só staff vê (admin).
+    """
+    fingerprint = models.CharField("Impressão digital", max_length=16, db_index=True)
+    sql = models.TextField("SQL")
+    duration_ms = models.FloatField("Duração (ms)")
+    plan = models.TextField("Plano", blank=True)
+    source = models.CharField("Origem", max_length=200)
+    database = models.CharField("Banco", max_length=40)
+    created_at = models.DateTimeField("Criado em", auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Query lenta"
+        verbose_name_plural = "Queries lentas"
+
+    def __str__(self) -> str:
+        return f"{self.source}: {self.duration_ms:.0f} ms"
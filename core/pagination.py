@@ -0,0 +1,189 @@
+"""
+Paginação de tabelas grandes.
+
+EstimatedCountPaginator: Paginator cujo count usa a estimativa do planner do
+PostgreSQL quando ela passa de um limite, em vez de COUNT(*) (que lê todas as
+linhas filtradas). Usado no admin.
+
+Paginação por keyset ("seek"): em vez de OFFSET, cada página começa depois
+(ou antes) da última linha vista, usando um índice que cubra a ordenação.
+O custo de uma página não depende da profundidade: a página 10.000 custa o
+mesmo que a primeira.
+
+A ordenação é (campo, pk); o pk desempata nomes iguais. O queryset já deve
+vir filtrado pelo prefixo do índice (ex.: clinic), para que o banco percorra
+o índice (clinic, campo) a partir do ponto do cursor.
+"""
+import base64
+import binascii
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+FORWARD = "n"
+BACKWARD = "p"
+
+
+def estimate_count(queryset):
+    """
+    Linhas estimadas pelo planner para `queryset` (EXPLAIN, sem executar).
+    None fora do PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    qs = queryset.order_by().values("pk")
+    sql, params = qs.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Acima de `exact_count_limit` linhas estimadas, o total exibido é a
+    estimativa (o número de páginas fica aproximado; páginas além do fim real
+    vêm vazias). Abaixo disso, ou fora do PostgreSQL, COUNT(*) normal.
+    """
+
+    exact_count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list) if hasattr(self.object_list, "query") else None
+        if estimate is not None and estimate > self.exact_count_limit:
+            return estimate
+        return super().count
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction, value, pk) -> str:
+    raw = json.dumps([direction, value, pk], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Cursor opaco -> (direção, valor, pk). InvalidCursor se for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, value, pk = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    # O valor vai para um filtro (campo >= valor): null, listas e objetos virariam 500
+    if (
+        direction not in (FORWARD, BACKWARD)
+        or not isinstance(value, (str, int, float)) or isinstance(value, bool)
+        or not isinstance(pk, int) or isinstance(pk, bool)
+    ):
+        raise InvalidCursor(cursor)
+    return direction, value, pk
+
+
+class KeysetPage:
+    def __init__(self, rows, next_cursor=None, previous_cursor=None):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Pagina `queryset` por (field, pk). As linhas podem ser instâncias ou
+    namedtuples (values_list(named=True)); precisam ter `field` e `pk_name`.
+    """
+
+    def __init__(self, queryset, field, per_page=50, pk_name="id"):
+        self.queryset = queryset
+        self.field = field
+        self.per_page = per_page
+        self.pk_name = pk_name
+
+    def _key(self, row):
+        return getattr(row, self.field), getattr(row, self.pk_name)
+
+    def _seek(self, direction, value, pk):
+        # campo >= valor AND (campo > valor OR pk > último): o primeiro termo é
+        # uma faixa do índice; o resto só desempata linhas com o mesmo valor.
+        op = "gt" if direction == FORWARD else "lt"
+        return Q(**{f"{self.field}__{op}e": value}) & (
+            Q(**{f"{self.field}__{op}": value}) | Q(**{f"{self.pk_name}__{op}": pk})
+        )
+
+    def _query(self, cursor, start):
+        direction, after = FORWARD, None
+        if cursor:
+            direction, value, pk = decode_cursor(cursor)
+            after = (value, pk)
+
+        qs = self.queryset
+        if after is not None:
+            qs = qs.filter(self._seek(direction, *after))
+        elif start:
+            qs = qs.filter(**{f"{self.field}__gte": start})
+
+        if direction == FORWARD:
+            qs = qs.order_by(self.field, self.pk_name)
+        else:
+            qs = qs.order_by(f"-{self.field}", f"-{self.pk_name}")
+        # Uma linha a mais diz se há outra página nesse sentido
+        return qs[: self.per_page + 1], direction, after is not None or bool(start)
+
+    def _page(self, rows, direction, continued):
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if direction == BACKWARD:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows)
+
+        if direction == FORWARD:
+            has_next, has_previous = more, continued
+        else:
+            has_next, has_previous = True, more
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(FORWARD, *self._key(rows[-1])) if has_next else None,
+            previous_cursor=encode_cursor(BACKWARD, *self._key(rows[0])) if has_previous else None,
+        )
+
+    def page(self, cursor=None, start=None) -> KeysetPage:
+        """
+        Primeira página, a página indicada por `cursor`, ou a que começa no
+        primeiro valor >= `start` (salto por letra: start="M").
+        """
+        qs, direction, continued = self._query(cursor, start)
+        rows = list(qs)
+        if direction == BACKWARD and not rows:  # as linhas anteriores sumiram: volta ao início
+            return self.page()
+        return self._page(rows, direction, continued)
+
+    async def apage(self, cursor=None, start=None) -> KeysetPage:
+        """page() com o ORM assíncrono."""
+        qs, direction, continued = self._query(cursor, start)
+        rows = [row async for row in qs]
+        if direction == BACKWARD and not rows:
+            return await self.apage()
+        return self._page(rows, direction, continued)
@@ -0,0 +1,16 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Clinic
+from .tenancy import invalidate_clinic
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+def clinic_changed(sender, instance, using, **kwargs):
+    # Inclui desativação (active=False): a clínica some do cache e deixa de resolver.
+    # Só depois do commit: antes disso outra leitura recachearia a versão antiga.
+    transaction.on_commit(partial(invalidate_clinic, instance), using=using)
@@ -0,0 +1,197 @@
+"""
+Captura de queries lentas.
+
+Um execute_wrapper (instalado em cada conexão, como o de core.metrics) mede
+cada statement; os que passam de SLOW_QUERY_MS viram um SlowQuery com a
+origem (view do request atual ou o comando do manage.py) e, no máximo uma
+vez por SLOW_QUERY_EXPLAIN_INTERVAL segundos para o mesmo SQL, o EXPLAIN
+(sem ANALYZE: não executa de novo) rodado na mesma conexão logo depois.
+SLOW_QUERY_SAMPLE_RATE < 1 grava só uma amostra; SLOW_QUERY_MS=0 desliga.
+
+As entradas de um request são gravadas ao fim dele (SlowQueryMiddleware),
+já com a view resolvida; fora de requests, assim que o banco não está no
+meio de uma transação (ou na saída do processo). Falhas ao gravar ou no
+EXPLAIN são ignoradas: a captura nunca derruba quem fez a query.
+"""
+import atexit
+import hashlib
+import os
+import random
+import sys
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+
+from .lru import LRUCache
+
+# EXPLAIN de INSERT não diz nada útil; DDL nem aceita
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+MAX_PENDING = 100
+
+_source = ContextVar("slow_query_source", default=None)
+# Durante o EXPLAIN e a gravação: as queries deles não são medidas
+_busy = ContextVar("slow_query_busy", default=False)
+_explained = LRUCache(maxsize=1024)
+_pending = []
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+def fingerprint(sql) -> str:
+    return hashlib.sha1(sql.encode()).hexdigest()[:16]
+
+
+class _RequestEntries:
+    """Queries lentas do request atual; a view só é conhecida depois do resolve."""
+    __slots__ = ("request", "entries")
+
+    def __init__(self, request):
+        self.request = request
+        self.entries = []
+
+    def source(self) -> str:
+        match = getattr(self.request, "resolver_match", None)
+        return match.view_name if match else f"path:{self.request.path}"
+
+
+def process_source() -> str:
+    """Comando do manage.py ou o nome do processo (queries fora de requests)."""
+    if len(sys.argv) > 1 and os.path.basename(sys.argv[0]) == "manage.py":
+        return f"command:{sys.argv[1]}"
+    return f"process:{os.path.basename(sys.argv[0]) if sys.argv else '?'}"
+
+
+def explain(connection, sql, params) -> str:
+    """Plano de `sql` na mesma conexão, ou "" se não der."""
+    prefix = connection.ops.explain_query_prefix()
+    token = _busy.set(True)
+    try:
+        # Savepoint: um EXPLAIN que falhe não aborta a transação de quem chamou
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError:
+        return ""
+    finally:
+        _busy.reset(token)
+
+
+def record_slow_queries(execute, sql, params, many, context):
+    """execute_wrapper: guarda statements acima de SLOW_QUERY_MS."""
+    threshold = settings.SLOW_QUERY_MS
+    if not threshold or _busy.get():
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = (perf_counter() - started) * 1000
+    if elapsed >= threshold and not many:
+        _capture(context["connection"], sql, params, elapsed)
+    return result
+
+
+def _capture(connection, sql, params, elapsed):
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return
+    from .models import SlowQuery
+
+    key = fingerprint(sql)
+    plan = ""
+    if sql.lstrip()[:6].upper().startswith(EXPLAINABLE) and _explained.get(key) is None:
+        _explained.set(key, True, ttl=settings.SLOW_QUERY_EXPLAIN_INTERVAL)
+        if not connection.needs_rollback:
+            plan = explain(connection, sql, params)
+    entry = SlowQuery(fingerprint=key, sql=sql, duration_ms=elapsed, plan=plan, database=connection.alias)
+    current = _source.get()
+    if current is not None:
+        if len(current.entries) < MAX_PENDING:
+            current.entries.append(entry)
+        return
+    entry.source = process_source()[:200]
+    _enqueue(entry)
+    if not connections[router.db_for_write(SlowQuery)].in_atomic_block:
+        flush()
+
+
+def _enqueue(entry):
+    global _atexit_registered
+    with _lock:
+        if len(_pending) < MAX_PENDING:
+            _pending.append(entry)
+        if not _atexit_registered:
+            # Comandos que terminam dentro de uma transação gravam na saída
+            atexit.register(flush)
+            _atexit_registered = True
+
+
+def flush():
+    """Grava as entradas pendentes de fora de requests."""
+    with _lock:
+        entries = _pending[:]
+        _pending.clear()
+    _write(entries)
+
+
+def _write(entries):
+    from .models import SlowQuery
+
+    if not entries:
+        return
+    alias = router.db_for_write(SlowQuery)
+    token = _busy.set(True)
+    try:
+        with transaction.atomic(using=alias):
+            SlowQuery.objects.using(alias).bulk_create(entries)
+    except DatabaseError:
+        pass
+    finally:
+        _busy.reset(token)
+
+
+def install_slow_query_recorder(sender, connection, **kwargs):
+    """connection_created: instala record_slow_queries uma vez por conexão."""
+    if record_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_queries)
+
+
+class SlowQueryMiddleware:
+    """Marca as queries com a view do request e grava as lentas ao final."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        current = _RequestEntries(request)
+        token = _source.set(current)
+        try:
+            return self.get_response(request)
+        finally:
+            _source.reset(token)
+            if current.entries:
+                _write(self._finish(current))
+
+    async def __acall__(self, request):
+        current = _RequestEntries(request)
+        token = _source.set(current)
+        try:
+            return await self.get_response(request)
+        finally:
+            _source.reset(token)
+            if current.entries:
+                await sync_to_async(_write)(self._finish(current))
+
+    def _finish(self, current):
+        source = current.source()[:200]
+        for entry in current.entries:
+            entry.source = source
+        return current.entries
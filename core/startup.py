@@ -0,0 +1,163 @@
+"""
+Preparação do container antes do servidor subir (manage.py startup).
+
+Tudo num único boot do Django, no lugar de `nc -z` + `migrate` +
+`collectstatic` (três processos, cada um com o seu boot):
+
+- Espera o banco com uma conexão de verdade (não só a porta aberta), com
+  backoff exponencial até um prazo.
+- migrate só quando o plano de migrações não está vazio. Com várias réplicas
+  subindo juntas, só uma aplica: as outras tentam o advisory lock do
+  PostgreSQL a intervalos (pg_try_advisory_lock, com prazo) e, ao recebê-lo,
+  veem o plano já vazio.
+- collectstatic só quando a impressão digital dos arquivos encontrados pelos
+  finders (caminho, tamanho, mtime) e do storage muda; ela fica gravada em
+  STATIC_ROOT.
+- Tempo de cada fase, para saber onde o startup gasta.
+
+Com DB_PGBOUNCER=1 (pgbouncer em modo transaction) o advisory lock de
+sessão não é confiável: aponte o startup direto para o PostgreSQL.
+"""
+import hashlib
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.migrations.executor import MigrationExecutor
+
+# Chave fixa de pg_advisory_lock para "aplicando migrações"
+MIGRATION_LOCK_ID = 0x0EFE5011
+STATIC_FINGERPRINT_FILE = ".static-fingerprint"
+
+
+class Phases:
+    """Tempo e resultado ("done", "skipped", ...) de cada fase, na ordem."""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.records = []
+
+    @contextmanager
+    def phase(self, name):
+        record = {"name": name, "status": "done", "seconds": 0.0}
+        started = self._clock()
+        try:
+            yield record
+        except BaseException:
+            record["status"] = "failed"
+            raise
+        finally:
+            record["seconds"] = self._clock() - started
+            self.records.append(record)
+
+    @property
+    def total(self) -> float:
+        return sum(r["seconds"] for r in self.records)
+
+
+def wait_for_db(alias=DEFAULT_DB_ALIAS, timeout=60.0, delay=0.1, max_delay=2.0, sleep=time.sleep) -> int:
+    """
+    Tenta conectar até conseguir ou até `timeout` segundos; devolve o número
+    de tentativas. Depois do prazo, a última OperationalError sobe.
+    """
+    connection = connections[alias]
+    deadline = time.monotonic() + timeout
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            connection.ensure_connection()
+            return attempts
+        except OperationalError:
+            connection.close()
+            if time.monotonic() + delay > deadline:
+                raise
+        sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+def pending_migrations(alias=DEFAULT_DB_ALIAS) -> list:
+    """Plano de migrações ainda não aplicadas (vazio: nada a fazer)."""
+    executor = MigrationExecutor(connections[alias])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+class MigrationLockTimeout(Exception):
+    pass
+
+
+@contextmanager
+def migration_lock(alias=DEFAULT_DB_ALIAS, timeout=600.0, poll=1.0, sleep=time.sleep):
+    """
+    Uma réplica por vez aplica migrações (no-op fora do PostgreSQL).
+
+    Não usa pg_advisory_lock bloqueante: esperando atrás de um CREATE INDEX
+    CONCURRENTLY (que espera as transações abertas), o PostgreSQL não acusa
+    deadlock e a réplica ficaria presa. Tenta a cada `poll` segundos e desiste
+    com MigrationLockTimeout depois de `timeout`.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        yield
+        return
+    deadline = time.monotonic() + timeout
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [MIGRATION_LOCK_ID])
+            if cursor.fetchone()[0]:
+                break
+        if time.monotonic() + poll > deadline:
+            raise MigrationLockTimeout(f"Migration lock not acquired after {timeout:.0f}s.")
+        sleep(poll)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATION_LOCK_ID])
+
+
+def migrate(alias=DEFAULT_DB_ALIAS, verbosity=1, lock_timeout=600.0) -> bool:
+    """Aplica as migrações pendentes; False se não havia nenhuma."""
+    if not pending_migrations(alias):
+        return False
+    with migration_lock(alias, timeout=lock_timeout):
+        # Outra réplica pode ter aplicado enquanto esperávamos o lock
+        if not pending_migrations(alias):
+            return False
+        call_command("migrate", database=alias, interactive=False, verbosity=verbosity)
+    return True
+
+
+def static_fingerprint() -> str:
+    digest = hashlib.sha256()
+    digest.update(settings.STORAGES["staticfiles"]["BACKEND"].encode())
+    entries = []
+    for finder in finders.get_finders():
+        for path, storage in finder.list([]):
+            prefix = getattr(storage, "prefix", None) or ""
+            stat = os.stat(storage.path(path))
+            entries.append(f"{os.path.join(prefix, path)}\0{stat.st_size}\0{stat.st_mtime_ns}")
+    for entry in sorted(entries):
+        digest.update(entry.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def collectstatic(verbosity=0) -> bool:
+    """Roda collectstatic se os estáticos mudaram desde a última vez; False se pulou."""
+    marker = os.path.join(settings.STATIC_ROOT, STATIC_FINGERPRINT_FILE)
+    fingerprint = static_fingerprint()
+    try:
+        with open(marker) as f:
+            if f.read().strip() == fingerprint:
+                return False
+    except FileNotFoundError:
+        pass
+    call_command("collectstatic", interactive=False, verbosity=verbosity)
+    with open(marker, "w") as f:
+        f.write(fingerprint)
+    return True
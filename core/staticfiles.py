@@ -0,0 +1,178 @@
+"""
+Estáticos: nomes com hash, variantes pré-comprimidas e entrega pelo app.
+
+CompressedManifestStaticFilesStorage (STORAGES["staticfiles"]): o
+collectstatic grava cada arquivo com o hash do conteúdo no nome
+(base.3f2a9c1e.css, via staticfiles.json) e, para os tipos de texto, as
+variantes .gz e .br (brotli, se o pacote estiver instalado) ao lado. A
+compressão acontece uma vez, no build da imagem, não a cada request.
+
+StaticFilesMiddleware serve STATIC_URL a partir de STATIC_ROOT sem passar
+pelas views: escolhe a variante pelo Accept-Encoding e manda os nomes com
+hash com cache "immutable" de um ano (um conteúdo novo tem outro nome). O
+corpo vai em streaming (FileResponse) e HEAD nem abre o arquivo. O índice
+dos arquivos é montado uma vez por processo, sem o manifesto e a impressão
+digital do startup; o startup roda o collectstatic antes do servidor subir.
+"""
+import gzip
+import json
+import mimetypes
+import os
+import posixpath
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+
+from core.startup import STATIC_FINGERPRINT_FILE
+
+try:
+    import brotli
+except ImportError:  # opcional: sem ele, só .gz
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt", ".html", ".xml", ".ico"}
+MIN_COMPRESS_SIZE = 512  # abaixo disso os cabeçalhos custam mais do que a compressão economiza
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Variantes por ordem de preferência: (Content-Encoding, extensão)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Arquivos internos em STATIC_ROOT que não são servidos
+PRIVATE_FILES = {ManifestStaticFilesStorage.manifest_name, STATIC_FINGERPRINT_FILE}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # Sem manifesto (dev/testes sem collectstatic), {% static %} usa o nome original
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Depois de todas as passadas: só o original e o nome com hash final
+        for name in paths:
+            self._compress(name)
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            if hashed_name and hashed_name != name:
+                self._compress(hashed_name)
+
+    def _compress(self, name):
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return
+        path = self.path(name)
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for extension, body in variants:
+            if len(body) < len(data):  # só vale se ficou menor
+                with open(path + extension, "wb") as f:
+                    f.write(body)
+
+
+def _accepts(request, encoding) -> bool:
+    accepted = request.headers.get("Accept-Encoding", "")
+    for part in accepted.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class StaticFilesMiddleware:
+    """Entrega STATIC_URL antes do resto da pilha; o que não está no índice segue adiante."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else "/" + settings.STATIC_URL
+        self.files, self.hashed = self._index(settings.STATIC_ROOT) if settings.STATIC_ROOT else ({}, set())
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._serve(request) or await self.get_response(request)
+
+    def _index(self, root):
+        """({nome relativo: {encoding ou None: (caminho, tamanho, mtime)}}, nomes com hash)."""
+        files, hashed = {}, set()
+        if not os.path.isdir(root):
+            return files, hashed
+        try:
+            with open(os.path.join(root, ManifestStaticFilesStorage.manifest_name)) as f:
+                hashed = set(json.load(f).get("paths", {}).values())
+        except (OSError, ValueError):
+            pass
+        paths = {}
+        for directory, _, names in os.walk(root):
+            for filename in names:
+                path = os.path.join(directory, filename)
+                paths[os.path.relpath(path, root).replace(os.sep, "/")] = path
+        for name in PRIVATE_FILES:
+            paths.pop(name, None)
+        for name, path in paths.items():
+            encoding = None
+            for enc, ext in ENCODINGS:
+                # foo.css.gz é variante de foo.css; um .gz sem original é um arquivo comum
+                if name.endswith(ext) and name[: -len(ext)] in paths:
+                    encoding, name = enc, name[: -len(ext)]
+                    break
+            stat = os.stat(path)
+            files.setdefault(name, {})[encoding] = (path, stat.st_size, stat.st_mtime)
+        return files, hashed
+
+    def _serve(self, request):
+        if request.method not in ("GET", "HEAD") or not request.path_info.startswith(self.prefix):
+            return None
+        name = posixpath.normpath(request.path_info[len(self.prefix):]).lstrip("/")
+        variants = self.files.get(name)
+        if variants is None:
+            return None
+
+        encoding = next((enc for enc, _ in ENCODINGS if enc in variants and _accepts(request, enc)), None)
+        path, size, mtime = variants[encoding]
+        etag = f'"{size:x}-{int(mtime):x}{"-" + encoding if encoding else ""}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            if request.method == "HEAD":
+                response = HttpResponse(content_type=self._content_type(name))
+            else:
+                response = FileResponse(open(path, "rb"), content_type=self._content_type(name))
+                del response["Content-Disposition"]  # o nome no disco pode ser o da variante (.br/.gz)
+            response["Content-Length"] = str(size)
+            response["Last-Modified"] = http_date(mtime)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        if len(variants) > 1:
+            response["Vary"] = "Accept-Encoding"
+        if name in self.hashed:
+            response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            response["Cache-Control"] = "public, max-age=60"
+        return response
+
+    def _content_type(self, name):
+        content_type, _ = mimetypes.guess_type(name)
+        content_type = content_type or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+            content_type += "; charset=utf-8"
+        return content_type
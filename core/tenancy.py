@@ -0,0 +1,157 @@
+"""
+Resolução da clínica (tenant) de cada request.
+
+Ordem de resolução:
+1. Prefixo de caminho: /c/<slug>/... (o prefixo é removido de path_info e
+   entra no script prefix, então reverse() continua gerando URLs dentro dele);
+2. Subdomínio de TENANT_BASE_DOMAIN: <slug>.efeso.com.br;
+3. Clínica escolhida na sessão do usuário (SESSION_KEY);
+4. TENANT_DEFAULT_SLUG.
+
+Resolver a clínica não dá acesso a ela: as views com dados de pacientes
+conferem is_member() (o usuário é membro da clínica, ou superusuário), senão
+bastaria trocar o prefixo /c/<slug>/ para ler outra clínica.
+
+As clínicas ficam num LRU com TTL por processo, na frente do cache
+compartilhado (core.cache): com o cache quente, resolver o tenant não toca no
+banco. Salvar ou apagar uma Clinic invalida as entradas deste processo e do
+nível compartilhado (core.signals); nos demais workers o TTL local limita o
+atraso.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.urls import set_script_prefix
+
+from .cache import TwoTierCache
+from .lru import LRUCache
+from .models import Clinic
+
+SESSION_KEY = "clinic_id"
+PATH_PREFIX = "/c/"
+
+# Guardado no cache para slugs inexistentes/inativos (evita bater no banco a cada request)
+_NOT_FOUND = "not-found"
+# "Clínica" das entradas por slug: slug -> clínica não pertence a uma clínica só
+SLUGS = "slugs"
+
+clinic_cache = LRUCache(
+    maxsize=getattr(settings, "TENANT_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "TENANT_CACHE_TTL", 60),
+)
+clinics = TwoTierCache("clinic", local=clinic_cache)
+
+
+def get_clinic(slug=None, pk=None):
+    """Clínica ativa por slug ou id, via cache. None se não existir ou estiver inativa."""
+    namespace, key = (SLUGS, f"slug={slug}") if slug is not None else (pk, "detail")
+    clinic = clinics.get(namespace, key)
+    if clinic is None:
+        lookup = {"slug": slug} if slug is not None else {"pk": pk}
+        clinic = Clinic.objects.filter(active=True, **lookup).first() or _NOT_FOUND
+        clinics.set(namespace, key, clinic)
+        if clinic != _NOT_FOUND:
+            # Aquece a outra chave também
+            if slug is not None:
+                clinics.set(clinic.pk, "detail", clinic)
+            else:
+                clinics.set(SLUGS, f"slug={clinic.slug}", clinic)
+    return None if clinic == _NOT_FOUND else clinic
+
+
+def invalidate_clinic(clinic):
+    """
+    Remove a clínica do cache. Todas as entradas por slug caem junto (versão
+    nova): a clínica pode ter trocado de slug, e buscas negativas pelo slug
+    dela deixam de valer. Clínicas mudam pouco.
+    """
+    clinics.invalidate_clinic(clinic.pk)
+    clinics.invalidate_clinic(SLUGS)
+
+
+def is_member(user, clinic) -> bool:
+    """O usuário pode ver os dados de `clinic`? Superusuários veem todas."""
+    if not (user.is_authenticated and user.is_active):
+        return False
+    return user.is_superuser or Clinic.members.through.objects.filter(clinic_id=clinic.pk, user_id=user.pk).exists()
+
+
+async def ais_member(user, clinic) -> bool:
+    """is_member() com o ORM assíncrono."""
+    if not (user.is_authenticated and user.is_active):
+        return False
+    return user.is_superuser or await Clinic.members.through.objects.filter(
+        clinic_id=clinic.pk, user_id=user.pk,
+    ).aexists()
+
+
+def _slug_from_host(request):
+    base = getattr(settings, "TENANT_BASE_DOMAIN", "")
+    if not base:
+        return None
+    host = request.get_host().split(":")[0].lower()
+    suffix = "." + base.lower()
+    if host.endswith(suffix):
+        sub = host[: -len(suffix)]
+        if sub and "." not in sub and sub != "www":
+            return sub
+    return None
+
+
+def resolve_clinic(request):
+    path = request.path_info
+    if path.startswith(PATH_PREFIX):
+        slug, _, rest = path[len(PATH_PREFIX):].partition("/")
+        if slug:
+            request.path_info = "/" + rest
+            # request.path = SCRIPT_NAME + path_info
+            script_name = request.path[: len(request.path) - len(path)]
+            set_script_prefix(f"{script_name}{PATH_PREFIX}{slug}/")
+            return get_clinic(slug=slug)
+
+    slug = _slug_from_host(request)
+    if slug:
+        return get_clinic(slug=slug)
+
+    session = getattr(request, "session", None)
+    if session is not None and session.get(SESSION_KEY):
+        clinic = get_clinic(pk=session[SESSION_KEY])
+        if clinic is not None:
+            return clinic
+
+    default = getattr(settings, "TENANT_DEFAULT_SLUG", "")
+    return get_clinic(slug=default) if default else None
+
+
+class TenantMiddleware:
+    """
+    Define request.clinic (ou None). Deve vir depois de SessionMiddleware.
+    O script prefix é por thread: restauramos o original ao fim do request.
+    Funciona em WSGI e ASGI (a resolução, que pode ler sessão/banco, roda
+    em thread no modo async).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        script_name = request.path[: len(request.path) - len(request.path_info)]
+        request.clinic = resolve_clinic(request)
+        try:
+            return self.get_response(request)
+        finally:
+            set_script_prefix(script_name + "/")
+
+    async def __acall__(self, request):
+        script_name = request.path[: len(request.path) - len(request.path_info)]
+        request.clinic = await sync_to_async(resolve_clinic)(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            set_script_prefix(script_name + "/")
@@ -0,0 +1,94 @@
+"""
+Asserções sobre o plano de execução de querysets, para os testes.
+
+QueryPlanMixin.assertUsesIndex(qs, index) e assertNoSeqScan(qs) leem o
+EXPLAIN do banco de teste: FORMAT JSON no PostgreSQL, EXPLAIN QUERY PLAN no
+SQLite; nos demais bancos plan_nodes() levanta SkipTest e o teste é pulado. `index` é o nome do índice ou a
+tupla de campos de um Meta.indexes/constraints do modelo.
+
+O planejador escolhe pelas estatísticas: com meia dúzia de linhas qualquer
+banco prefere ler a tabela inteira. Popule a tabela (setUpTestData) e chame
+analyze() antes de verificar planos; o resultado vale para o banco em que o
+teste rodou (rode com o PostgreSQL para pinar os planos de produção).
+"""
+import json
+import re
+from unittest import SkipTest
+
+from django.db import connections
+
+# SQLite: "SCAN tabela", "SEARCH tabela USING [COVERING ]INDEX nome (...)"
+_SQLITE_STEP = re.compile(
+    r"\b(?P<op>SCAN|SEARCH) (?:TABLE )?(?P<table>\w+)(?: AS \w+)?"
+    r"(?: USING (?:COVERING )?INDEX (?P<index>\w+)| USING (?:INTEGER )?PRIMARY KEY)?"
+)
+
+
+def analyze(*models, using="default"):
+    """Atualiza as estatísticas do planejador para as tabelas dos modelos."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+
+def plan_nodes(queryset) -> list[dict]:
+    """
+    Nós do plano de `queryset`: {"scan": "seq"|"index", "table", "index"}.
+    SkipTest nos bancos cujo EXPLAIN não sabemos ler.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        data = json.loads(queryset.explain(format="json"))
+        # Django achata a lista do EXPLAIN: com o psycopg 3 sobra só o objeto
+        nodes, stack = [], [(data[0] if isinstance(data, list) else data)["Plan"]]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.get("Plans", ()))
+            if "Relation Name" not in node and "Index Name" not in node:
+                continue
+            nodes.append({
+                "scan": "seq" if node["Node Type"] == "Seq Scan" else "index",
+                "table": node.get("Relation Name"),
+                "index": node.get("Index Name"),
+            })
+        return nodes
+    if vendor == "sqlite":
+        nodes = []
+        for match in _SQLITE_STEP.finditer(queryset.explain()):
+            # SCAN sem índice é leitura da tabela inteira; SCAN ... USING INDEX percorre o índice
+            uses_index = match["op"] == "SEARCH" or match["index"] is not None
+            nodes.append({
+                "scan": "index" if uses_index else "seq",
+                "table": match["table"],
+                "index": match["index"],
+            })
+        return nodes
+    raise SkipTest(f"EXPLAIN só é interpretado no PostgreSQL e no SQLite, não em {vendor}.")
+
+
+def index_name(model, index) -> str:
+    """Nome do índice `index` (nome ou tupla de campos) de `model`."""
+    if isinstance(index, str):
+        return index
+    fields = list(index)
+    for candidate in (*model._meta.indexes, *model._meta.constraints):
+        if list(getattr(candidate, "fields", ())) == fields:
+            return candidate.name
+    raise ValueError(f"{model.__name__} não tem índice em {fields}.")
+
+
+class QueryPlanMixin:
+    """Para TestCase: asserções sobre o EXPLAIN (ver o docstring do módulo)."""
+
+    def assertUsesIndex(self, queryset, index, msg=None):
+        name = index_name(queryset.model, index)
+        nodes = plan_nodes(queryset)
+        if not any(node["index"] == name for node in nodes):
+            self.fail(self._formatMessage(msg, f"O plano não usa o índice {name}:\n{queryset.explain()}"))
+
+    def assertNoSeqScan(self, queryset, table=None, msg=None):
+        table = table or queryset.model._meta.db_table
+        nodes = plan_nodes(queryset)
+        if any(node["scan"] == "seq" and node["table"] == table for node in nodes):
+            self.fail(self._formatMessage(msg, f"Leitura sequencial de {table}:\n{queryset.explain()}"))
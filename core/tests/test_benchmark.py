@@ -0,0 +1,50 @@
+from django.test import TestCase
+from django.core.management import call_command
+from core.models import Clinic
+from io import StringIO
+
+
+class BenchmarkSuiteTest(TestCase):
+    def test_runs_selected_cases(self):
+        from benchmarks import suite
+
+        results = suite.run(40, only=["cpf.validate", "patient.cpf_collision", "lookup.by_cpf"], repeat=1)
+        self.assertEqual(set(results), {
+            "cpf.validate", "cpf.validate_batch", "patient.cpf_collision.clean",
+            "patient.cpf_collision.save", "lookup.by_cpf",
+        })
+        self.assertTrue(all(r["median_us"] > 0 and r["ops"] for r in results.values()))
+        # Rodadas desfeitas: o banco populado não muda
+        self.assertEqual(Clinic.objects.get(slug="benchmark-0").patients.count(), 4)
+
+    def test_compare_with_baseline(self):
+        from benchmarks import suite
+
+        def results(vendor, **cases):
+            return {"meta": {"vendor": vendor}, "results": {"10000": {
+                name: {"median_us": us} for name, us in cases.items()
+            }}}
+
+        baseline = results("sqlite", a=100.0, b=100.0, c=100.0)
+        current = results("sqlite", a=130.0, b=110.0, c=50.0, d=1.0)
+        self.assertEqual(
+            [(size, name) for size, name, *_ in suite.compare(current, baseline, 0.15)], [("10000", "a")]
+        )
+        self.assertEqual(suite.compare(results("postgresql", a=500.0), baseline, 0.15), [])
+
+    def test_latency_targets(self):
+        from benchmarks import suite
+
+        results = suite.run(40, only=["lookup.search_name"], repeat=1)
+        self.assertEqual({r["target_ms"] for r in results.values()}, {50})
+        current = {"results": {"1000000": {
+            "lookup.search_name": {"median_us": 12_000.0, "target_ms": 50},
+            "lookup.search_name_typo": {"median_us": 80_000.0, "target_ms": 50},
+            "lookup.by_cpf": {"median_us": 90_000.0},
+        }}}
+        self.assertEqual(suite.missed_targets(current), [("1000000", "lookup.search_name_typo", 50, 80.0)])
+
+    def test_list_command(self):
+        out = StringIO()
+        call_command("benchmark", list=True, only=["admin"], stdout=out)
+        self.assertEqual(out.getvalue().split(), ["admin.changelist", "admin.changelist_search"])
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import TestCase
+from core.cache import TwoTierCache
+from core.lru import LRUCache
+from core.models import Clinic
+from unittest.mock import patch
+
+
+class TwoTierCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tier = TwoTierCache("test", local=LRUCache(maxsize=2, ttl=60))
+
+    def test_reads_fill_both_tiers(self):
+        loads = []
+        load = lambda: loads.append(1) or "value"
+        self.assertEqual(self.tier.get_or_set(1, "a", load), "value")
+        self.assertEqual(self.tier.get_or_set(1, "a", load), "value")  # local
+        self.tier.local.clear()  # outro worker: só o nível compartilhado
+        self.assertEqual(self.tier.get_or_set(1, "a", load), "value")
+        self.assertEqual(len(loads), 1)
+
+        stats = self.tier.stats()
+        self.assertEqual(stats["local"]["hits"], 1)
+        self.assertEqual((stats["shared"]["hits"], stats["shared"]["misses"]), (1, 1))
+        self.assertEqual(stats["shared"]["hit_ratio"], 0.5)
+
+    def test_local_evictions_are_counted(self):
+        for key in "abc":
+            self.tier.set(1, key, key)
+        self.assertEqual(self.tier.stats()["local"]["evictions"], 1)
+        self.assertEqual(self.tier.get(1, "a"), "a")  # ainda no compartilhado
+
+    def test_invalidate_and_clinic_version(self):
+        self.tier.set(1, "a", "a1")
+        self.tier.set(1, "b", "b1")
+        self.tier.set(2, "a", "a2")
+
+        self.tier.invalidate(1, "a")
+        self.assertIsNone(self.tier.get(1, "a"))
+        self.assertEqual(self.tier.get(1, "b"), "b1")
+
+        self.tier.invalidate_clinic(1)
+        self.tier.local.clear()
+        self.assertIsNone(self.tier.get(1, "b"))
+        self.assertEqual(self.tier.get(2, "a"), "a2")
+
+    def test_shared_backend_errors_fall_through(self):
+        with patch.object(cache, "get", side_effect=ConnectionError("down")):
+            self.assertEqual(self.tier.get_or_set(1, "a", lambda: "value"), "value")
+        self.assertGreaterEqual(self.tier.stats()["shared"]["errors"], 1)
+
+    def test_clinic_update_invalidates_tenant_cache(self):
+        from core.tenancy import get_clinic
+
+        clinic = Clinic.objects.create(name="Default", slug="default")
+        self.assertEqual(get_clinic(slug="default"), clinic)
+        with self.captureOnCommitCallbacks(execute=True):
+            Clinic.objects.filter(pk=clinic.pk).update(active=False)
+        self.assertIsNone(get_clinic(slug="default"))
+        self.assertIsNone(get_clinic(pk=clinic.pk))
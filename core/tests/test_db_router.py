@@ -0,0 +1,66 @@
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from core import db_router
+from core.models import Clinic
+import contextvars
+from unittest.mock import patch
+
+
+@override_settings(DATABASE_REPLICAS=["replica", "replica2"], REPLICA_MAX_LAG_SECONDS=5, REPLICA_STICKY_SECONDS=10)
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        db_router.lag_cache.clear()
+        self.router = db_router.PrimaryReplicaRouter()
+        self.lags = {"replica": 0.1, "replica2": 60}
+
+    def read(self, model=Clinic):
+        # Contexto novo: sem o pin de escritas anteriores, fora da transação do teste
+        with patch.object(db_router, "replica_lag", side_effect=self.lags.get), \
+                patch.object(db_router.connections[db_router.PRIMARY], "in_atomic_block", False):
+            return contextvars.Context().run(self.router.db_for_read, model)
+
+    def test_reads_go_to_healthy_replica(self):
+        from patients.models import PatientCounter
+        self.assertEqual(self.read(), "replica")
+        self.assertEqual(self.read(PatientCounter), "default")  # modelo não roteado
+        self.lags["replica"] = float("inf")
+        self.assertEqual(self.read(), "default")
+
+    def test_write_pins_context_to_primary(self):
+        def write_then_read():
+            self.assertEqual(self.router.db_for_write(Clinic), "default")
+            return self.router.db_for_read(Clinic)
+
+        with patch.object(db_router, "replica_lag", side_effect=self.lags.get), \
+                patch.object(db_router.connections[db_router.PRIMARY], "in_atomic_block", False):
+            self.assertEqual(contextvars.Context().run(write_then_read), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "patients"))
+
+    def test_lag_is_cached_and_errors_mark_replica_unhealthy(self):
+        with patch.object(db_router, "measure_lag", side_effect=DatabaseError("down")) as measure:
+            self.assertEqual(db_router.replica_lag("replica"), float("inf"))
+            db_router.replica_lag("replica")
+        self.assertEqual(measure.call_count, 1)
+
+    def test_middleware_sets_sticky_cookie_after_write(self):
+        factory = RequestFactory()
+
+        def writes(request):
+            self.router.db_for_write(Clinic)
+            return HttpResponse()
+
+        def reads(request):
+            return HttpResponse(str(db_router._pinned.get()))
+
+        def run(view, request):
+            return contextvars.Context().run(db_router.PrimaryStickinessMiddleware(view), request)
+
+        response = run(writes, factory.post("/"))
+        cookie = response.cookies[db_router.PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+
+        request = factory.get("/")
+        request.COOKIES[db_router.PIN_COOKIE] = cookie.value
+        self.assertEqual(run(reads, request).content, b"True")
+        self.assertEqual(run(reads, factory.get("/")).content, b"False")
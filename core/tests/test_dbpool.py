@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from core.dbpool import pool_stats
+from unittest.mock import patch
+
+
+class DbPoolStatsTest(TestCase):
+    def test_derived_pool_metrics(self):
+        stats = {
+            "pool_min": 2, "pool_max": 10, "pool_size": 8, "pool_available": 3,
+            "requests_num": 200, "requests_queued": 20, "requests_wait_ms": 500,
+        }
+        pooled = type("Conn", (), {
+            "settings_dict": {"OPTIONS": {"pool": {"max_size": 10}}},
+            "pool": type("Pool", (), {"max_size": 10, "get_stats": lambda self: stats})(),
+        })()
+        with patch("core.dbpool.connections", {"pg": pooled, "default": connection}):
+            result = pool_stats("pg")
+            self.assertIsNone(pool_stats("default"))
+        self.assertEqual(result["in_use"], 5)
+        self.assertEqual(result["saturation"], 0.5)
+        self.assertEqual(result["queued_ratio"], 0.1)
+        self.assertEqual(result["avg_wait_ms"], 25.0)
+
+    def test_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get("/internal/db-pool-stats/").status_code, 302)
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/internal/db-pool-stats/").json(), {"pools": {}})
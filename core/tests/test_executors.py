@@ -0,0 +1,24 @@
+from django.test import TestCase
+import os
+from unittest.mock import patch
+
+
+class ExecutorsTest(TestCase):
+    def test_single_worker_runs_inline(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        from core.executors import InlineExecutor, process_pool
+
+        executor, workers = process_pool(1)
+        with executor:
+            self.assertIsInstance(executor, InlineExecutor)
+            self.assertEqual(executor.submit(os.getpid).result(), os.getpid())
+        self.assertEqual(workers, 1)
+        pool, workers = process_pool(2)
+        self.assertIsInstance(pool, ProcessPoolExecutor)
+        self.assertEqual(workers, 2)
+        pool.shutdown()
+        with patch("os.cpu_count", return_value=3):
+            pool, workers = process_pool(None)
+        self.assertEqual(workers, 3)
+        pool.shutdown()
@@ -0,0 +1,103 @@
+from django.db import DatabaseError
+from django.test import TestCase
+from django.core.management import call_command, CommandError
+from core.models import Clinic, JobCheckpoint
+from io import StringIO
+import csv
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+
+class ImportPatientsCommandTest(TestCase):
+    def setUp(self):
+        from patients.models import Patient
+        self.Patient = Patient
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(content)
+        return path
+
+    def test_imports_csv_and_rejects_invalid_rows(self):
+        path = self.write("patients.csv", (
+            "full_name,cpf,birth_date,state\n"
+            "Ana,111.444.777-35,01/02/1990,sp\n"
+            "Bruno,12345678900,,\n"
+            ",12345678909,,\n"
+            "Carla,,1985-05-05,RJ\n"
+        ))
+        out = StringIO()
+        call_command("import_patients", path, clinic="clinic-a", stdout=out)
+
+        self.assertEqual(self.Patient.objects.filter(clinic=self.clinic).count(), 2)
+        ana = self.Patient.objects.get(full_name="Ana")
+        self.assertEqual(ana.cpf, "11144477735")
+        self.assertEqual(ana.state, "SP")
+        self.assertEqual(str(ana.birth_date), "1990-02-01")
+        self.assertIn("2 rejected", out.getvalue())
+
+        with open(path + ".rejects.csv", encoding="utf-8") as fh:
+            rejects = list(csv.DictReader(fh))
+        self.assertEqual([r["record"] for r in rejects], ["2", "3"])
+        self.assertIn("CPF inválido", rejects[0]["reason"])
+
+    def test_skips_existing_and_repeated_cpfs(self):
+        # Registro legado ainda mascarado
+        self.Patient.objects.bulk_create([
+            self.Patient(clinic=self.clinic, full_name="Legacy", cpf="111.444.777-35"),
+        ])
+        path = self.write("patients.jsonl", "\n".join([
+            json.dumps({"full_name": "Dup legacy", "cpf": "11144477735"}),
+            json.dumps({"full_name": "New", "cpf": "123.456.789-09"}),
+            json.dumps({"full_name": "New again", "cpf": "12345678909"}),
+            "not json",
+        ]))
+        out = StringIO()
+        call_command("import_patients", path, clinic="clinic-a", batch_size=2, stdout=out)
+
+        self.assertEqual(self.Patient.objects.filter(clinic=self.clinic).count(), 2)
+        self.assertIn("2 duplicates skipped, 1 rejected", out.getvalue())
+
+    def test_checkpoint_makes_rerun_a_noop_and_resumes(self):
+        path = self.write("patients.csv", "full_name,cpf\nAna,\nBia,\nCau,\n")
+        call_command("import_patients", path, clinic="clinic-a", stdout=StringIO())
+        out = StringIO()
+        call_command("import_patients", path, clinic="clinic-a", stdout=out)
+        self.assertIn("already imported", out.getvalue())
+        self.assertEqual(self.Patient.objects.count(), 3)
+
+        # Simula uma execução interrompida após o segundo registro
+        JobCheckpoint.objects.filter(job="import_patients").update(last_pk=2, done=False)
+        call_command("import_patients", path, clinic="clinic-a", stdout=StringIO())
+        self.assertEqual(self.Patient.objects.filter(full_name="Cau").count(), 2)
+        self.assertEqual(self.Patient.objects.filter(full_name="Ana").count(), 1)
+
+    def test_failed_batch_does_not_advance_checkpoint(self):
+        path = self.write("patients.csv", "full_name,cpf\nAna,\nBia,\nCau,\n")
+        real_save, saves = JobCheckpoint.save, []
+
+        def save(checkpoint, *args, **kwargs):
+            saves.append(checkpoint.last_pk)
+            if len(saves) == 3:  # criação, 1º lote, 2º lote
+                raise DatabaseError("crash")
+            return real_save(checkpoint, *args, **kwargs)
+
+        with patch.object(JobCheckpoint, "save", save):
+            with self.assertRaises(DatabaseError):
+                call_command("import_patients", path, clinic="clinic-a", batch_size=2, stdout=StringIO())
+        # O INSERT do segundo lote foi desfeito junto com o checkpoint: retomar não duplica ninguém
+        self.assertEqual(self.Patient.objects.count(), 2)
+        call_command("import_patients", path, clinic="clinic-a", batch_size=2, stdout=StringIO())
+        self.assertEqual(sorted(self.Patient.objects.values_list("full_name", flat=True)), ["Ana", "Bia", "Cau"])
+
+    def test_unknown_clinic_fails(self):
+        path = self.write("patients.csv", "full_name\nAna\n")
+        with self.assertRaises(CommandError):
+            call_command("import_patients", path, clinic="missing")
@@ -0,0 +1,62 @@
+from django.test import TestCase
+import asyncio
+
+
+class LoadHarnessTest(TestCase):
+    def test_percentiles(self):
+        from benchmarks.httpclient import percentile, summarize
+
+        values = [i / 1000 for i in range(1, 101)]
+        self.assertEqual([percentile(values, q) for q in (50, 95, 99, 100)], [0.05, 0.095, 0.099, 0.1])
+        stats = summarize(list(reversed(values)), 2, 10)
+        self.assertEqual((stats["requests"], stats["errors"], stats["rps"]), (100, 2, 10.0))
+        self.assertAlmostEqual(stats["p95_ms"], 95.0)
+        self.assertEqual(summarize([], 0, 1)["p99_ms"], 0.0)
+
+    def test_client_keep_alive_chunked_and_cookies(self):
+        from benchmarks.httpclient import HttpClient
+
+        requests = []
+        finished = None
+
+        async def handle(reader, writer):
+            while line := await reader.readline():
+                headers = []
+                while (header := await reader.readline()) != b"\r\n":
+                    headers.append(header.decode().strip())
+                requests.append((line.decode().split()[1], headers))
+                if len(requests) == 1:
+                    writer.write(b"HTTP/1.1 200 OK\r\nSet-Cookie: sessionid=abc; Path=/\r\n"
+                                 b"Transfer-Encoding: chunked\r\n\r\n3\r\nfoo\r\n3\r\nbar\r\n0\r\n\r\n")
+                else:
+                    writer.write(b"HTTP/1.1 302 Found\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+            finished.set()
+
+        async def run():
+            nonlocal finished
+            finished = asyncio.Event()
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            client = HttpClient(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}")
+            first = await client.get("/a", {"q": "x y"})
+            second = await client.get("/b")
+            client.close()
+            # O handler sai no EOF; sem esperar por ele, asyncio.run() o cancelaria no meio do readline()
+            await asyncio.wait_for(finished.wait(), 5)
+            server.close()
+            await server.wait_closed()
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual((first.status, first.text, second.status, second.body), (200, "foobar", 302, b"ok"))
+        self.assertEqual(requests[0][0], "/a?q=x+y")
+        self.assertIn("Cookie: sessionid=abc", requests[1][1])
+
+    def test_mix(self):
+        from benchmarks.load import MIX, parse_mix
+
+        self.assertEqual(parse_mix("create=0,home=5"), {**MIX, "create": 0.0, "home": 5.0})
+        with self.assertRaises(SystemExit):
+            parse_mix("nope=1")
@@ -0,0 +1,20 @@
+from django.core.cache import cache
+from django.test import TestCase
+from core.lru import LRUCache
+
+
+class LRUCacheTest(TestCase):
+    def test_ttl_eviction_and_stats(self):
+        now = [0.0]
+        cache = LRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "a" vira o mais recente
+        cache.set("c", 3)                    # remove "b"
+        self.assertIsNone(cache.get("b"))
+        now[0] = 11
+        self.assertIsNone(cache.get("a"))    # expirou
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["expirations"], 1)
@@ -0,0 +1,108 @@
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from core import metrics
+from core.metrics import MetricsMiddleware, registry
+from core.models import Clinic
+from core.tenancy import clinic_cache
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        clinic = Clinic.objects.create(name="Default", slug="default")
+        for metric in registry.metrics.values():
+            metric.values.clear()
+        self.staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        self.staff.clinics.add(clinic)
+
+    def metrics(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/metrics")
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        return response.content.decode()
+
+    async def test_async_view_latency_and_queries(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get("/pacientes/")
+        self.assertEqual(response.status_code, 200)
+        series = registry.metrics["efeso_db_queries_per_request"].values[("patient_list",)]
+        self.assertGreater(series[-2], 0)  # queries feitas dentro de sync_to_async
+        self.assertEqual(series[-1], 1)
+
+    def test_exposition_format(self):
+        self.client.force_login(self.staff)
+        self.client.get("/pacientes/")
+        text = self.metrics()
+        self.assertIn("# TYPE efeso_http_request_duration_seconds histogram", text)
+        self.assertIn('efeso_http_request_duration_seconds_bucket{view="patient_list",method="GET",status="200",le="+Inf"} 1', text)
+        self.assertIn('efeso_http_request_duration_seconds_count{view="patient_list",method="GET",status="200"} 1', text)
+        self.assertRegex(text, r'efeso_db_query_seconds_total\{view="patient_list"\} [0-9.e-]+')
+
+    def test_detects_repeated_queries(self):
+        def view(request):
+            for pk in range(6):
+                list(Clinic.objects.filter(pk=pk))
+            return HttpResponse()
+
+        request = RequestFactory().get("/x/")
+        request.resolver_match = type("Match", (), {"view_name": "n_plus_one"})()
+        with self.assertLogs("core.metrics", "WARNING") as logs:
+            MetricsMiddleware(view)(request)
+        self.assertIn("N+1 em n_plus_one: 6 x SELECT", logs.output[0])
+        self.assertEqual(registry.metrics["efeso_db_duplicate_queries_total"].values[("n_plus_one",)], 5)
+        self.assertEqual(registry.metrics["efeso_db_n_plus_one_total"].values[("n_plus_one",)], 1)
+
+    def test_sums_worker_processes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        histogram = registry.metrics["efeso_http_request_duration_seconds"]
+        histogram.observe(("home", "GET", "200"), 0.02)
+
+        def worker():
+            registry.check_fork()  # o filho começa do zero, sem os números do pai
+            histogram.observe(("home", "GET", "200"), 3.0)
+            registry.flush(directory, force=True)
+
+        process = multiprocessing.get_context("fork").Process(target=worker)
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+
+        merged = registry.collect(directory)["efeso_http_request_duration_seconds"][("home", "GET", "200")]
+        self.assertEqual(merged[-1], 2)
+        self.assertAlmostEqual(merged[-2], 3.02)
+        self.assertEqual(merged[2] + merged[9], 2)  # faixas de 0.025 e 5.0
+
+    def test_retired_worker_files_are_merged_and_removed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counter = registry.metrics["efeso_db_n_plus_one_total"]
+
+        def worker():
+            registry.check_fork()
+            counter.inc(("home",), 2)
+            registry.flush(directory, force=True)
+
+        for _ in range(2):
+            process = multiprocessing.get_context("fork").Process(target=worker)
+            process.start()
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+            metrics.retire_process(directory, process.pid)
+
+        self.assertEqual(os.listdir(directory), [metrics.EXITED_FILENAME])
+        self.assertEqual(registry.collect(directory)["efeso_db_n_plus_one_total"][("home",)], 4)
+
+    def test_endpoint_access(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(self.client.get("/metrics", headers={"authorization": "Bearer nope"}).status_code, 403)
+            self.assertEqual(self.client.get("/metrics", headers={"authorization": "Bearer s3cret"}).status_code, 200)
+        self.assertIn("efeso_db_n_plus_one_total", self.metrics())
@@ -6,6 +6,7 @@ from io import StringIO
 import os
 from unittest.mock import patch
 
+
 class CreateInitialTenantTest(TestCase):
     def setUp(self):
         Clinic.objects.all().delete()
@@ -52,6 +53,7 @@ class CreateInitialTenantTest(TestCase):
              call_command('create_initial_tenant')
         self.assertIn("User 'admin' exists but is not a superuser", str(cm.exception))
 
+
 class ClinicModelTest(TestCase):
     def test_clinic_str(self):
         """Test that the string representation of a Clinic is its name."""
@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from core.pagination import InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor
+from core.models import Clinic
+
+
+class KeysetPaginatorTest(TestCase):
+    def setUp(self):
+        from patients.models import Patient
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        names = ["Ana", "Bruno", "Bruno", "Carla", "Davi", "Maria", "Mário"]
+        Patient.objects.bulk_create([Patient(clinic=self.clinic, full_name=n) for n in names])
+        self.qs = Patient.objects.for_clinic(self.clinic).summary()
+        self.expected = list(self.qs.order_by("full_name", "id"))
+
+    def test_walks_forward_and_back_without_offset(self):
+        paginator = KeysetPaginator(self.qs, "full_name", per_page=3)
+        pages, cursor = [], None
+        with CaptureQueriesContext(connection) as ctx:
+            while True:
+                page = paginator.page(cursor)
+                pages.append(list(page))
+                if not page.has_next:
+                    break
+                cursor = page.next_cursor
+        self.assertEqual([r for p in pages for r in p], self.expected)
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertFalse(any("OFFSET" in q["sql"] for q in ctx.captured_queries))
+
+        back = paginator.page(page.previous_cursor)
+        self.assertEqual(list(back), pages[1])
+        first = paginator.page(back.previous_cursor)
+        self.assertEqual(list(first), pages[0])
+        self.assertFalse(first.has_previous)
+
+    def test_letter_jump_and_bad_cursor(self):
+        page = KeysetPaginator(self.qs, "full_name", per_page=3).page(start="M")
+        self.assertEqual([r.full_name for r in page], ["Maria", "Mário"])
+        self.assertTrue(page.has_previous)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("não-é-cursor")
+
+    def test_cursor_value_and_pk_types_are_validated(self):
+        paginator = KeysetPaginator(self.qs, "full_name", per_page=3)
+        for direction, value, pk in [("n", None, 1), ("p", None, 1), ("n", ["Ana"], 1), ("n", {}, 1), ("n", "Ana", True)]:
+            with self.subTest(value=value, pk=pk), self.assertRaises(InvalidCursor):
+                paginator.page(encode_cursor(direction, value, pk))
+        self.assertEqual(decode_cursor(encode_cursor("p", "Ana", 1)), ("p", "Ana", 1))
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from core import slowqueries
+from core.models import Clinic, SlowQuery
+from core.tenancy import clinic_cache
+
+
+class SlowQueryTest(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        slowqueries._explained.clear()
+        slowqueries._pending.clear()
+        self.clinic = Clinic.objects.create(name="Default", slug="default")
+
+    def test_request_queries_are_stored_with_view_and_plan(self):
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        staff.clinics.add(self.clinic)
+        self.client.force_login(staff)
+        with override_settings(SLOW_QUERY_MS=1e-9):
+            self.client.get("/pacientes/")
+        entries = SlowQuery.objects.filter(source="patient_list")
+        self.assertTrue(entries)
+        entry = entries.filter(sql__contains='FROM "core_clinic"').first()
+        self.assertEqual(entry.database, "default")
+        self.assertIn("core_clinic", entry.plan)
+
+    def test_outside_requests_uses_command_and_explains_once(self):
+        with override_settings(SLOW_QUERY_MS=1e-9):
+            list(Clinic.objects.filter(slug="x"))
+            list(Clinic.objects.filter(slug="y"))
+        # Dentro da transação do teste: fica pendente até o flush
+        self.assertFalse(SlowQuery.objects.exists())
+        slowqueries.flush()
+        first, second = SlowQuery.objects.filter(sql__contains='"core_clinic"."slug" =').order_by("pk")
+        self.assertEqual(first.source, "command:test")
+        self.assertEqual(first.fingerprint, second.fingerprint)
+        self.assertTrue(first.plan)
+        self.assertEqual(second.plan, "")  # mesmo SQL: EXPLAIN só uma vez por intervalo
+
+    def test_disabled_or_fast(self):
+        with override_settings(SLOW_QUERY_MS=0):
+            list(Clinic.objects.all())
+        with override_settings(SLOW_QUERY_MS=60_000):
+            list(Clinic.objects.all())
+        slowqueries.flush()
+        self.assertFalse(SlowQuery.objects.exists())
@@ -0,0 +1,76 @@
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from core import startup
+from io import StringIO
+import shutil
+import tempfile
+from unittest.mock import patch
+
+
+class StartupTest(TestCase):
+    def test_wait_for_db_backs_off_until_connected(self):
+        delays = []
+        failures = [OperationalError("refused"), OperationalError("refused"), None]
+        with patch.object(connection, "ensure_connection", side_effect=failures), patch.object(connection, "close"):
+            attempts = startup.wait_for_db(timeout=10, delay=0.1, sleep=delays.append)
+        self.assertEqual(attempts, 3)
+        self.assertEqual(delays, [0.1, 0.2])
+
+    def test_wait_for_db_gives_up_after_timeout(self):
+        with patch.object(connection, "ensure_connection", side_effect=OperationalError("refused")), \
+                patch.object(connection, "close"):
+            with self.assertRaises(OperationalError):
+                startup.wait_for_db(timeout=0, sleep=lambda s: None)
+
+    def test_migrate_skipped_when_up_to_date(self):
+        with patch("core.startup.call_command") as call:
+            self.assertFalse(startup.migrate())
+        call.assert_not_called()
+
+    def test_migrate_rechecks_plan_under_lock(self):
+        with patch("core.startup.pending_migrations", side_effect=[["0001"], []]), \
+                patch("core.startup.call_command") as call:
+            self.assertFalse(startup.migrate())  # outra réplica aplicou enquanto esperávamos
+        call.assert_not_called()
+        with patch("core.startup.pending_migrations", side_effect=[["0001"], ["0001"]]), \
+                patch("core.startup.call_command") as call:
+            self.assertTrue(startup.migrate())
+        call.assert_called_once()
+
+    def test_migration_lock_polls_until_timeout(self):
+        cursor = connection.cursor()
+        with patch.object(connection, "vendor", "postgresql"), \
+                patch.object(connection, "cursor", return_value=cursor), \
+                patch.object(cursor, "execute") as execute, \
+                patch.object(cursor, "fetchone", side_effect=[(False,), (False,), (True,), (True,)]):
+            delays = []
+            with startup.migration_lock(timeout=10, poll=0.5, sleep=delays.append):
+                pass
+            self.assertEqual(delays, [0.5, 0.5])
+            self.assertIn("pg_try_advisory_lock", execute.call_args_list[0].args[0])
+            self.assertIn("pg_advisory_unlock", execute.call_args_list[-1].args[0])
+
+            cursor.fetchone.side_effect = None
+            cursor.fetchone.return_value = (False,)
+            with self.assertRaises(startup.MigrationLockTimeout):
+                with startup.migration_lock(timeout=0, sleep=lambda s: None):
+                    self.fail("lock não deveria ter sido obtido")
+
+    def test_collectstatic_only_when_fingerprint_changes(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(STATIC_ROOT=root), patch("core.startup.call_command") as call:
+            self.assertTrue(startup.collectstatic())
+            self.assertFalse(startup.collectstatic())
+            with patch("core.startup.static_fingerprint", return_value="changed"):
+                self.assertTrue(startup.collectstatic())
+        self.assertEqual(call.call_count, 2)
+
+    def test_command_reports_phases(self):
+        out = StringIO()
+        call_command("startup", skip_collectstatic=True, stdout=out)
+        output = out.getvalue()
+        self.assertIn("skipped (up to date)", output)
+        self.assertIn("disabled", output)
+        self.assertIn("Startup ready in", output)
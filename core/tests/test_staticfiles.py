@@ -0,0 +1,76 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.core.management import call_command
+from core import startup
+from core.staticfiles import StaticFilesMiddleware
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+
+class StaticFilesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # collectstatic uma vez só (brotli no nível máximo é lento nos JS do admin)
+        cls.root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.root)
+        with override_settings(STATIC_ROOT=cls.root):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            cls.middleware = StaticFilesMiddleware(lambda request: HttpResponse("app"))
+        with open(os.path.join(cls.root, "staticfiles.json")) as f:
+            cls.hashed = json.load(f)["paths"]["ui/css/base.css"]
+
+    def get(self, path, **headers):
+        return self.middleware(RequestFactory().get(path, headers=headers))
+
+    def test_collectstatic_writes_hashed_and_precompressed_files(self):
+        self.assertRegex(self.hashed, r"^ui/css/base\.[0-9a-f]{12}\.css$")
+        for name in (self.hashed, "ui/css/base.css"):
+            self.assertTrue(os.path.exists(os.path.join(self.root, name + ".gz")))
+            self.assertTrue(os.path.exists(os.path.join(self.root, name + ".br")))
+
+    def test_serves_variant_by_accept_encoding(self):
+        response = self.get(f"/static/{self.hashed}", accept_encoding="gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertIn("immutable", response["Cache-Control"])
+
+        response = self.get(f"/static/{self.hashed}", accept_encoding="gzip, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        response = self.get(f"/static/{self.hashed}")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header("Content-Disposition"))
+        self.assertIn(b"--gold", b"".join(response.streaming_content))
+        response.close()
+
+        # Nome sem hash: cache curto
+        self.assertEqual(self.get("/static/ui/css/base.css")["Cache-Control"], "public, max-age=60")
+
+    def test_conditional_and_fallthrough(self):
+        etag = self.get(f"/static/{self.hashed}")["ETag"]
+        self.assertEqual(self.get(f"/static/{self.hashed}", if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get("/static/missing.css").content, b"app")
+        self.assertEqual(self.get("/static/../manage.py").content, b"app")
+        self.assertEqual(self.get("/pacientes/").content, b"app")
+
+    def test_head_does_not_open_the_file(self):
+        size = os.path.getsize(os.path.join(self.root, self.hashed))
+        with patch("builtins.open", side_effect=AssertionError("HEAD abriu o arquivo")):
+            response = self.middleware(RequestFactory().head(f"/static/{self.hashed}"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(size))
+        self.assertEqual(response.content, b"")
+
+    def test_manifest_and_fingerprint_are_not_served(self):
+        with open(os.path.join(self.root, startup.STATIC_FINGERPRINT_FILE), "w") as f:
+            f.write("abc")
+        with override_settings(STATIC_ROOT=self.root):
+            middleware = StaticFilesMiddleware(lambda request: HttpResponse("app"))
+        for name in ("staticfiles.json", startup.STATIC_FINGERPRINT_FILE):
+            response = middleware(RequestFactory().get(f"/static/{name}"))
+            self.assertEqual(response.content, b"app")
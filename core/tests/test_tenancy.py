@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from core.models import Clinic
+from core.tenancy import TenantMiddleware, clinic_cache
+
+
+@override_settings(TENANT_BASE_DOMAIN="efeso.test", TENANT_DEFAULT_SLUG="default",
+                   ALLOWED_HOSTS=[".efeso.test", "testserver"])
+class TenantMiddlewareTest(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.default = Clinic.objects.create(name="Default", slug="default")
+        self.ipro = Clinic.objects.create(name="IPRO", slug="ipro")
+        self.factory = RequestFactory()
+
+    def resolve(self, path="/", **extra):
+        request = self.factory.get(path, **extra)
+        request.session = {}
+        TenantMiddleware(lambda r: None)(request)
+        return request
+
+    def test_resolution_order(self):
+        self.assertEqual(self.resolve().clinic, self.default)
+        self.assertEqual(self.resolve(HTTP_HOST="ipro.efeso.test").clinic, self.ipro)
+
+        request = self.resolve("/c/ipro/pacientes/", HTTP_HOST="other.efeso.test")
+        self.assertEqual(request.clinic, self.ipro)
+        self.assertEqual(request.path_info, "/pacientes/")
+
+        request = self.factory.get("/")
+        request.session = {"clinic_id": self.ipro.pk}
+        TenantMiddleware(lambda r: None)(request)
+        self.assertEqual(request.clinic, self.ipro)
+
+        self.assertIsNone(self.resolve(HTTP_HOST="missing.efeso.test").clinic)
+
+    def test_warm_requests_do_not_query(self):
+        self.resolve(HTTP_HOST="ipro.efeso.test")
+        self.resolve(HTTP_HOST="missing.efeso.test")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve(HTTP_HOST="ipro.efeso.test").clinic, self.ipro)
+            self.assertIsNone(self.resolve(HTTP_HOST="missing.efeso.test").clinic)
+        self.assertGreaterEqual(clinic_cache.stats()["hits"], 2)
+
+    def test_save_and_deactivation_invalidate(self):
+        self.resolve(HTTP_HOST="ipro.efeso.test")
+        self.ipro.name = "IPRO Centro"
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.ipro.save()
+        # Até o commit vale a versão confirmada
+        self.assertEqual(self.resolve(HTTP_HOST="ipro.efeso.test").clinic.name, "IPRO")
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.resolve(HTTP_HOST="ipro.efeso.test").clinic.name, "IPRO Centro")
+
+        self.ipro.active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ipro.save()
+        self.assertIsNone(self.resolve(HTTP_HOST="ipro.efeso.test").clinic)
+
+        # Busca negativa também é invalidada quando a clínica passa a existir
+        self.assertIsNone(self.resolve(HTTP_HOST="nova.efeso.test").clinic)
+        with self.captureOnCommitCallbacks(execute=True):
+            Clinic.objects.create(name="Nova", slug="nova")
+        self.assertEqual(self.resolve(HTTP_HOST="nova.efeso.test").clinic.slug, "nova")
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get("/internal/cache-stats/").status_code, 302)
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get("/internal/cache-stats/").json()
+        self.assertIn("hits", data["tenant_clinics"])
@@ -0,0 +1,42 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+from .cache import all_cache_stats
+from .dbpool import all_pool_stats
+from .metrics import CONTENT_TYPE, registry
+from .tenancy import clinic_cache
+
+
+@staff_member_required
+def cache_stats(request):
+    """
+    Contadores dos caches deste processo (cada worker do gunicorn tem os seus).
+    `detail`: caches de dois níveis (core.cache), com hits/despejos por nível.
+    """
+    return JsonResponse({
+        "tenant_clinics": clinic_cache.stats(),
+        "detail": all_cache_stats(),
+    })
+
+
+@staff_member_required
+def db_pool_stats(request):
+    """Pools de conexão deste processo: espera, fila e saturação por alias."""
+    return JsonResponse({"pools": all_pool_stats()})
+
+
+def metrics(request):
+    """
+    Métricas de todos os workers (core.metrics) para o Prometheus. Com
+    METRICS_TOKEN, exige "Authorization: Bearer <token>"; sem ele, só staff.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        header = request.headers.get("Authorization", "")
+        if not constant_time_compare(header, f"Bearer {token}"):
+            return HttpResponseForbidden()
+    elif not (request.user.is_active and request.user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
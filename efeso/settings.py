@@ -25,10 +25,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.staticfiles.StaticFilesMiddleware",
+    "core.metrics.MetricsMiddleware",
+    "core.slowqueries.SlowQueryMiddleware",
+    "core.db_router.PrimaryStickinessMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.tenancy.TenantMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -56,7 +61,7 @@ if os.getenv("USE_SQLITE") == "1":
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv("SQLITE_NAME", BASE_DIR / "db.sqlite3"),
         }
     }
 else:
@@ -73,9 +78,59 @@ else:
                 else int(os.getenv("CONN_MAX_AGE")) if os.getenv("CONN_MAX_AGE", "").isdigit()
                 else 600
             ),
+            "OPTIONS": {},
         }
     }
 
+    # Pool de conexões (psycopg 3 + psycopg_pool) por processo: N threads de
+    # um worker dividem até DB_POOL_MAX_SIZE conexões. Estatísticas em
+    # /internal/db-pool-stats/ (core.views.db_pool_stats).
+    if os.getenv("DB_POOL", "0") == "1":
+        DATABASES["default"]["CONN_MAX_AGE"] = 0  # o pool é quem mantém as conexões
+        # Checagem (SELECT 1) a cada checkout: conexões mortas são descartadas
+        DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            # Espera máxima por uma conexão livre antes de erro (PoolTimeout)
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            # Conexões ociosas são fechadas (até min_size) e recicladas periodicamente
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        }
+
+    # Atrás do pgbouncer em modo transaction: sem prepared statements nem
+    # cursores do lado do servidor (não sobrevivem à troca de conexão).
+    if os.getenv("DB_PGBOUNCER", "0") == "1":
+        DATABASES["default"]["OPTIONS"]["prepare_threshold"] = None
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Réplicas de leitura (opcional): ver core/db_router.py.
+# PostgreSQL: POSTGRES_REPLICA_HOSTS=host1,host2:5433 (mesmo banco/usuário do primário).
+# SQLite (dev): SQLITE_REPLICA_NAME=/caminho/replica.sqlite3 (uma cópia do db.sqlite3).
+DATABASE_REPLICAS = []
+if os.getenv("USE_SQLITE") == "1":
+    _replica_hosts = [os.getenv("SQLITE_REPLICA_NAME")] if os.getenv("SQLITE_REPLICA_NAME") else []
+else:
+    _replica_hosts = [h.strip() for h in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if h.strip()]
+for _i, _host in enumerate(_replica_hosts, start=1):
+    _alias = "replica" if _i == 1 else f"replica{_i}"
+    if os.getenv("USE_SQLITE") == "1":
+        DATABASES[_alias] = {**DATABASES["default"], "NAME": _host}
+    else:
+        _host, _, _port = _host.partition(":")
+        DATABASES[_alias] = {**DATABASES["default"], "HOST": _host, "PORT": _port or DATABASES["default"]["PORT"]}
+    # Cópia própria de OPTIONS (cada alias tem o seu pool); nos testes a réplica é o próprio banco de teste
+    DATABASES[_alias]["OPTIONS"] = dict(DATABASES["default"].get("OPTIONS", {}))
+    DATABASES[_alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+REPLICA_ROUTED_MODELS = ["patients.patient", "core.clinic"]
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -88,8 +143,52 @@ TIME_ZONE = "America/Sao_Paulo"
 USE_I18N = True
 USE_TZ = True
 
+# Multi-tenant: ver core/tenancy.py
+TENANT_BASE_DOMAIN = os.getenv("TENANT_BASE_DOMAIN", "")  # ex.: efeso.com.br -> <slug>.efeso.com.br
+TENANT_DEFAULT_SLUG = os.getenv("INITIAL_CLINIC_SLUG", "default")
+TENANT_CACHE_TTL = int(os.getenv("TENANT_CACHE_TTL", "60"))
+TENANT_CACHE_SIZE = int(os.getenv("TENANT_CACHE_SIZE", "1024"))
+
+# Cache compartilhado entre workers/réplicas (nível 2 de core.cache).
+# Sem REDIS_URL, LocMem: cada processo tem o seu (dev e testes).
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "efeso",
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "efeso"}}
+# Nível 1 (LRU por processo) dos caches de detalhe; o TTL limita quanto um
+# worker pode ver um dado que outro worker alterou.
+CACHE_LOCAL_SIZE = int(os.getenv("CACHE_LOCAL_SIZE", "2048"))
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "5"))
+CACHE_SHARED_TTL = int(os.getenv("CACHE_SHARED_TTL", "300"))
+
+# Métricas por view (core.metrics) em /metrics. METRICS_DIR: diretório comum
+# aos workers do gunicorn (o gunicorn.conf.py define um padrão); sem ele, só
+# o processo atual. Sem METRICS_TOKEN, /metrics só para staff logado.
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv("METRICS_N_PLUS_ONE_THRESHOLD", "5"))
+
+# Queries lentas (core.slowqueries): acima de SLOW_QUERY_MS vão para o admin
+# (Queries lentas) com o EXPLAIN e a view/comando de origem. 0 desliga.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1"))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# Nomes com hash + .gz/.br gerados no collectstatic; servidos por
+# core.staticfiles.StaticFilesMiddleware (ver core/staticfiles.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage"},
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
+from core import views as core_views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("internal/cache-stats/", core_views.cache_stats, name="cache_stats"),
+    path("internal/db-pool-stats/", core_views.db_pool_stats, name="db_pool_stats"),
+    path("metrics", core_views.metrics, name="metrics"),
     path("", include("ui.urls")),  # raiz do site -> UI
 ]
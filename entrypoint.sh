@@ -3,26 +3,15 @@
 # Exit immediately if a command exits with a non-zero status
 set -e
 
-# Wait for Postgres
-echo "Waiting for postgres..."
-while ! nc -z $POSTGRES_HOST $POSTGRES_PORT; do
-  sleep 0.1
-done
-echo "PostgreSQL started"
-
-# Apply database migrations
-echo "Applying database migrations..."
-python manage.py migrate
-
-# Collect static files
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
-
 # Prevent runserver
 if echo "$@" | grep -q "runserver"; then
     echo "Error: 'runserver' is disabled. Use 'gunicorn' or another production server."
     exit 1
 fi
 
+# Wait for the database, then migrate / collectstatic only when something changed
+# (one Django boot for all of it; see core/startup.py)
+python manage.py startup
+
 # Execute the passed command (e.g., gunicorn)
 exec "$@"
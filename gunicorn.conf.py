@@ -0,0 +1,45 @@
+"""
+Configuração do gunicorn (lida automaticamente do diretório de trabalho).
+
+SERVER_MODE=wsgi (padrão): workers síncronos com threads, efeso.wsgi.
+SERVER_MODE=asgi: workers uvicorn (event loop), efeso.asgi; as views async
+não prendem o worker enquanto esperam o banco ou clientes lentos.
+"""
+import glob
+import os
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").lower()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None  # vazio desliga
+
+# Cada worker grava as suas métricas aqui e /metrics soma todas (core.metrics).
+# Definido antes do fork, vale para todos os workers.
+METRICS_DIR = os.environ.setdefault("METRICS_DIR", "/tmp/efeso-metrics")
+
+
+def on_starting(server):
+    # Servidor novo, contadores do zero: descarta os arquivos da execução anterior
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    # Soma as métricas do worker que saiu em exited.json e apaga o arquivo dele
+    from core.metrics import retire_process
+
+    retire_process(METRICS_DIR, worker.pid)
+
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "efeso.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "efeso.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", "4"))
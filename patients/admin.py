@@ -1,12 +1,44 @@
-
 from django.contrib import admin
-from .models import Patient
+from core.admin import AutocompleteListFilter
+from core.pagination import EstimatedCountPaginator
+from .models import DuplicateCandidate, Patient
+from .search import filter_patients
 
 
 @admin.register(Patient)
 class PatientAdmin(admin.ModelAdmin):
     list_display = ("full_name", "clinic", "whatsapp_phone", "cpf", "created_at")
     list_select_related = ("clinic",)
-    list_filter = ("clinic", "gender")
+    # Com milhares de clínicas, nem o filtro nem o formulário carregam todas
+    list_filter = (("clinic", AutocompleteListFilter), "gender")
+    autocomplete_fields = ("clinic",)
     search_fields = ("full_name", "whatsapp_phone", "cpf", "email")
-    ordering = ("full_name",)
\ No newline at end of file
+    search_help_text = "Nome (ignora acentos e pequenos erros), CPF, telefone ou email."
+    # Sem COUNT(*) exato da tabela inteira a cada página
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_ordering(self, request):
+        # Por nome só dentro de uma clínica (índice clinic+full_name); na lista
+        # geral, ordenar milhões de nomes seria um sort da tabela toda.
+        if "clinic__id__exact" in request.GET:
+            return ("full_name",)
+        return ("-id",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Em vez de icontains em 4 colunas (seq scan), usa os índices de patients.search
+        if not search_term:
+            return queryset, False
+        return filter_patients(queryset, search_term), False
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    """Pares gerados por find_duplicate_patients, para revisão manual."""
+    list_display = ("patient_a", "patient_b", "score", "reasons", "clinic", "created_at")
+    list_select_related = ("clinic", "patient_a", "patient_b")
+    list_filter = (("clinic", AutocompleteListFilter),)
+    raw_id_fields = ("patient_a", "patient_b")
+    autocomplete_fields = ("clinic",)
+    ordering = ("-score",)
+    show_full_result_count = False
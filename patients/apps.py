@@ -4,3 +4,5 @@ class PatientsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "patients"
 
+    def ready(self):
+        from . import signals  # noqa: F401
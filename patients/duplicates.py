@@ -0,0 +1,206 @@
+"""
+Detecção de pacientes duplicados dentro de uma clínica.
+
+Comparar todos os pares é O(n²) (5·10¹¹ pares com 1M de pacientes). Em vez
+disso, só comparamos pares que caem no mesmo bloco ("blocking"):
+
+1. Chaves exatas: mesmo CPF (dígitos), mesmo WhatsApp/telefone (E.164) ou
+   mesmo email normalizado. O banco agrupa (GROUP BY ... HAVING COUNT > 1)
+   e devolve só os grupos repetidos, ordenados pela chave. Grupos maiores
+   que `max_block` (ex.: o telefone da recepção em centenas de fichas) são
+   ignorados: não dizem nada sobre a pessoa.
+2. Vizinhança ordenada (sorted neighbourhood): as fichas ordenadas pelo nome
+   normalizado, e de novo por (nascimento, nome); cada ficha é comparada com
+   as `window` - 1 seguintes. Pega nomes com erro de digitação que nenhuma
+   chave exata pegaria; a segunda ordenação pega erros no começo do nome.
+
+As linhas vêm do banco em streaming (iterator) e são mandadas em lotes a um
+pool de processos, que só calcula pontuações (funções puras, sem ORM). Os
+pares acima de `threshold` voltam ao processo principal e substituem os
+candidatos anteriores da clínica em DuplicateCandidate.
+
+Pontuação (0 a 1): soma de evidências — CPF igual, telefone/email em comum,
+nascimento igual, nome parecido — menos conflitos (CPFs ou nascimentos
+diferentes, ambos preenchidos).
+"""
+import time
+from collections import deque
+from difflib import SequenceMatcher
+from itertools import chain, groupby
+
+from django.db import models, router, transaction
+
+from core.bulk import bulk_insert
+from core.executors import process_pool
+from .models import DuplicateCandidate, Patient
+
+# (id, cpf_digits, whatsapp_e164, extra_phone_e164, email_normalized, search_name, birth_date)
+FEATURES = (
+    "id", "cpf_digits", "whatsapp_e164", "extra_phone_e164", "email_normalized", "search_name", "birth_date",
+)
+EXACT_KEYS = ("cpf_digits", "whatsapp_e164", "extra_phone_e164", "email_normalized")
+NEIGHBOURHOOD_ORDERINGS = (("search_name", "id"), ("birth_date", "search_name", "id"))
+
+WEIGHTS = {"cpf": 0.6, "telefone": 0.3, "email": 0.3, "nascimento": 0.25, "nome": 0.5}
+CPF_CONFLICT = -0.5
+BIRTH_CONFLICT = -0.3
+NAME_MIN_SIMILARITY = 0.85  # abaixo disso o nome não conta como evidência
+
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_WINDOW = 10
+DEFAULT_MAX_BLOCK = 50
+ROWS_PER_TASK = 20_000
+
+
+def name_similarity(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    # Limites superiores baratos antes do ratio() exato
+    if matcher.real_quick_ratio() < NAME_MIN_SIMILARITY or matcher.quick_ratio() < NAME_MIN_SIMILARITY:
+        return 0.0
+    return matcher.ratio()
+
+
+def score_pair(a, b):
+    """(pontuação, motivos) de duas linhas FEATURES."""
+    _, cpf_a, wa_a, extra_a, email_a, name_a, birth_a = a
+    _, cpf_b, wa_b, extra_b, email_b, name_b, birth_b = b
+    score, reasons = 0.0, []
+    if cpf_a and cpf_b:
+        if cpf_a == cpf_b:
+            score += WEIGHTS["cpf"]
+            reasons.append("cpf")
+        else:
+            score += CPF_CONFLICT
+    if ({wa_a, extra_a} - {""}) & {wa_b, extra_b}:
+        score += WEIGHTS["telefone"]
+        reasons.append("telefone")
+    if email_a and email_a == email_b:
+        score += WEIGHTS["email"]
+        reasons.append("email")
+    if birth_a and birth_b:
+        if birth_a == birth_b:
+            score += WEIGHTS["nascimento"]
+            reasons.append("nascimento")
+        else:
+            score += BIRTH_CONFLICT
+    similarity = name_similarity(name_a, name_b)
+    if similarity >= NAME_MIN_SIMILARITY:
+        score += WEIGHTS["nome"] * similarity
+        reasons.append("nome")
+    return max(0.0, min(1.0, score)), reasons
+
+
+def _keep(found, a, b, threshold):
+    score, reasons = score_pair(a, b)
+    if score >= threshold:
+        key = (a[0], b[0]) if a[0] < b[0] else (b[0], a[0])
+        found[key] = (score, ",".join(reasons))
+
+
+def score_blocks(blocks, threshold):
+    """Todos os pares dentro de cada bloco (chaves exatas). Roda no pool."""
+    found = {}
+    for block in blocks:
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                _keep(found, a, b, threshold)
+    return found
+
+
+def score_window(rows, window, threshold):
+    """Cada linha contra as `window` - 1 seguintes (vizinhança ordenada). Roda no pool."""
+    found = {}
+    for i, a in enumerate(rows):
+        for b in rows[i + 1:i + window]:
+            _keep(found, a, b, threshold)
+    return found
+
+
+def _rows(queryset):
+    # birth_date como ordinal: mais leve para mandar ao pool
+    for row in queryset.values_list(*FEATURES).iterator(chunk_size=5000):
+        birth = row[6]
+        yield (*row[:6], birth.toordinal() if birth else None)
+
+
+def _exact_tasks(base, key, max_block):
+    """Lotes de blocos com a mesma `key`, lidos em streaming."""
+    repeated = (
+        base.exclude(**{key: ""}).order_by().values(key)
+        .annotate(n=models.Count("pk")).filter(n__gt=1, n__lte=max_block).values(key)
+    )
+    rows = _rows(base.filter(**{f"{key}__in": repeated}).order_by(key, "pk"))
+    position = FEATURES.index(key)
+    batch, size = [], 0
+    for _, block in groupby(rows, key=lambda row: row[position]):
+        block = list(block)
+        batch.append(block)
+        size += len(block)
+        if size >= ROWS_PER_TASK:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _window_tasks(base, ordering, window):
+    """Fatias da clínica ordenada, com `window` - 1 linhas de sobreposição."""
+    rows = _rows(base.order_by(*ordering))
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= ROWS_PER_TASK:
+            yield chunk
+            chunk = chunk[-(window - 1):] if window > 1 else []
+    if len(chunk) > 1:
+        yield chunk
+
+
+def find_duplicates(clinic, *, threshold=DEFAULT_THRESHOLD, window=DEFAULT_WINDOW,
+                    max_block=DEFAULT_MAX_BLOCK, workers=None) -> dict:
+    """
+    Recalcula os candidatos a duplicata da clínica e grava em
+    DuplicateCandidate. workers=None usa todos os núcleos; 1 roda sem pool.
+    Retorna estatísticas (pares, segundos).
+    """
+    started = time.monotonic()
+    db = router.db_for_write(DuplicateCandidate)
+    # Lê do primário: os candidatos precisam bater com o que existe agora
+    base = Patient.objects.using(db).for_clinic(clinic)
+    found = {}
+
+    tasks = chain(
+        ((score_blocks, batch, threshold) for key in EXACT_KEYS for batch in _exact_tasks(base, key, max_block)),
+        ((score_window, chunk, window, threshold)
+         for ordering in NEIGHBOURHOOD_ORDERINGS for chunk in _window_tasks(base, ordering, window)),
+    )
+
+    def merge(future):
+        for pair, (score, reasons) in future.result().items():
+            if pair not in found or found[pair][0] < score:
+                found[pair] = (score, reasons)
+
+    executor, workers = process_pool(workers)
+    with executor:
+        # Poucas tarefas em voo: a leitura do banco não corre na frente do pool
+        limit = 2 * workers
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(*task))
+            while len(pending) >= limit:
+                merge(pending.popleft())
+        while pending:
+            merge(pending.popleft())
+
+    candidates = [
+        DuplicateCandidate(clinic_id=clinic.pk, patient_a_id=a, patient_b_id=b, score=round(score, 4), reasons=reasons)
+        for (a, b), (score, reasons) in found.items()
+    ]
+    with transaction.atomic(using=db):
+        DuplicateCandidate.objects.using(db).filter(clinic=clinic).delete()
+        bulk_insert(DuplicateCandidate, candidates, using=db)
+    return {"pairs": len(candidates), "seconds": time.monotonic() - started}
@@ -0,0 +1,92 @@
+"""
+Exportação dos pacientes de uma clínica (view ui.patient_export e comando
+export_patients), em CSV ou XLSX, com memória constante.
+
+- Projeção: só as colunas pedidas (values_list), sem instanciar Patient.
+- iterator(chunk_size): no PostgreSQL vira cursor do lado do servidor, que
+  entrega as linhas em lotes. Com DISABLE_SERVER_SIDE_CURSORS (pgbouncer) o
+  psycopg traria o resultado inteiro para o cliente, então lemos em lotes
+  por keyset (pk > último), cada um uma query curta.
+- Os nomes das colunas são os campos de Patient, como no import_patients:
+  um CSV exportado pode ser importado de volta.
+"""
+from django.db import connections
+
+from core.export import csv_chunks, xlsx_chunks
+from .models import Patient
+
+# Campos do import_patients (+ id e datas); sem as colunas normalizadas internas
+DEFAULT_FIELDS = ["id"] + [
+    f.name for f in Patient._meta.concrete_fields
+    if f.editable and f.name not in {"id", "clinic"}
+] + ["created_at", "updated_at"]
+EXPORT_FIELDS = set(DEFAULT_FIELDS)
+
+# Filtros aceitos: nome do parâmetro -> lookup
+FILTERS = {
+    "gender": "gender",
+    "state": "state",
+    "insurance": "insurance_name",
+    "city": "city__iexact",
+    "created_after": "created_at__date__gte",
+    "created_before": "created_at__date__lte",
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+CHUNK_SIZE = 2000
+
+
+def parse_fields(value):
+    """'full_name,cpf' (ou lista) -> lista de campos; ValueError para desconhecidos."""
+    if not value:
+        return list(DEFAULT_FIELDS)
+    fields = [f.strip() for f in value.split(",")] if isinstance(value, str) else list(value)
+    fields = [f for f in fields if f]
+    unknown = [f for f in fields if f not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Campos desconhecidos: {', '.join(unknown)}")
+    return fields
+
+
+def parse_filters(params):
+    """Parâmetros (GET ou opções do comando) -> filtros do queryset; ignora vazios."""
+    return {FILTERS[name]: params[name] for name in FILTERS if params.get(name)}
+
+
+def export_queryset(clinic, fields, filters=None):
+    return Patient.objects.for_clinic(clinic).filter(**(filters or {})).order_by("pk").values_list(*fields)
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Linhas de `queryset` (values_list ordenado por pk) em lotes, sem acumular."""
+    if not connections[queryset.db].settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+
+    fields = list(queryset._fields)
+    with_pk = queryset.values_list("pk", *fields)
+    last = None
+    while True:
+        batch = with_pk.filter(pk__gt=last) if last is not None else with_pk
+        rows = list(batch[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][0]
+
+
+def render(fmt, fields, rows):
+    """Arquivo no formato `fmt` (str para CSV, bytes para XLSX), em pedaços."""
+    if fmt == "xlsx":
+        return xlsx_chunks(fields, rows, sheet_name="Pacientes")
+    return csv_chunks(fields, rows)
+
+
+def export_chunks(clinic, fmt, fields=None, filters=None):
+    fields = parse_fields(fields)
+    return render(fmt, fields, iter_rows(export_queryset(clinic, fields, filters)))
@@ -0,0 +1,92 @@
+from django.db import models, transaction
+
+
+class NormalizedCharField(models.CharField):
+    """
+    Coluna derivada de outro campo do mesmo modelo (ex.: CPF só com dígitos),
+    usada para buscas indexadas independentes do formato digitado.
+
+    O valor é recalculado em pre_save(), então vale para save(), bulk_create()
+    e core.bulk.bulk_insert(). bulk_update() e QuerySet.update() não passam por
+    pre_save(): use refresh_normalized_fields() antes deles.
+    """
+
+    def __init__(self, *args, source=None, normalizer=None, **kwargs):
+        self.source = source
+        self.normalizer = normalizer
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("blank", True)
+        kwargs.setdefault("default", "")
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["source"] = self.source
+        kwargs["normalizer"] = self.normalizer
+        return name, path, args, kwargs
+
+    def compute(self, instance) -> str:
+        return self.normalizer(getattr(instance, self.source))
+
+    def pre_save(self, model_instance, add):
+        value = self.compute(model_instance)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+def normalized_fields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, NormalizedCharField)]
+
+
+def refresh_normalized_fields(instance, only=None) -> list:
+    """
+    Recalcula as colunas derivadas (ou só as de `only`, útil com instâncias
+    carregadas via .only()); retorna os nomes das que mudaram.
+    """
+    changed = []
+    for field in normalized_fields(type(instance)):
+        if only is not None and field.name not in only:
+            continue
+        value = field.compute(instance)
+        if getattr(instance, field.attname) != value:
+            setattr(instance, field.attname, value)
+            changed.append(field.name)
+    return changed
+
+
+def with_normalized_fields(model, field_names):
+    """Completa uma lista de update_fields com as colunas derivadas afetadas."""
+    names = set(field_names)
+    names.update(f.name for f in normalized_fields(model) if f.source in names)
+    return names
+
+
+def backfill_normalized_fields(queryset, *, using, only=None, chunk_size=5000, start_after=0):
+    """
+    Preenche as colunas derivadas das linhas de `queryset` em lotes por pk
+    (usado pelas migrations e por backfill_patient_lookups). Cada lote é lido
+    com select_for_update() na mesma transação do bulk_update(): um save()
+    concorrente termina antes ou espera, e nunca é sobrescrito com valores
+    calculados a partir de uma leitura antiga. Gera (último pk, lidas,
+    atualizadas) a cada lote.
+    """
+    fields = [f for f in normalized_fields(queryset.model) if only is None or f.name in only]
+    columns = {"pk", *(f.name for f in fields), *(f.source for f in fields)}
+    names = {f.name for f in fields}
+    qs = queryset.using(using).only(*columns).order_by("pk")
+    last_pk = start_after
+    while True:
+        with transaction.atomic(using=using):
+            chunk = list(qs.select_for_update().filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return
+            last_pk = chunk[-1].pk
+            changed_fields, changed = set(), []
+            for instance in chunk:
+                updated = refresh_normalized_fields(instance, only=names)
+                if updated:
+                    changed_fields.update(updated)
+                    changed.append(instance)
+            if changed:
+                queryset.model._default_manager.using(using).bulk_update(changed, sorted(changed_fields))
+        yield last_pk, len(chunk), len(changed)
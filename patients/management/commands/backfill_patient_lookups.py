@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+
+from core.models import Clinic
+from patients.fields import backfill_normalized_fields
+from patients.models import Patient
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the derived lookup columns of Patient (cpf_digits, search_name, E.164 phones, "
+        "normalized email) for existing rows, in small primary-key ordered chunks so the "
+        "table stays writable. Each chunk is locked while it is recomputed, so concurrent "
+        "saves are never overwritten. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--clinic", help="Only this clinic (slug).")
+        parser.add_argument("--start-after", type=int, default=0, help="Resume after this patient id.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        qs = Patient.objects.all()
+        if options["clinic"]:
+            try:
+                qs = qs.filter(clinic=Clinic.objects.get(slug=options["clinic"]))
+            except Clinic.DoesNotExist:
+                raise CommandError(f"Clinic '{options['clinic']}' does not exist.")
+
+        last_pk = options["start_after"]
+        scanned = updated = 0
+        started = time.monotonic()
+        # No primário: os lotes são travados e atualizados lá
+        chunks = backfill_normalized_fields(
+            qs, using=router.db_for_write(Patient), chunk_size=options["chunk_size"], start_after=last_pk,
+        )
+        for last_pk, read, changed in chunks:
+            scanned += read
+            updated += changed
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  up to id {last_pk}: {scanned} scanned, {updated} updated")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfill done: {scanned} patients scanned, {updated} updated in {elapsed:.1f}s "
+            f"(last id {last_pk})."
+        ))
@@ -0,0 +1,71 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Clinic
+from patients.export import CONTENT_TYPES, FILTERS, export_queryset, iter_rows, parse_fields, parse_filters, render
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports one clinic's patients as CSV or XLSX, streaming rows from the database in "
+        "chunks: memory stays flat regardless of the number of patients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinic", required=True, help="Slug of the clinic.")
+        parser.add_argument("--output", "-o", default="-", help="Output file ('-' = stdout, CSV only).")
+        parser.add_argument("--format", choices=sorted(CONTENT_TYPES), help="Defaults to the output extension, else csv.")
+        parser.add_argument("--fields", help="Comma-separated Patient field names (default: all importable fields).")
+        for name in FILTERS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, **options):
+        try:
+            clinic = Clinic.objects.get(slug=options["clinic"])
+        except Clinic.DoesNotExist:
+            raise CommandError(f"Clinic '{options['clinic']}' does not exist.")
+
+        output = options["output"]
+        fmt = options["format"] or ("xlsx" if output.endswith(".xlsx") else "csv")
+        if fmt == "xlsx" and output == "-":
+            raise CommandError("XLSX needs --output <file>.")
+
+        try:
+            fields = parse_fields(options["fields"])
+            queryset = export_queryset(clinic, fields, parse_filters(options))
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        except ValidationError as exc:
+            raise CommandError("; ".join(exc.messages))
+
+        self.rows = 0
+        chunks = render(fmt, fields, self._count(iter_rows(queryset)))
+        started = time.monotonic()
+        written = 0
+        if output == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+                written += len(chunk)
+        else:
+            with open(output, "w", encoding="utf-8", newline="") if fmt == "csv" else open(output, "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+                    written += len(chunk)
+
+        elapsed = time.monotonic() - started
+        summary = (
+            f"Exported {self.rows} patients of '{clinic.slug}' ({fmt}, {written / 2**20:.1f} MiB) "
+            f"in {elapsed:.1f}s ({self.rows / elapsed if elapsed else 0:.0f} rows/s)."
+        )
+        # Com a saída em stdout, o resumo vai para stderr
+        if output == "-":
+            self.stderr.write(summary)
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    def _count(self, rows):
+        for row in rows:
+            self.rows += 1
+            yield row
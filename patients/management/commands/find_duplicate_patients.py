@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Clinic
+from patients.duplicates import DEFAULT_MAX_BLOCK, DEFAULT_THRESHOLD, DEFAULT_WINDOW, find_duplicates
+
+
+class Command(BaseCommand):
+    help = (
+        "Finds likely duplicate patients in each clinic (same CPF, phone or email, similar name and "
+        "birth date) using blocking and a sorted-neighbourhood window instead of comparing every "
+        "pair, and replaces the clinic's rows in DuplicateCandidate with the scored pairs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinic", action="append", help="Only this clinic (slug). Repeatable.")
+        parser.add_argument("--workers", type=int, help="Scoring processes (default: all CPUs; 1 = no pool).")
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum score (0-1) to keep a pair.")
+        parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Sorted-neighbourhood window size.")
+        parser.add_argument(
+            "--max-block", type=int, default=DEFAULT_MAX_BLOCK,
+            help="Ignore CPF/phone/email values shared by more patients than this.",
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options["threshold"] <= 1:
+            raise CommandError("--threshold must be between 0 and 1.")
+        if options["window"] < 2:
+            raise CommandError("--window must be at least 2.")
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        clinics = Clinic.objects.order_by("pk")
+        if options["clinic"]:
+            clinics = clinics.filter(slug__in=options["clinic"])
+            missing = set(options["clinic"]) - set(clinics.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Unknown clinic(s): {', '.join(sorted(missing))}.")
+
+        total = seconds = 0
+        for clinic in clinics:
+            stats = find_duplicates(
+                clinic,
+                threshold=options["threshold"],
+                window=options["window"],
+                max_block=options["max_block"],
+                workers=options["workers"],
+            )
+            total += stats["pairs"]
+            seconds += stats["seconds"]
+            if options["verbosity"] >= 1:
+                self.stdout.write(f"  {clinic.slug}: {stats['pairs']} candidate pairs in {stats['seconds']:.1f}s")
+
+        self.stdout.write(self.style.SUCCESS(f"Found {total} candidate pairs in {seconds:.1f}s."))
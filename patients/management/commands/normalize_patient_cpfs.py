@@ -0,0 +1,153 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Exists, F, OuterRef
+from django.db.models.functions import Now
+
+from core.models import Clinic, JobCheckpoint
+from patients.fields import refresh_normalized_fields
+from patients.models import Patient
+
+JOB_NAME = "normalize_patient_cpfs"
+
+
+def normalize_chunk(clinic_id, after_pk, chunk_size):
+    """
+    Normaliza os CPFs de até `chunk_size` pacientes da clínica com id > after_pk.
+
+    Mesma regra da migration 0002: um CPF mascarado só vira só-dígitos
+    se nenhum outro paciente da clínica já tiver esse valor. Quando vários
+    mascarados colidem entre si, o de menor id é normalizado e os demais ficam
+    como estão. Retorna (último id do lote ou None, lidos, alterados, ignorados).
+    """
+    pks = list(
+        Patient.objects.filter(clinic_id=clinic_id, pk__gt=after_pk)
+        .order_by("pk")
+        .values_list("pk", flat=True)[:chunk_size]
+    )
+    if not pks:
+        return None, 0, 0, 0
+    chunk = Patient.objects.filter(clinic_id=clinic_id, pk__gt=after_pk, pk__lte=pks[-1])
+
+    # Linhas ainda sem cpf_digits (anteriores ao backfill)
+    stale = list(chunk.filter(cpf_digits="").exclude(cpf="").only("pk", "cpf", "cpf_digits"))
+    for patient in stale:
+        refresh_normalized_fields(patient, only={"cpf_digits"})
+    if stale:
+        Patient.objects.bulk_update(stale, ["cpf_digits"])
+
+    pending = chunk.exclude(cpf="").exclude(cpf=F("cpf_digits"))
+    clean_taken = Patient.objects.filter(
+        clinic_id=OuterRef("clinic_id"), cpf=OuterRef("cpf_digits"),
+    ).exclude(pk=OuterRef("pk"))
+    lower_twin = Patient.objects.filter(
+        clinic_id=OuterRef("clinic_id"), cpf_digits=OuterRef("cpf_digits"), pk__lt=OuterRef("pk"),
+    )
+    changed = pending.filter(~Exists(clean_taken), ~Exists(lower_twin)).update(
+        cpf=F("cpf_digits"), updated_at=Now(),
+    )
+    skipped = pending.count()
+    return pks[-1], len(pks), changed, skipped
+
+
+def normalize_clinic(clinic_id, chunk_size, progress=None):
+    """
+    Processa uma clínica inteira a partir do checkpoint. Roda também em
+    processos filhos. `progress(checkpoint)` é chamado após cada lote.
+    """
+    checkpoint, _ = JobCheckpoint.objects.get_or_create(job=JOB_NAME, scope=str(clinic_id))
+    while not checkpoint.done:
+        with transaction.atomic():
+            last_pk, processed, changed, skipped = normalize_chunk(clinic_id, checkpoint.last_pk, chunk_size)
+            if last_pk is None:
+                checkpoint.done = True
+            else:
+                checkpoint.last_pk = last_pk
+                checkpoint.processed += processed
+                checkpoint.changed += changed
+                checkpoint.skipped += skipped
+            # Checkpoint na mesma transação do UPDATE: retomar nunca repete nem pula lotes
+            checkpoint.save()
+        if progress is not None and last_pk is not None:
+            progress(checkpoint)
+    return clinic_id, checkpoint.processed, checkpoint.changed, checkpoint.skipped
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalizes stored patient CPFs to digits only, clinic by clinic in primary-key chunks "
+        "(the same rule as migration 0002, for rows written afterwards without save(), e.g. bulk loads). "
+        "Progress is checkpointed so the job can be interrupted and resumed; CPFs that would "
+        "collide with an existing normalized value are left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--clinic", action="append", help="Clinic slug (repeatable). Default: all clinics.")
+        parser.add_argument("--workers", type=int, default=1, help="Clinics processed in parallel processes.")
+        parser.add_argument("--restart", action="store_true", help="Discard checkpoints and start over.")
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--chunk-size and --workers must be positive.")
+
+        clinics = Clinic.objects.order_by("pk")
+        if options["clinic"]:
+            clinics = clinics.filter(slug__in=options["clinic"])
+            missing = set(options["clinic"]) - set(clinics.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Unknown clinic(s): {', '.join(sorted(missing))}")
+        clinic_ids = list(clinics.values_list("pk", flat=True))
+
+        checkpoints = JobCheckpoint.objects.filter(job=JOB_NAME, scope__in=[str(pk) for pk in clinic_ids])
+        if options["restart"]:
+            checkpoints.delete()
+        else:
+            resumed = checkpoints.filter(done=False, last_pk__gt=0).count()
+            if resumed:
+                self.stdout.write(f"Resuming {resumed} clinic(s) from checkpoint.")
+
+        workers = options["workers"]
+        if workers > 1 and connections["default"].vendor == "sqlite":
+            self.stderr.write("SQLite allows a single writer; ignoring --workers.")
+            workers = 1
+
+        started = time.monotonic()
+        totals = [0, 0, 0]
+        chunk_size = options["chunk_size"]
+        progress = self._chunk_progress if options["verbosity"] >= 2 else None
+
+        if workers == 1:
+            results = (normalize_clinic(pk, chunk_size, progress) for pk in clinic_ids)
+            self._report(results, totals, len(clinic_ids), started)
+        else:
+            # Os filhos abrem as próprias conexões; as herdadas não podem ser reutilizadas.
+            # O progresso por lote fica só no modo sequencial: aqui cada clínica reporta ao terminar.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("fork")) as pool:
+                results = pool.map(normalize_clinic, clinic_ids, [chunk_size] * len(clinic_ids))
+                self._report(results, totals, len(clinic_ids), started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {totals[0]} patients read, {totals[1]} CPFs normalized, "
+            f"{totals[2]} left as-is due to collisions ({time.monotonic() - started:.1f}s)."
+        ))
+
+    def _chunk_progress(self, checkpoint):
+        self.stdout.write(
+            f"  clinic {checkpoint.scope}: up to id {checkpoint.last_pk}, {checkpoint.processed} read, "
+            f"{checkpoint.changed} normalized, {checkpoint.skipped} skipped"
+        )
+
+    def _report(self, results, totals, clinic_count, started):
+        for index, (clinic_id, processed, changed, skipped) in enumerate(results, start=1):
+            totals[0] += processed
+            totals[1] += changed
+            totals[2] += skipped
+            self.stdout.write(
+                f"[{index}/{clinic_count}] clinic {clinic_id}: {changed} normalized, {skipped} skipped "
+                f"({time.monotonic() - started:.1f}s)"
+            )
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Clinic
+from patients.models import PatientCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-clinic patient counters (total, gender, insurance, state) from the "
+        "patients table and fixes any drift. Meant to run periodically (e.g. nightly cron); "
+        "safe to run while the app is writing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clinic", action="append", help="Only this clinic (slug). Repeatable.")
+
+    def handle(self, *args, **options):
+        clinics = Clinic.objects.order_by("pk")
+        if options["clinic"]:
+            clinics = clinics.filter(slug__in=options["clinic"])
+            missing = set(options["clinic"]) - set(clinics.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Unknown clinic(s): {', '.join(sorted(missing))}.")
+
+        started = time.monotonic()
+        total = corrected = 0
+        for clinic in clinics:
+            fixed = PatientCounter.objects.reconcile(clinic)
+            total += 1
+            corrected += fixed
+            if fixed and options["verbosity"] >= 1:
+                self.stdout.write(f"  {clinic.slug}: {fixed} counters corrected")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {total} clinics: {corrected} counters corrected in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:01
+
+import core.migration_ops
+import patients.fields
+import patients.validators
+from django.db import migrations, models
+
+
+def fill_cpf_digits(apps, schema_editor):
+    # Em lotes, cada um na sua transação (a migration não é atômica): as
+    # buscas por cpf_digits já valem para as linhas existentes ao terminar
+    Patient = apps.get_model("patients", "Patient")
+    chunks = patients.fields.backfill_normalized_fields(
+        Patient.objects.all(), using=schema_editor.connection.alias, only={"cpf_digits"}
+    )
+    for _ in chunks:
+        pass
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação.
+    atomic = False
+
+    dependencies = [
+        ("core", "0001_initial"),
+        ("patients", "0002_normalize_cpfs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="cpf_digits",
+            field=patients.fields.NormalizedCharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=14,
+                normalizer=patients.validators.normalize_cpf,
+                source="cpf",
+                verbose_name="CPF (dígitos)",
+            ),
+        ),
+        migrations.RunPython(fill_cpf_digits, migrations.RunPython.noop, elidable=True),
+        core.migration_ops.AddIndexOnline(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "cpf_digits"], name="patients_pa_clinic__5c2264_idx"
+            ),
+        ),
+    ]
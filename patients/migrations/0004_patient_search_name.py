@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:20
+
+import core.migration_ops
+import patients.fields
+import patients.normalizers
+from django.db import migrations
+
+
+def fill_search_name(apps, schema_editor):
+    # Em lotes, cada um na sua transação (a migration não é atômica): a busca por
+    # nome já encontra as linhas existentes ao terminar
+    Patient = apps.get_model("patients", "Patient")
+    chunks = patients.fields.backfill_normalized_fields(
+        Patient.objects.all(),
+        using=schema_editor.connection.alias,
+        only={"search_name"},
+    )
+    for _ in chunks:
+        pass
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação.
+    atomic = False
+
+    dependencies = [
+        ("patients", "0003_patient_cpf_digits"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="search_name",
+            field=patients.fields.NormalizedCharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=150,
+                normalizer=patients.normalizers.search_key,
+                source="full_name",
+                verbose_name="Nome (busca)",
+            ),
+        ),
+        migrations.RunPython(
+            fill_search_name, migrations.RunPython.noop, elidable=True
+        ),
+        # pg_trgm e btree_gin são extensões "trusted" (PG 13+): o dono do banco pode criá-las.
+        # O índice combina clinic_id + trigramas, então a busca já sai filtrada pelo tenant.
+        core.migration_ops.RunSQLOnPostgres(
+            sql=[
+                "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+                "CREATE EXTENSION IF NOT EXISTS btree_gin",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS patients_patient_search_name_trgm "
+                "ON patients_patient USING gin (clinic_id, search_name gin_trgm_ops)",
+            ],
+            reverse_sql=[
+                "DROP INDEX CONCURRENTLY IF EXISTS patients_patient_search_name_trgm",
+            ],
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:05
+
+import core.migration_ops
+import patients.fields
+import patients.normalizers
+from django.db import migrations, models
+
+
+def fill_contact_lookups(apps, schema_editor):
+    # Em lotes, cada um na sua transação (a migration não é atômica): find_by_contact
+    # já encontra as linhas existentes ao terminar
+    Patient = apps.get_model("patients", "Patient")
+    chunks = patients.fields.backfill_normalized_fields(
+        Patient.objects.all(),
+        using=schema_editor.connection.alias,
+        only={
+            "whatsapp_e164",
+            "extra_phone_e164",
+            "emergency_contact_phone_e164",
+            "email_normalized",
+        },
+    )
+    for _ in chunks:
+        pass
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação.
+    atomic = False
+
+    dependencies = [
+        ("patients", "0004_patient_search_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="email_normalized",
+            field=patients.fields.NormalizedCharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=254,
+                normalizer=patients.normalizers.normalize_email,
+                source="email",
+                verbose_name="Email (normalizado)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="emergency_contact_phone_e164",
+            field=patients.fields.NormalizedCharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=20,
+                normalizer=patients.normalizers.normalize_phone,
+                source="emergency_contact_phone",
+                verbose_name="Telefone (emergência, E.164)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="extra_phone_e164",
+            field=patients.fields.NormalizedCharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=20,
+                normalizer=patients.normalizers.normalize_phone,
+                source="extra_phone",
+                verbose_name="Telefone extra (E.164)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="whatsapp_e164",
+            field=patients.fields.NormalizedCharField(
+                blank=True,
+                default="",
+                editable=False,
+                max_length=20,
+                normalizer=patients.normalizers.normalize_phone,
+                source="whatsapp_phone",
+                verbose_name="WhatsApp (E.164)",
+            ),
+        ),
+        migrations.RunPython(
+            fill_contact_lookups, migrations.RunPython.noop, elidable=True
+        ),
+        core.migration_ops.AddIndexOnline(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "whatsapp_e164"],
+                name="patients_pa_clinic__b9059f_idx",
+            ),
+        ),
+        core.migration_ops.AddIndexOnline(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "extra_phone_e164"],
+                name="patients_pa_clinic__4163f4_idx",
+            ),
+        ),
+        core.migration_ops.AddIndexOnline(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "emergency_contact_phone_e164"],
+                name="patients_pa_clinic__524e87_idx",
+            ),
+        ),
+        core.migration_ops.AddIndexOnline(
+            model_name="patient",
+            index=models.Index(
+                fields=["clinic", "email_normalized"],
+                name="patients_pa_clinic__59c91f_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COUNTED_FIELDS = ("gender", "insurance_name", "state")
+
+
+def fill_counters(apps, schema_editor):
+    # Carga inicial com GROUP BY (uma query por dimensão); depois disso os
+    # contadores são mantidos pelo modelo e por reconcile_patient_counters.
+    Patient = apps.get_model("patients", "Patient")
+    PatientCounter = apps.get_model("patients", "PatientCounter")
+    db = schema_editor.connection.alias
+    patients = Patient.objects.using(db).order_by()
+    counters = [
+        PatientCounter(clinic_id=clinic_id, dimension="", value="", count=n)
+        for clinic_id, n in patients.values_list("clinic_id").annotate(
+            n=models.Count("pk")
+        )
+    ]
+    for name in COUNTED_FIELDS:
+        counters += [
+            PatientCounter(clinic_id=clinic_id, dimension=name, value=value, count=n)
+            for clinic_id, value, n in patients.values_list("clinic_id", name).annotate(
+                n=models.Count("pk")
+            )
+        ]
+    PatientCounter.objects.using(db).bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_jobcheckpoint"),
+        ("patients", "0005_patient_contact_lookups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatientCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        blank=True, default="", max_length=30, verbose_name="Dimensão"
+                    ),
+                ),
+                (
+                    "value",
+                    models.CharField(
+                        blank=True, default="", max_length=120, verbose_name="Valor"
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0, verbose_name="Quantidade")),
+                (
+                    "clinic",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="patient_counters",
+                        to="core.clinic",
+                        verbose_name="Clínica",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Contador de pacientes",
+                "verbose_name_plural": "Contadores de pacientes",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("clinic", "dimension", "value"),
+                        name="uniq_patient_counter",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop, elidable=True),
+    ]
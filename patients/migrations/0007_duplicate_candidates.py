@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_jobcheckpoint"),
+        ("patients", "0006_patient_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="Pontuação")),
+                ("reasons", models.CharField(max_length=80, verbose_name="Motivos")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Criado em"),
+                ),
+                (
+                    "clinic",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duplicate_candidates",
+                        to="core.clinic",
+                        verbose_name="Clínica",
+                    ),
+                ),
+                (
+                    "patient_a",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="patients.patient",
+                        verbose_name="Paciente A",
+                    ),
+                ),
+                (
+                    "patient_b",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="patients.patient",
+                        verbose_name="Paciente B",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Possível duplicata",
+                "verbose_name_plural": "Possíveis duplicatas",
+                "indexes": [
+                    models.Index(
+                        fields=["clinic", "-score"],
+                        name="patients_du_clinic__16d537_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("patient_a", "patient_b"),
+                        name="uniq_duplicate_candidate_pair",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,8 +1,18 @@
-import re
+import copy
+from collections import Counter
+from contextlib import nullcontext
+from functools import partial
+
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.utils import timezone
+from core.bulk import bulk_insert
+from core.cache import TwoTierCache
 from core.models import Clinic
-from .validators import validate_cpf
+from core.tenancy import get_clinic
+from .fields import NormalizedCharField, refresh_normalized_fields, with_normalized_fields
+from .normalizers import normalize_email, normalize_phone, phone_variants, search_key
+from .validators import normalize_cpf, validate_cpf
 
 UF_CHOICES = [
     ("AC", "Acre"),
@@ -34,6 +44,262 @@ UF_CHOICES = [
     ("TO", "Tocantins"),
 ]
 
+# Campos com contagem por clínica em PatientCounter (além do total)
+COUNTED_FIELDS = ("gender", "insurance_name", "state")
+
+
+# Detalhe de pacientes por (clínica, id): LRU do processo + cache compartilhado
+patient_cache = TwoTierCache("patient")
+
+
+def _counter_keys(row):
+    """(clinic_id, gênero, convênio, estado) -> chaves de PatientCounter afetadas."""
+    clinic_id, *values = row
+    return [(clinic_id, "", ""), *((clinic_id, f, v) for f, v in zip(COUNTED_FIELDS, values))]
+
+
+class PatientQuerySet(models.QuerySet):
+    # Projeções nomeadas: só as colunas necessárias, em namedtuples (sem
+    # instanciar o modelo, sem __dict__ por linha, sem carregar `notes`).
+    PROJECTIONS = {
+        "summary": ("id", "full_name", "cpf", "whatsapp_phone"),
+        "contact": (
+            "id", "full_name", "whatsapp_phone", "extra_phone", "email",
+            "emergency_contact_name", "emergency_contact_phone",
+        ),
+        "list": ("id", "full_name", "cpf", "whatsapp_phone", "birth_date", "insurance_name", "created_at"),
+    }
+
+    def for_clinic(self, clinic):
+        """Filtro de tenant. Aceita uma Clinic ou o id dela."""
+        if clinic is None:
+            raise ValueError("for_clinic() requer uma clínica.")
+        clinic_id = clinic.pk if isinstance(clinic, Clinic) else clinic
+        return self.filter(clinic_id=clinic_id)
+
+    def projection(self, name):
+        """Linhas leves (namedtuple) com os campos da projeção `name`."""
+        try:
+            fields = self.PROJECTIONS[name]
+        except KeyError:
+            raise ValueError(f"Projeção desconhecida: {name}. Opções: {', '.join(self.PROJECTIONS)}")
+        return self.values_list(*fields, named=True)
+
+    def summary(self):
+        return self.projection("summary")
+
+    def contacts(self):
+        return self.projection("contact")
+
+    def list_rows(self):
+        return self.projection("list")
+
+    def by_cpf(self, clinic, cpf):
+        """Pacientes da clínica com este CPF, em qualquer formato (usa o índice de cpf_digits)."""
+        digits = normalize_cpf(cpf)
+        if not digits:
+            return self.none()
+        return self.for_clinic(clinic).filter(cpf_digits=digits)
+
+    def get_by_cpf(self, clinic, cpf):
+        """Primeiro paciente com este CPF na clínica, ou None."""
+        return self.by_cpf(clinic, cpf).order_by("pk").first()
+
+    def find_by_contact(self, clinic, phone_or_email, *, include_emergency=False):
+        """
+        Pacientes da clínica com este WhatsApp/telefone extra ou email, em
+        qualquer formato digitado. Usa só as colunas normalizadas indexadas.
+        `include_emergency` inclui quem tem este número como contato de emergência.
+        """
+        value = (phone_or_email or "").strip()
+        if "@" in value:
+            email = normalize_email(value)
+            return self.for_clinic(clinic).filter(email_normalized=email)
+
+        variants = phone_variants(normalize_phone(value))
+        if not variants:
+            return self.none()
+        condition = models.Q(whatsapp_e164__in=variants) | models.Q(extra_phone_e164__in=variants)
+        if include_emergency:
+            condition |= models.Q(emergency_contact_phone_e164__in=variants)
+        return self.for_clinic(clinic).filter(condition)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts"):
+            # Não dá para saber quais linhas entraram: reconcile_patient_counters corrige
+            return super().bulk_create(objs, *args, **kwargs)
+        self._for_write = True  # self.db = banco de escrita (como no bulk_create() original)
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            PatientCounter.objects.db_manager(self.db).record_created(created)
+        return created
+
+    def delete(self):
+        # Contagens do que vai ser apagado, agrupadas (uma query), na mesma transação
+        db = self._db or router.db_for_write(self.model, **self._hints)
+        with transaction.atomic(using=db, savepoint=False):
+            groups = (
+                self.using(db)
+                .order_by()
+                .values_list("clinic_id", *COUNTED_FIELDS)
+                .annotate(n=models.Count("pk"))
+            )
+            deltas = [(tuple(group[:-1]), -group[-1]) for group in groups]
+            result = super().delete()
+            PatientCounter.objects.db_manager(db).apply(deltas)
+        # Só depois do commit: antes disso outro processo ainda leria (e recachearia) as linhas antigas
+        for clinic_id in {row[0] for row, _ in deltas}:
+            transaction.on_commit(partial(patient_cache.invalidate_clinic, clinic_id), using=db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    # Clínicas das linhas que bulk_update() vai alterar (ele já tem as instâncias)
+    _clinic_ids = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._clinic_ids = self._clinic_ids
+        return clone
+
+    def _filtered_clinic_ids(self):
+        """Clínicas fixadas pelo filtro (clinic=, clinic__in=, for_clinic()); None se não der para saber."""
+        where = self.query.where
+        if where.connector != "AND" or where.negated:
+            return None
+        clinic = self.model._meta.get_field("clinic")
+        for child in where.children:
+            if getattr(getattr(child, "lhs", None), "target", None) is not clinic:
+                continue
+            if child.lookup_name == "exact" and isinstance(child.rhs, int):
+                return {child.rhs}
+            if child.lookup_name == "in" and isinstance(child.rhs, (list, tuple, set)):
+                if all(isinstance(value, int) for value in child.rhs):
+                    return set(child.rhs)
+        return None
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        qs = self._chain()
+        qs._clinic_ids = {obj.clinic_id for obj in objs}
+        return super(PatientQuerySet, qs).bulk_update(objs, fields, batch_size=batch_size)
+
+    def update(self, **kwargs):
+        # Invalida o cache das clínicas afetadas, sabidas pelo filtro ou pelas
+        # instâncias de bulk_update()/bulk_upsert(); só sem isso pergunta ao banco
+        db = self._db or router.db_for_write(self.model, **self._hints)
+        clinic_ids = self._clinic_ids if self._clinic_ids is not None else self._filtered_clinic_ids()
+        if clinic_ids is None:
+            clinic_ids = set(self.using(db).order_by().values_list("clinic_id", flat=True).distinct())
+        result = super().update(**kwargs)
+        for clinic_id in clinic_ids:
+            transaction.on_commit(partial(patient_cache.invalidate_clinic, clinic_id), using=db)
+        return result
+
+    update.alters_data = True
+
+
+class PatientManager(models.Manager.from_queryset(PatientQuerySet)):
+    def cached(self, clinic, pk):
+        """
+        Paciente `pk` da clínica (instância ou id) via patient_cache; None se
+        não existir. Cada chamada recebe uma cópia: alterar o objeto não
+        afeta o cache (gravar com save() o invalida).
+        """
+        clinic_id = getattr(clinic, "pk", clinic)
+        patient = patient_cache.get_or_set(
+            clinic_id, pk, lambda: self.for_clinic(clinic_id).filter(pk=pk).first()
+        )
+        return copy.copy(patient) if patient is not None else None
+
+    def bulk_upsert(self, rows, *, clinic, batch_size=1000):
+        """
+        Insere ou atualiza pacientes de `clinic` casando pelo CPF normalizado.
+
+        `rows` é um iterável de dicts com nomes de campos de Patient. Cada lote
+        faz uma única consulta de CPFs existentes, um INSERT em massa e um
+        UPDATE em massa. Mantém a regra de Patient.save(): um registro legado
+        mascarado só é normalizado se isso não colidir com outro CPF.
+
+        Retorna (criados, atualizados).
+        """
+        field_names = {f.name for f in self.model._meta.concrete_fields if f.editable} - {"id", "clinic", "created_at", "updated_at"}
+        created = updated = 0
+        batch = []
+        for row in rows:
+            unknown = set(row) - field_names
+            if unknown:
+                raise ValueError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+            batch.append(row)
+            if len(batch) >= batch_size:
+                c, u = self._upsert_batch(batch, clinic)
+                created, updated, batch = created + c, updated + u, []
+        if batch:
+            c, u = self._upsert_batch(batch, clinic)
+            created, updated = created + c, updated + u
+        return created, updated
+
+    def _upsert_batch(self, rows, clinic):
+        digits_of = [normalize_cpf(row.get("cpf")) for row in rows]
+        wanted = {d for d in digits_of if d}
+        touched = with_normalized_fields(self.model, set().union(*rows) | {"cpf", "updated_at"})
+        # Lê os existentes do banco de escrita: uma réplica atrasada geraria duplicatas
+        db = self._db or router.db_for_write(self.model)
+
+        # Vários registros podem existir para o mesmo CPF (legado mascarado + limpo);
+        # preferimos o que já está normalizado.
+        existing = {}
+        if wanted:
+            qs = (
+                self.using(db)
+                .for_clinic(clinic)
+                .filter(cpf_digits__in=wanted)
+                .only("pk", "clinic_id", *touched, *COUNTED_FIELDS)
+                .order_by("pk")
+            )
+            for patient in qs:
+                digits = patient.cpf_digits
+                if digits not in existing or patient.cpf == digits:
+                    existing[digits] = patient
+        normalized_taken = {d for d, p in existing.items() if p.cpf == d}
+
+        to_create = {}
+        new_without_cpf = []
+        to_update = {}
+        now = timezone.now()
+        for row, digits in zip(rows, digits_of):
+            patient = existing.get(digits) if digits else None
+            if patient is None:
+                values = dict(row, cpf=digits)
+                if not digits:
+                    new_without_cpf.append(self.model(clinic=clinic, **values))
+                elif digits in to_create:
+                    for name, value in values.items():
+                        setattr(to_create[digits], name, value)
+                else:
+                    to_create[digits] = self.model(clinic=clinic, **values)
+                continue
+
+            for name, value in row.items():
+                if name != "cpf":
+                    setattr(patient, name, value)
+            if patient.cpf != digits and digits not in normalized_taken:
+                patient.cpf = digits
+                normalized_taken.add(digits)
+            patient.updated_at = now
+            refresh_normalized_fields(patient, only=touched)
+            to_update[patient.pk] = patient
+
+        counters = PatientCounter.objects.db_manager(db)
+        with transaction.atomic(using=db):
+            created = bulk_insert(self.model, [*to_create.values(), *new_without_cpf], using=db)
+            if to_update:
+                self.db_manager(db).bulk_update(list(to_update.values()), sorted(touched))
+                counters.record_changed(to_update.values())
+        return created, len(to_update)
+
 
 class Patient(models.Model):
     """
@@ -53,6 +319,8 @@ class Patient(models.Model):
 
     # Identificação
     full_name = models.CharField("Nome completo", max_length=150)
+    # Sem acentos e minúsculo; indexado com trigramas no PostgreSQL (ver patients.search)
+    search_name = NormalizedCharField("Nome (busca)", max_length=150, source="full_name", normalizer=search_key)
     gender = models.CharField(
         "Gênero",
         max_length=20,
@@ -70,6 +338,10 @@ class Patient(models.Model):
     whatsapp_phone = models.CharField("WhatsApp", max_length=20, blank=True)
     email = models.EmailField("Email", blank=True)
     extra_phone = models.CharField("Telefone extra", max_length=20, blank=True)
+    # Formas canônicas para casar contatos (ver find_by_contact)
+    whatsapp_e164 = NormalizedCharField("WhatsApp (E.164)", max_length=20, source="whatsapp_phone", normalizer=normalize_phone)
+    extra_phone_e164 = NormalizedCharField("Telefone extra (E.164)", max_length=20, source="extra_phone", normalizer=normalize_phone)
+    email_normalized = NormalizedCharField("Email (normalizado)", max_length=254, source="email", normalizer=normalize_email)
 
     # Dados gerais
     how_knew_clinic = models.CharField("Como conheceu a clínica", max_length=80, blank=True)
@@ -79,6 +351,8 @@ class Patient(models.Model):
     # Documentos
     cpf = models.CharField("CPF", max_length=14, blank=True,
 validators=[validate_cpf]) 
+    # Só dígitos, sempre preenchido (o cpf pode ficar mascarado em colisões legadas)
+    cpf_digits = NormalizedCharField("CPF (dígitos)", max_length=14, source="cpf", normalizer=normalize_cpf)
     rg = models.CharField("RG", max_length=20, blank=True)
 
     # Observações / categorias
@@ -88,6 +362,9 @@ validators=[validate_cpf])
     # Contato de emergência
     emergency_contact_name = models.CharField("Nome (emergência)", max_length=120, blank=True)
     emergency_contact_phone = models.CharField("Telefone (emergência)", max_length=20, blank=True)
+    emergency_contact_phone_e164 = NormalizedCharField(
+        "Telefone (emergência, E.164)", max_length=20, source="emergency_contact_phone", normalizer=normalize_phone,
+    )
 
     # Endereço
     cep = models.CharField("CEP", max_length=10, blank=True)
@@ -114,6 +391,8 @@ choices=UF_CHOICES )
     created_at = models.DateTimeField("Criado em", auto_now_add=True)
     updated_at = models.DateTimeField("Atualizado em", auto_now=True)
 
+    objects = PatientManager()
+
     class Meta:
         verbose_name = "Paciente"
         verbose_name_plural = "Pacientes"
@@ -122,6 +401,11 @@ choices=UF_CHOICES )
             models.Index(fields=["clinic", "full_name"]),
             models.Index(fields=["clinic", "whatsapp_phone"]),
             models.Index(fields=["clinic", "cpf"]),
+            models.Index(fields=["clinic", "cpf_digits"]),
+            models.Index(fields=["clinic", "whatsapp_e164"]),
+            models.Index(fields=["clinic", "extra_phone_e164"]),
+            models.Index(fields=["clinic", "emergency_contact_phone_e164"]),
+            models.Index(fields=["clinic", "email_normalized"]),
         ]
         constraints = [
             # CPF não pode ser "globalmente único" num SaaS.
@@ -135,29 +419,296 @@ choices=UF_CHOICES )
 
     def clean(self):
         if self.cpf:
-            self.cpf = re.sub(r"\D", "", self.cpf)
-            # Check for duplicates on the normalized value
-            qs = Patient.objects.filter(clinic=self.clinic, cpf=self.cpf)
+            self.cpf = normalize_cpf(self.cpf)
+            # Check for duplicates on the normalized value (inclusive legados mascarados)
+            qs = Patient.objects.filter(clinic=self.clinic, cpf_digits=self.cpf)
             if self.pk:
                 qs = qs.exclude(pk=self.pk)
             if qs.exists():
                 raise ValidationError({"cpf": "CPF já cadastrado nesta clínica."})
+            # save() logo em seguida não precisa se proteger de novo (ver save)
+            self._cpf_checked = self.cpf
         super().clean()
 
+    def validate_constraints(self, exclude=None):
+        # clean() já verificou uniq_patient_cpf_per_clinic (com mensagem melhor);
+        # evita uma segunda consulta igual no full_clean().
+        exclude = set(exclude or ()) | {"cpf"}
+        super().validate_constraints(exclude=exclude)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if instance._counter_fields_loaded():
+            instance._counted_as = instance._counter_row()
+        return instance
+
+    def _counter_fields_loaded(self) -> bool:
+        return self.get_deferred_fields().isdisjoint(("clinic_id", *COUNTED_FIELDS))
+
+    def _counter_row(self):
+        return (self.clinic_id, *(getattr(self, name) for name in COUNTED_FIELDS))
+
     def save(self, *args, **kwargs):
-        if self.cpf:
-            clean_cpf = re.sub(r"\D", "", self.cpf)
-            # Safe Normalization: Only normalize if it doesn't cause a collision.
-            # This prevents legacy duplicates (e.g. masked vs unmasked) from causing IntegrityError on save.
-            qs = Patient.objects.filter(clinic=self.clinic, cpf=clean_cpf)
-            if self.pk:
-                qs = qs.exclude(pk=self.pk)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = with_normalized_fields(type(self), kwargs["update_fields"])
+        original = self.cpf
+        if original:
+            self.cpf = normalize_cpf(original)
+        if self.cpf == original:
+            return self._save_counted(False, *args, **kwargs)
 
-            if not qs.exists():
-                self.cpf = clean_cpf
-            # If it exists, we keep self.cpf as is (potentially masked) to avoid crash.
+        # Safe Normalization: tentamos gravar o CPF normalizado e deixamos a
+        # constraint uniq_patient_cpf_per_clinic acusar a colisão, em vez de
+        # fazer um exists() antes de todo INSERT/UPDATE. Se colidir com um
+        # registro legado, mantemos o valor original (mascarado), como antes.
+        #
+        # Dentro de uma transação, um erro de constraint a invalidaria inteira
+        # (PostgreSQL), então isolamos o INSERT/UPDATE num savepoint. Em
+        # autocommit, ou se clean() acabou de conferir este CPF, não precisa.
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        savepoint = transaction.get_connection(using).in_atomic_block and getattr(self, "_cpf_checked", None) != self.cpf
+        try:
+            self._save_counted(savepoint, *args, **kwargs)
+        except IntegrityError as exc:
+            if not self._is_cpf_conflict(exc):
+                raise
+            self.cpf = original
+            self._save_counted(False, *args, **kwargs)
 
-        super().save(*args, **kwargs)
+    def _save_counted(self, savepoint, *args, **kwargs):
+        """
+        save() + PatientCounter na mesma transação, quando a gravação muda as
+        contagens (criação, ou troca de clínica/gênero/convênio/estado).
+        """
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        adding = self._state.adding
+        previous = getattr(self, "_counted_as", None)
+        update_fields = kwargs.get("update_fields")
+        counted = adding or (
+            getattr(self, "_counted_as", None) is not None
+            and self._counter_fields_loaded()
+            and self._counted_as != self._counter_row()
+            and (update_fields is None or not {"clinic", "clinic_id", *COUNTED_FIELDS}.isdisjoint(update_fields))
+        )
+        if not counted:
+            with transaction.atomic(using=using) if savepoint else nullcontext():
+                super().save(*args, **kwargs)
+        else:
+            with transaction.atomic(using=using, savepoint=savepoint):
+                super().save(*args, **kwargs)
+                counters = PatientCounter.objects.db_manager(using)
+                if adding:
+                    counters.record_created([self])
+                else:
+                    counters.record_changed([self])
+        if not adding:
+            self._invalidate_cached(previous, using)
+
+    def _invalidate_cached(self, previous, using):
+        # Só depois do commit: invalidar antes deixaria outra leitura recachear a versão antiga
+        transaction.on_commit(partial(patient_cache.invalidate, self.clinic_id, self.pk), using=using)
+        if previous is not None and previous[0] != self.clinic_id:  # trocou de clínica
+            transaction.on_commit(partial(patient_cache.invalidate, previous[0], self.pk), using=using)
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        row = getattr(self, "_counted_as", None) or self._counter_row()
+        with transaction.atomic(using=using, savepoint=False):
+            pk = self.pk
+            result = super().delete(using=using, keep_parents=keep_parents)
+            PatientCounter.objects.db_manager(using).apply([(row, -1)])
+        transaction.on_commit(partial(patient_cache.invalidate, row[0], pk), using=using)
+        return result
+
+    def _is_cpf_conflict(self, exc) -> bool:
+        message = str(exc)
+        # PostgreSQL cita a constraint; SQLite cita as colunas
+        return "uniq_patient_cpf_per_clinic" in message or f"{self._meta.db_table}.cpf" in message
+
+    def __str__(self) -> str:
+        # Sem select_related, self.clinic custaria uma query por paciente (N+1);
+        # o cache de tenants do processo normalmente já tem a clínica.
+        if Patient.clinic.is_cached(self):
+            clinic = self.clinic
+        else:
+            clinic = get_clinic(pk=self.clinic_id) or self.clinic
+        return f"{self.full_name} ({clinic})"
+
+class PatientCounterManager(models.Manager):
+    def record_created(self, patients):
+        deltas = []
+        for patient in patients:
+            patient._counted_as = patient._counter_row()
+            deltas.append((patient._counted_as, 1))
+        self.apply(deltas)
+
+    def record_changed(self, patients):
+        """Move a contagem de pacientes cuja clínica/gênero/convênio/estado mudou."""
+        deltas = []
+        for patient in patients:
+            old = getattr(patient, "_counted_as", None)
+            if old is None or not patient._counter_fields_loaded():
+                continue  # valores anteriores desconhecidos: fica para a reconciliação
+            new = patient._counter_row()
+            if new != old:
+                deltas += [(old, -1), (new, 1)]
+                patient._counted_as = new
+        self.apply(deltas)
+
+    def apply(self, deltas, batch_size=200):
+        """
+        Soma os deltas [((clinic_id, gênero, convênio, estado), n), ...] aos
+        contadores com um upsert (INSERT ... ON CONFLICT DO UPDATE) por lote.
+        Roda na transação de quem chamou.
+        """
+        totals = Counter()
+        for row, n in deltas:
+            for key in _counter_keys(row):
+                totals[key] += n
+        # Sempre na mesma ordem (da chave): dois lotes concorrentes travam as
+        # linhas na mesma sequência e não entram em deadlock um com o outro
+        items = sorted((key, n) for key, n in totals.items() if n)
+        if not items:
+            return
+
+        connection = connections[self._db or router.db_for_write(self.model)]
+        qn = connection.ops.quote_name
+        table = qn(self.model._meta.db_table)
+        columns = ", ".join(qn(c) for c in ("clinic_id", "dimension", "value", "count"))
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            sql = (
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join(['(%s, %s, %s, %s)'] * len(chunk))} "
+                f"ON CONFLICT ({qn('clinic_id')}, {qn('dimension')}, {qn('value')}) "
+                f"DO UPDATE SET {qn('count')} = {table}.{qn('count')} + EXCLUDED.{qn('count')}"
+            )
+            params = [param for (clinic_id, dimension, value), n in chunk for param in (clinic_id, dimension, value, n)]
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+    def summary(self, clinic) -> dict:
+        """Total e contagens por gênero/convênio/estado da clínica, numa query (zeros sem clínica)."""
+        if clinic is None:
+            return self._summary([])
+        return self._summary(self.filter(clinic=clinic).values_list("dimension", "value", "count"))
+
+    async def asummary(self, clinic) -> dict:
+        if clinic is None:
+            return self._summary([])
+        rows = self.filter(clinic=clinic).values_list("dimension", "value", "count")
+        return self._summary([row async for row in rows])
+
+    def _summary(self, rows) -> dict:
+        counts = {"total": 0, **{name: {} for name in COUNTED_FIELDS}}
+        for dimension, value, count in rows:
+            if dimension == "":
+                counts["total"] = count
+            elif count and dimension in counts:
+                counts[dimension][value] = count
+        return counts
+
+    def reconcile(self, clinic) -> int:
+        """
+        Recalcula os contadores da clínica a partir da tabela de pacientes e
+        corrige os que divergirem. Retorna quantos foram corrigidos.
+
+        Os contadores existentes ficam travados (select_for_update) durante a
+        contagem: gravações concorrentes esperam e somam sobre o valor corrigido.
+        """
+        db = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            stored = {
+                (dimension, value): (pk, count)
+                for pk, dimension, value, count in self.select_for_update()
+                .filter(clinic=clinic)
+                .values_list("pk", "dimension", "value", "count")
+            }
+            patients = Patient.objects.using(db).for_clinic(clinic).order_by()
+            expected = {("", ""): patients.count()}
+            for name in COUNTED_FIELDS:
+                for value, n in patients.values_list(name).annotate(n=models.Count("pk")):
+                    expected[(name, value)] = n
+
+            wrong = [
+                self.model(clinic_id=clinic.pk, dimension=dimension, value=value, count=n)
+                for (dimension, value), n in expected.items()
+                if stored.get((dimension, value), (None, None))[1] != n
+            ]
+            stale = [pk for key, (pk, count) in stored.items() if key not in expected]
+            if wrong:
+                self.bulk_create(
+                    wrong,
+                    update_conflicts=True,
+                    unique_fields=["clinic", "dimension", "value"],
+                    update_fields=["count"],
+                )
+            if stale:
+                self.filter(pk__in=stale).delete()
+        return len(wrong) + len(stale)
+
+
+class PatientCounter(models.Model):
+    """
+    Contagem de pacientes por clínica, mantida a cada criação/remoção (inclusive
+    em massa) para o dashboard não precisar de COUNT(*) na tabela de pacientes.
+
+    dimension="" é o total; as demais linhas contam por gênero, convênio e estado.
+    QuerySet.update() e SQL direto não passam por aqui: o comando
+    reconcile_patient_counters corrige eventuais desvios.
+    """
+    clinic = models.ForeignKey(
+        Clinic,
+        on_delete=models.CASCADE,
+        related_name="patient_counters",
+        verbose_name="Clínica",
+    )
+    dimension = models.CharField("Dimensão", max_length=30, blank=True, default="")
+    value = models.CharField("Valor", max_length=120, blank=True, default="")
+    count = models.BigIntegerField("Quantidade", default=0)
+
+    objects = PatientCounterManager()
+
+    class Meta:
+        verbose_name = "Contador de pacientes"
+        verbose_name_plural = "Contadores de pacientes"
+        constraints = [
+            models.UniqueConstraint(fields=["clinic", "dimension", "value"], name="uniq_patient_counter"),
+        ]
+
+    def __str__(self) -> str:
+        label = f"{self.dimension}={self.value}" if self.dimension else "total"
+        return f"{self.clinic_id}: {label} = {self.count}"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Par de pacientes da mesma clínica que provavelmente são a mesma pessoa,
+    com a pontuação e os motivos (ver patients.duplicates). Recalculado por
+    find_duplicate_patients; patient_a é sempre o de menor id.
+    """
+    clinic = models.ForeignKey(
+        Clinic,
+        on_delete=models.CASCADE,
+        related_name="duplicate_candidates",
+        verbose_name="Clínica",
+    )
+    patient_a = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="+", verbose_name="Paciente A")
+    patient_b = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="+", verbose_name="Paciente B")
+    score = models.FloatField("Pontuação")
+    # Ex.: "cpf,nome,nascimento"
+    reasons = models.CharField("Motivos", max_length=80)
+    created_at = models.DateTimeField("Criado em", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Possível duplicata"
+        verbose_name_plural = "Possíveis duplicatas"
+        indexes = [
+            models.Index(fields=["clinic", "-score"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["patient_a", "patient_b"], name="uniq_duplicate_candidate_pair"),
+        ]
 
     def __str__(self) -> str:
-        return f"{self.full_name} ({self.clinic})"
\ No newline at end of file
+        return f"{self.patient_a_id} ~ {self.patient_b_id} ({self.score:.2f})"
@@ -0,0 +1,74 @@
+"""
+Normalizações usadas pelas colunas derivadas de Patient (ver fields.NormalizedCharField).
+
+Precisam ser funções de módulo (são referenciadas nas migrations) e baratas:
+rodam em todo save() e nos caminhos em massa.
+"""
+import re
+import unicodedata
+
+_SPACES = re.compile(r"\s+")
+_NON_DIGIT = re.compile(r"\D")
+BRAZIL_CODE = "55"
+
+
+def search_key(value) -> str:
+    """
+    Chave de busca de nomes: sem acentos, minúscula e com espaços simples.
+    "  João  da SILVA " -> "joao da silva"
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_marks = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(" ", without_marks.casefold()).strip()
+
+
+def normalize_phone(value) -> str:
+    """
+    Telefone no formato E.164 ("+5511988887777"). Sem código de país, assume
+    Brasil: "(11) 98888-7777", "011 98888-7777", "+55 11 988887777" e
+    "11988887777" viram o mesmo valor. Números curtos demais para ter DDD
+    ficam só com os dígitos.
+    """
+    if not value:
+        return ""
+    value = value.strip()
+    digits = _NON_DIGIT.sub("", value)
+    if not digits:
+        return ""
+    if value.startswith("+"):
+        return "+" + digits
+    if digits.startswith("00"):  # prefixo internacional discado
+        return "+" + digits[2:]
+    if digits.startswith("0") and len(digits) in (11, 12):  # 0 + DDD (prefixo de operadora já removido)
+        digits = digits[1:]
+    if len(digits) in (10, 11):  # DDD + número
+        return "+" + BRAZIL_CODE + digits
+    if len(digits) in (12, 13) and digits.startswith(BRAZIL_CODE):
+        return "+" + digits
+    return digits
+
+
+def phone_variants(e164: str) -> list:
+    """
+    Formas equivalentes de um celular brasileiro: o WhatsApp às vezes entrega
+    o número sem o nono dígito (+55 11 8888-7777).
+    """
+    if not e164:
+        return []
+    variants = [e164]
+    if e164.startswith("+55"):
+        local = e164[5:]
+        if len(local) == 9 and local[0] == "9":
+            variants.append(e164[:5] + local[1:])
+        elif len(local) == 8 and local[0] in "6789":
+            variants.append(e164[:5] + "9" + local)
+    return variants
+
+
+def normalize_email(value) -> str:
+    """Email para comparação: sem espaços nas pontas e com case folding."""
+    if not value:
+        return ""
+    return value.strip().casefold()
@@ -0,0 +1,181 @@
+"""
+Busca de pacientes por nome, tolerante a acentos e erros de digitação.
+
+No PostgreSQL usa `search_name` (nome sem acentos, minúsculo) com o índice
+GIN de trigramas (clinic_id, search_name) criado na migration 0004, e ordena
+pela similaridade. Em outros bancos (SQLite em dev/testes) filtra com LIKE e
+ordena em Python com difflib, lendo os candidatos em lotes e guardando só os
+melhores — correto, mas sem índice.
+
+Buscas que parecem CPF, telefone ou email vão direto para os índices das
+colunas normalizadas (cpf_digits, whatsapp_e164, email_normalized...).
+
+asearch_patients() é a mesma busca com o ORM assíncrono, para as views ASGI.
+"""
+import heapq
+from difflib import SequenceMatcher
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.db.models.lookups import Contains
+
+from .fields import NormalizedCharField
+from .models import Patient
+from .normalizers import normalize_email, normalize_phone, phone_variants, search_key
+from .validators import normalize_cpf
+
+DEFAULT_LIMIT = 20
+# Nota mínima no fallback em Python. No PostgreSQL quem decide é o operador %>
+# (pg_trgm.word_similarity_threshold, padrão 0.6).
+MIN_SCORE = 0.6
+# Candidatos lidos por vez no fallback sem índice (todos são examinados)
+FALLBACK_CHUNK = 2000
+
+
+@NormalizedCharField.register_lookup
+class TrigramWordSimilar(Lookup):
+    """`search_name__word_similar="joao"` -> search_name %> 'joao' (usa o índice GIN)."""
+    lookup_name = "word_similar"
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} %%> {rhs}", (*lhs_params, *rhs_params)
+
+    def as_sql(self, compiler, connection):
+        # Sem pg_trgm: cai para substring (search_name já vem sem acentos e minúsculo)
+        return compiler.compile(Contains(self.lhs, self.rhs))
+
+
+class WordSimilarity(Func):
+    function = "word_similarity"
+    output_field = FloatField()
+
+
+def _is_postgres(qs) -> bool:
+    # Sem passar pelo router (que pode consultar o atraso das réplicas e não
+    # pode rodar em contexto async); réplicas usam o mesmo banco do primário.
+    return connections[qs._db or DEFAULT_DB_ALIAS].vendor == "postgresql"
+
+
+def _contact_condition(query):
+    """Q para buscas por CPF, telefone ou email; None se o termo parece um nome."""
+    query = query.strip()
+    if "@" in query and " " not in query:
+        return Q(email_normalized=normalize_email(query))
+    # Só dígitos e pontuação de CPF/telefone
+    if not query or query.strip("0123456789.-+() "):
+        return None
+
+    digits = normalize_cpf(query)
+    condition = Q()
+    if len(digits) == 11:
+        condition |= Q(cpf_digits=digits)
+    if len(digits) >= 10:
+        variants = phone_variants(normalize_phone(query))
+        condition |= Q(whatsapp_e164__in=variants) | Q(extra_phone_e164__in=variants)
+    return condition or None
+
+
+def filter_patients(queryset, query):
+    """
+    Filtra `queryset` pelo termo de busca, sem impor ordenação.
+    Usado pelo admin, que aplica a própria ordenação depois.
+    """
+    contact = _contact_condition(query)
+    if contact is not None:
+        return queryset.filter(contact)
+
+    key = search_key(query)
+    if not key:
+        return queryset
+    if _is_postgres(queryset):
+        return queryset.filter(Q(search_name__word_similar=key) | Q(search_name__contains=key))
+
+    tokens = key.split()
+    condition = Q()
+    for token in tokens:
+        condition &= Q(search_name__contains=token)
+    return queryset.filter(condition)
+
+
+def _score(key, name):
+    """Aproximação em Python do word_similarity do pg_trgm (fallback)."""
+    if key in name:
+        return 1.0
+    words = name.split()
+    best = [max((SequenceMatcher(None, token, word).ratio() for word in words), default=0.0)
+            for token in key.split()]
+    return sum(best) / len(best) if best else 0.0
+
+
+def _search_plan(clinic, query, limit):
+    """
+    (queryset, finish) da busca: `finish(linhas)` produz o resultado final a
+    partir das linhas do queryset. None quando não há o que buscar.
+    """
+    qs = Patient.objects.filter(clinic=clinic).select_related("clinic")
+    contact = _contact_condition(query)
+    if contact is not None:
+        return qs.filter(contact).order_by("pk")[:limit], list
+
+    key = search_key(query)
+    if not key:
+        return None
+
+    if _is_postgres(qs):
+        return (
+            filter_patients(qs, query)
+            .annotate(score=WordSimilarity(Value(key), F("search_name")))
+            .order_by("-score", "search_name", "pk")[:limit]
+        ), list
+
+    # Fallback: candidatos por substring ou pelo prefixo de cada palavra, para
+    # também pegar erros de digitação no fim ("Joaa" -> "joao").
+    tokens = key.split()
+    condition = Q()
+    for token in tokens:
+        condition |= Q(search_name__contains=token) | Q(search_name__contains=token[:3])
+    # Sem corte antes da nota: um limite por pk descartaria os melhores de pk alto
+    candidates = qs.filter(condition).order_by("pk")
+
+    def finish(patients):
+        # nsmallest guarda só `limit` linhas: dá para alimentar com um iterator()
+        scored = ((_score(key, p.search_name), p) for p in patients)
+        best = heapq.nsmallest(
+            limit,
+            (item for item in scored if item[0] >= MIN_SCORE),
+            key=lambda item: (-item[0], item[1].search_name, item[1].pk),
+        )
+        for score, patient in best:
+            patient.score = score
+        return [patient for _, patient in best]
+
+    return candidates, finish
+
+
+def search_patients(clinic, query, limit=DEFAULT_LIMIT):
+    """
+    Pacientes de `clinic` que casam com `query`, do mais para o menos parecido.
+    Aceita nome parcial, com ou sem acento, com pequenos erros, ou um
+    CPF/telefone/email em qualquer formato.
+    """
+    plan = _search_plan(clinic, query, limit)
+    if plan is None:
+        return []
+    qs, finish = plan
+    return finish(qs.iterator(chunk_size=FALLBACK_CHUNK))
+
+
+async def asearch_patients(clinic, query, limit=DEFAULT_LIMIT):
+    """search_patients() com o ORM assíncrono."""
+    plan = _search_plan(clinic, query, limit)
+    if plan is None:
+        return []
+    qs, finish = plan
+    rows = []
+    async for patient in qs.aiterator(chunk_size=FALLBACK_CHUNK):
+        rows.append(patient)
+        if len(rows) >= FALLBACK_CHUNK:
+            rows = finish(rows)  # mantém só os melhores até aqui
+    return finish(rows)
@@ -0,0 +1,11 @@
+from django.dispatch import receiver
+
+from core.bulk import copy_inserted
+
+from .models import Patient, PatientCounter
+
+
+@receiver(copy_inserted, sender=Patient)
+def patients_copied(sender, objs, using, **kwargs):
+    # O caminho bulk_create() já conta em PatientQuerySet.bulk_create()
+    PatientCounter.objects.db_manager(using).record_created(objs)
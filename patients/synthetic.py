@@ -0,0 +1,316 @@
+"""
+Dados sintéticos realistas para testes de carga e benchmarks (comando
+seed_data): clínicas e pacientes com CPF válido, nomes brasileiros,
+telefones com o DDD da cidade, CEP na faixa do município e cidade coerente
+com a UF. O tamanho das clínicas segue uma lei de potência (poucas grandes,
+muitas pequenas), como numa base real.
+
+Tudo sai de `seed`: cada bloco de CHUNK pacientes tem o próprio Random,
+semeado com (seed, posição do bloco), então o resultado não depende de
+quantos processos geraram. Os blocos são montados num ProcessPoolExecutor e
+gravados pelo processo principal: no PostgreSQL o worker já devolve o texto
+do COPY; nos demais bancos, as instâncias vão para bulk_insert().
+"""
+import random
+import time
+from collections import Counter, deque
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.db import connections, router, transaction
+
+from core.bulk import bulk_insert, copy_from, copy_rows
+from core.executors import process_pool
+from core.models import Clinic
+from .models import Patient, PatientCounter
+from .normalizers import search_key
+from .validators import cpf_from_number
+
+CHUNK = 10_000
+DEFAULT_SKEW = 1.1
+# "Hoje" dos dados: as idades não mudam com o relógio
+REFERENCE_DATE = date(2025, 1, 1)
+# 3**18 é primo com 10**9: índice do paciente -> base do CPF é uma bijeção
+CPF_STEP = 387_420_489
+
+# População aproximada (milhões): peso da UF de clínicas e pacientes
+UF_WEIGHTS = {
+    "SP": 46, "MG": 21, "RJ": 17, "BA": 14, "PR": 11.5, "RS": 11, "PE": 9.5, "CE": 9, "PA": 8,
+    "SC": 7.6, "GO": 7, "MA": 6.8, "AM": 4, "PB": 4, "ES": 3.8, "MT": 3.7, "RN": 3.3, "PI": 3.3,
+    "AL": 3.1, "DF": 2.8, "MS": 2.8, "SE": 2.2, "RO": 1.6, "TO": 1.5, "AC": 0.8, "AP": 0.7, "RR": 0.6,
+}
+
+# (cidade, DDD, faixa dos 5 primeiros dígitos do CEP); a primeira é a capital
+CITIES = {
+    "SP": [("São Paulo", "11", 1000, 5999), ("Campinas", "19", 13000, 13139), ("Santos", "13", 11000, 11099),
+           ("Ribeirão Preto", "16", 14000, 14114), ("Sorocaba", "15", 18000, 18109),
+           ("São José dos Campos", "12", 12200, 12248)],
+    "RJ": [("Rio de Janeiro", "21", 20000, 23799), ("Niterói", "21", 24000, 24399),
+           ("Petrópolis", "24", 25600, 25779), ("Campos dos Goytacazes", "22", 28000, 28099)],
+    "ES": [("Vitória", "27", 29000, 29099), ("Vila Velha", "27", 29100, 29129),
+           ("Cachoeiro de Itapemirim", "28", 29300, 29319)],
+    "MG": [("Belo Horizonte", "31", 30000, 31999), ("Uberlândia", "34", 38400, 38414),
+           ("Juiz de Fora", "32", 36000, 36099), ("Montes Claros", "38", 39400, 39409)],
+    "BA": [("Salvador", "71", 40000, 42599), ("Feira de Santana", "75", 44000, 44099),
+           ("Vitória da Conquista", "77", 45000, 45099)],
+    "SE": [("Aracaju", "79", 49000, 49099), ("Lagarto", "79", 49400, 49409)],
+    "PE": [("Recife", "81", 50000, 52999), ("Caruaru", "81", 55000, 55099), ("Petrolina", "87", 56300, 56399)],
+    "AL": [("Maceió", "82", 57000, 57099), ("Arapiraca", "82", 57300, 57319)],
+    "PB": [("João Pessoa", "83", 58000, 58099), ("Campina Grande", "83", 58400, 58439)],
+    "RN": [("Natal", "84", 59000, 59161), ("Mossoró", "84", 59600, 59649)],
+    "CE": [("Fortaleza", "85", 60000, 61599), ("Sobral", "88", 62000, 62119),
+           ("Juazeiro do Norte", "88", 63000, 63059)],
+    "PI": [("Teresina", "86", 64000, 64099), ("Parnaíba", "86", 64200, 64219)],
+    "MA": [("São Luís", "98", 65000, 65099), ("Imperatriz", "99", 65900, 65919)],
+    "PA": [("Belém", "91", 66000, 66999), ("Santarém", "93", 68000, 68109), ("Marabá", "94", 68500, 68509)],
+    "AP": [("Macapá", "96", 68900, 68914), ("Santana", "96", 68925, 68929)],
+    "AM": [("Manaus", "92", 69000, 69099), ("Parintins", "92", 69150, 69159)],
+    "RR": [("Boa Vista", "95", 69300, 69339)],
+    "AC": [("Rio Branco", "68", 69900, 69924), ("Cruzeiro do Sul", "68", 69980, 69989)],
+    "DF": [("Brasília", "61", 70000, 70999), ("Taguatinga", "61", 72000, 72199), ("Ceilândia", "61", 72200, 72299)],
+    "GO": [("Goiânia", "62", 74000, 74899), ("Anápolis", "62", 75000, 75139), ("Rio Verde", "64", 75900, 75909)],
+    "TO": [("Palmas", "63", 77000, 77299), ("Araguaína", "63", 77800, 77829)],
+    "MT": [("Cuiabá", "65", 78000, 78109), ("Várzea Grande", "65", 78110, 78159),
+           ("Rondonópolis", "66", 78700, 78749)],
+    "RO": [("Porto Velho", "69", 76800, 76834), ("Ji-Paraná", "69", 76900, 76919)],
+    "MS": [("Campo Grande", "67", 79000, 79124), ("Dourados", "67", 79800, 79849)],
+    "PR": [("Curitiba", "41", 80000, 82999), ("Londrina", "43", 86000, 86099), ("Maringá", "44", 87000, 87099),
+           ("Foz do Iguaçu", "45", 85850, 85869)],
+    "SC": [("Florianópolis", "48", 88000, 88099), ("Blumenau", "47", 89000, 89099),
+           ("Joinville", "47", 89200, 89239)],
+    "RS": [("Porto Alegre", "51", 90000, 91999), ("Caxias do Sul", "54", 95000, 95099),
+           ("Pelotas", "53", 96000, 96099)],
+}
+
+FEMALE = ["Maria", "Ana", "Francisca", "Antônia", "Adriana", "Juliana", "Márcia", "Fernanda", "Patrícia",
+          "Aline", "Sandra", "Camila", "Amanda", "Bruna", "Jéssica", "Letícia", "Júlia", "Luciana", "Vanessa",
+          "Mariana", "Gabriela", "Beatriz", "Larissa", "Helena", "Alice", "Laura", "Valentina", "Sophia",
+          "Isabela", "Manuela", "Rafaela", "Carolina", "Renata", "Tatiane", "Cristiane", "Simone", "Débora"]
+MALE = ["José", "João", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas", "Luiz", "Marcos",
+        "Luis", "Gabriel", "Rafael", "Daniel", "Marcelo", "Bruno", "Eduardo", "Felipe", "Raimundo", "Rodrigo",
+        "Miguel", "Arthur", "Heitor", "Bernardo", "Davi", "Théo", "Gustavo", "Matheus", "Leonardo",
+        "Thiago", "André", "Fernando", "Fábio", "Ricardo", "Sérgio", "Vinícius", "Diego"]
+SURNAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima",
+            "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes",
+            "Vieira", "Barbosa", "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques",
+            "Machado", "Mendes", "Freitas", "Cardoso", "Ramos", "Gonçalves", "Santana", "Teixeira", "Araújo",
+            "Cavalcanti", "Monteiro", "Moura", "Correia", "Pinto", "Campos", "Batista", "Azevedo", "Cunha"]
+CONNECTORS = ["de", "da", "dos"]
+
+STREET_TYPES = ["Rua", "Rua", "Rua", "Avenida", "Travessa", "Alameda"]
+STREETS = ["das Flores", "Sete de Setembro", "Quinze de Novembro", "XV de Agosto", "Tiradentes",
+           "Dom Pedro II", "Santos Dumont", "Rui Barbosa", "Getúlio Vargas", "Marechal Deodoro",
+           "São João", "Brasil", "Independência", "Castro Alves", "Barão do Rio Branco", "José Bonifácio",
+           "Duque de Caxias", "Princesa Isabel", "das Palmeiras", "Boa Vista"]
+NEIGHBORHOODS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", "Santa Mônica", "São José",
+                 "Jardim Europa", "Industrial", "Aeroporto", "Bela Vista", "Santo Antônio", "Parque das Nações"]
+PROFESSIONS = ["Professor(a)", "Vendedor(a)", "Enfermeiro(a)", "Motorista", "Engenheiro(a)", "Advogado(a)",
+               "Administrador(a)", "Autônomo(a)", "Aposentado(a)", "Estudante", "Comerciante", "Cozinheiro(a)",
+               "Analista de sistemas", "Contador(a)", "Do lar", "Servidor(a) público(a)"]
+HOW_KNEW = ["Indicação", "Google", "Instagram", "Convênio", "Passou em frente", "Facebook"]
+EMAIL_DOMAINS = ["gmail.com", "gmail.com", "gmail.com", "hotmail.com", "outlook.com", "yahoo.com.br",
+                 "uol.com.br", "bol.com.br"]
+INSURANCES = [("Particular", 40), ("Unimed", 18), ("Bradesco Saúde", 9), ("Amil", 8), ("Hapvida", 8),
+              ("SulAmérica", 7), ("NotreDame Intermédica", 5), ("Porto Seguro Saúde", 3), ("Cassi", 2)]
+
+_UFS = list(UF_WEIGHTS)
+_UF_CUM = list(accumulate(UF_WEIGHTS.values()))
+# Capital pesa 4, o interior 1
+_CITY_CUM = {uf: list(accumulate(4 if i == 0 else 1 for i in range(len(cities)))) for uf, cities in CITIES.items()}
+_INSURANCE_NAMES = [name for name, _ in INSURANCES]
+_INSURANCE_CUM = list(accumulate(weight for _, weight in INSURANCES))
+
+
+def clinic_sizes(total, n, *, skew=DEFAULT_SKEW, seed=0) -> list:
+    """Divide `total` pacientes entre `n` clínicas com pesos 1/k**skew (0 = iguais), em ordem aleatória."""
+    weights = [1 / (k + 1) ** skew for k in range(n)]
+    random.Random(f"{seed}:sizes").shuffle(weights)
+    shares = [w * total / sum(weights) for w in weights]
+    sizes = [int(share) for share in shares]
+    # O que sobrou do arredondamento vai para os maiores restos
+    by_remainder = sorted(range(n), key=lambda i: shares[i] - sizes[i], reverse=True)
+    for i in by_remainder[:total - sum(sizes)]:
+        sizes[i] += 1
+    return sizes
+
+
+def clinic_rows(n, *, prefix="seed", seed=0) -> list:
+    """[(slug, nome, uf, cidade)] das `n` clínicas."""
+    rng = random.Random(f"{seed}:clinics")
+    rows = []
+    for i in range(n):
+        uf = rng.choices(_UFS, cum_weights=_UF_CUM)[0]
+        city = rng.choices(CITIES[uf], cum_weights=_CITY_CUM[uf])[0][0]
+        name = f"Clínica {rng.choice(SURNAMES)} {i + 1} - {city}/{uf}"
+        rows.append((f"{prefix}-{i + 1:04d}", name, uf, city))
+    return rows
+
+
+def _cpf(number) -> str:
+    try:
+        return cpf_from_number(number % 10**9)
+    except ValueError:  # todos os dígitos iguais
+        return ""
+
+
+def _name(rng, first_names):
+    parts = [rng.choice(first_names)]
+    if rng.random() < 0.3:
+        parts.append(rng.choice(first_names))
+    if rng.random() < 0.15:
+        parts.append(rng.choice(CONNECTORS))
+    parts.append(rng.choice(SURNAMES))
+    if rng.random() < 0.7:
+        parts.append(rng.choice(SURNAMES))
+    return parts
+
+
+def _phone(rng, ddd, mobile=True) -> str:
+    if mobile:
+        return f"({ddd}) 9{rng.randint(6000, 9999)}-{rng.randrange(10000):04d}"
+    return f"({ddd}) {rng.randint(2000, 5999)}-{rng.randrange(10000):04d}"
+
+
+def _birth(rng, min_years, max_years) -> date:
+    return REFERENCE_DATE - timedelta(days=rng.randint(min_years * 365, max_years * 365))
+
+
+def make_patient(rng, clinic_id, clinic_uf, cpf_number, guardian_cpf_number) -> Patient:
+    roll = rng.random()
+    gender = "female" if roll < 0.51 else "male" if roll < 0.985 else "na" if roll < 0.995 else "other"
+    first_names = FEMALE if gender == "female" else MALE if gender == "male" else rng.choice((FEMALE, MALE))
+    parts = _name(rng, first_names)
+    # 90% moram na UF da clínica
+    uf = clinic_uf if rng.random() < 0.9 else rng.choices(_UFS, cum_weights=_UF_CUM)[0]
+    city, ddd, cep_from, cep_to = rng.choices(CITIES[uf], cum_weights=_CITY_CUM[uf])[0]
+    birth_date = REFERENCE_DATE - timedelta(days=int(rng.triangular(0, 90 * 365, 38 * 365)))
+    age = (REFERENCE_DATE - birth_date).days // 365
+    is_foreigner = rng.random() < 0.01
+
+    patient = Patient(
+        clinic_id=clinic_id,
+        full_name=" ".join(parts),
+        gender=gender,
+        birth_date=birth_date,
+        whatsapp_phone=_phone(rng, ddd),
+        is_foreigner=is_foreigner,
+        cep=f"{rng.randint(cep_from, cep_to):05d}-{rng.randrange(1000):03d}",
+        address_line=f"{rng.choice(STREET_TYPES)} {rng.choice(STREETS)}",
+        address_number=str(rng.randint(1, 3000)),
+        address_complement=f"Apto {rng.randint(1, 30)}{rng.randint(1, 8):02d}" if rng.random() < 0.3 else "",
+        neighborhood=rng.choice(NEIGHBORHOODS),
+        city=city,
+        state=uf,
+        insurance_name=rng.choices(_INSURANCE_NAMES, cum_weights=_INSURANCE_CUM)[0],
+        how_knew_clinic=rng.choice(HOW_KNEW) if rng.random() < 0.5 else "",
+    )
+    # Estrangeiros sem CPF; metade das crianças também
+    if not is_foreigner and (age >= 12 or rng.random() < 0.5):
+        patient.cpf = _cpf(cpf_number)
+        if rng.random() < 0.6:
+            patient.rg = f"{rng.randrange(10**8):08d}-{rng.randrange(10)}"
+    if rng.random() < 0.7:
+        local = ".".join(search_key(part) for part in (parts[0], parts[-1])).replace(" ", "")
+        suffix = str(rng.randrange(1000)) if rng.random() < 0.5 else ""
+        patient.email = f"{local}{suffix}@{rng.choice(EMAIL_DOMAINS)}"
+    if rng.random() < 0.2:
+        patient.extra_phone = _phone(rng, ddd, mobile=False)
+    if age < 18:
+        guardian = _name(rng, rng.choice((FEMALE, MALE)))[:-1] + [parts[-1]]
+        patient.guardian_name = " ".join(guardian)
+        patient.guardian_cpf = _cpf(guardian_cpf_number)
+        patient.guardian_birth_date = _birth(rng, age + 18, age + 45)
+        patient.emergency_contact_name = patient.guardian_name
+        patient.emergency_contact_phone = _phone(rng, ddd)
+    else:
+        if rng.random() < 0.6:
+            patient.profession = rng.choice(PROFESSIONS)
+        if rng.random() < 0.4:
+            patient.emergency_contact_name = " ".join(_name(rng, rng.choice((FEMALE, MALE))))
+            patient.emergency_contact_phone = _phone(rng, ddd)
+    if patient.insurance_name != "Particular":
+        patient.insurance_card_number = f"{rng.randrange(10**16):016d}"
+        patient.insurance_holder_name = patient.guardian_name or patient.full_name
+        patient.insurance_guardian_cpf = patient.guardian_cpf
+    return patient
+
+
+def generate_chunk(seed, clinic_id, clinic_uf, start, count, using=None):
+    """
+    Pacientes de índice global start..start+count (um bloco). Com `using`
+    (PostgreSQL), devolve (texto do COPY, deltas dos contadores); senão,
+    (instâncias, None). Roda nos workers: não abre conexão.
+    """
+    rng = random.Random(f"{seed}:{start}")
+    offset = random.Random(f"{seed}:cpf").randrange(10**9)
+    patients = [
+        # Responsáveis usam os índices do fim da bijeção: não colidem com pacientes
+        make_patient(rng, clinic_id, clinic_uf, index * CPF_STEP + offset, (10**9 - 1 - index) * CPF_STEP + offset)
+        for index in range(start, start + count)
+    ]
+    if using is None:
+        return patients, None
+    deltas = Counter(patient._counter_row() for patient in patients)
+    return copy_rows(Patient, patients, connections[using]), list(deltas.items())
+
+
+def create_clinics(n, *, prefix="seed", seed=0) -> list:
+    rows = clinic_rows(n, prefix=prefix, seed=seed)
+    Clinic.objects.bulk_create(Clinic(slug=slug, name=name) for slug, name, _, _ in rows)
+    by_slug = Clinic.objects.in_bulk([row[0] for row in rows], field_name="slug")
+    return [(by_slug[slug], uf) for slug, _, uf, _ in rows]
+
+
+def seed_patients(clinics, total, *, skew=DEFAULT_SKEW, seed=0, workers=None, progress=None) -> dict:
+    """
+    Gera e grava `total` pacientes nas `clinics` ([(clínica, uf)]).
+    workers=None usa todos os núcleos; 1 roda sem pool. `progress(n)` é
+    chamado a cada bloco gravado. Retorna estatísticas (pacientes, segundos).
+    """
+    started = time.monotonic()
+    db = router.db_for_write(Patient)
+    connection = connections[db]
+    use_copy = connection.vendor == "postgresql"
+    sizes = clinic_sizes(total, len(clinics), skew=skew, seed=seed)
+
+    def tasks():
+        start = 0
+        for (clinic, uf), size in zip(clinics, sizes):
+            for offset in range(0, size, CHUNK):
+                count = min(CHUNK, size - offset)
+                yield generate_chunk, seed, clinic.pk, uf, start + offset, count, db if use_copy else None
+            start += size
+
+    written = 0
+
+    def write(future):
+        nonlocal written
+        payload, deltas = future.result()
+        # Cada bloco numa transação: os contadores nunca ficam atrás das linhas
+        with transaction.atomic(using=db):
+            if use_copy:
+                copy_from(Patient, payload, connection)
+                PatientCounter.objects.db_manager(db).apply(deltas)
+                written += sum(n for _, n in deltas)
+            else:
+                written += bulk_insert(Patient, payload, batch_size=2000, using=db)
+        if progress:
+            progress(written)
+
+    executor, workers = process_pool(workers)
+    with executor:
+        # Poucos blocos em voo: a memória não cresce com `total`
+        limit = 2 * workers
+        pending = deque()
+        for task in tasks():
+            pending.append(executor.submit(*task))
+            while len(pending) >= limit:
+                write(pending.popleft())
+        while pending:
+            write(pending.popleft())
+
+    with connection.cursor() as cursor:
+        # Estatísticas do planejador para o volume novo
+        for model in (Clinic, Patient, PatientCounter):
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+    return {"patients": written, "seconds": time.monotonic() - started}
@@ -0,0 +1,72 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from core.models import Clinic
+from core.pagination import EstimatedCountPaginator, estimate_count
+from core.testing import analyze
+from patients.models import Patient
+
+
+class PatientChangelistTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.clinics = Clinic.objects.bulk_create([
+            Clinic(name=f"Clínica {i:03d}", slug=f"clinica-{i:03d}") for i in range(200)
+        ])
+        Patient.objects.bulk_create([
+            Patient(clinic=cls.clinics[i % 3], full_name=f"Paciente {i:03d}") for i in range(300)
+        ])
+        cls.admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pw")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/patients/patient/", params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_does_not_depend_on_clinics(self):
+        response, before = self.changelist_queries()
+        # Nenhuma das 200 clínicas sem pacientes vai para a barra lateral
+        self.assertNotContains(response, "Clínica 150")
+        clinic = self.clinics[1]
+        response, filtered_before = self.changelist_queries(clinic__id__exact=clinic.pk)
+        self.assertContains(response, clinic.name)
+        self.assertEqual(response.context["cl"].result_count, 100)
+
+        Clinic.objects.bulk_create([
+            Clinic(name=f"Clínica {i:03d}", slug=f"clinica-{i:03d}") for i in range(200, 400)
+        ])
+        self.assertEqual(self.changelist_queries()[1], before)
+        self.assertEqual(self.changelist_queries(clinic__id__exact=clinic.pk)[1], filtered_before)
+
+    def test_clinic_autocomplete_endpoint(self):
+        response = self.client.get("/admin/autocomplete/", {
+            "app_label": "patients", "model_name": "patient", "field_name": "clinic", "term": "150",
+        })
+        self.assertEqual([r["text"] for r in response.json()["results"]], ["Clínica 150"])
+
+    def test_paginator_counts_exactly_below_limit(self):
+        paginator = EstimatedCountPaginator(Patient.objects.order_by("pk"), 100)
+        self.assertEqual(paginator.count, 300)
+        self.assertEqual(paginator.num_pages, 3)
+
+    @skipUnless(connection.vendor != "postgresql", "PostgreSQL returns a planner estimate")
+    def test_no_estimate_outside_postgresql(self):
+        self.assertIsNone(estimate_count(Patient.objects.all()))
+
+    @skipUnless(connection.vendor == "postgresql", "planner estimates need PostgreSQL")
+    def test_paginator_uses_planner_estimate_above_limit(self):
+        analyze(Patient)
+        qs = Patient.objects.order_by("pk")
+        estimate = estimate_count(qs)
+        self.assertGreater(estimate, 0)
+        paginator = EstimatedCountPaginator(qs, 100)
+        paginator.exact_count_limit = 10
+        self.assertEqual(paginator.count, estimate)
+        self.assertEqual(len(paginator.page(2).object_list), 100)
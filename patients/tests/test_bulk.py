@@ -0,0 +1,111 @@
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from core.models import Clinic
+from patients.models import Patient
+
+
+class PatientSaveQueryCountTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+
+    def test_full_clean_then_save(self):
+        """FK da clínica + checagem de CPF em clean() + INSERT + contadores, sem exists() extra."""
+        patient = Patient(clinic=self.clinic, full_name="Ana", cpf="111.444.777-35")
+        with self.assertNumQueries(4):
+            patient.full_clean()
+            patient.save()
+        self.assertEqual(patient.cpf, "11144477735")
+
+    def test_save_inside_transaction_uses_savepoint_not_precheck(self):
+        patient = Patient(clinic=self.clinic, full_name="Ana", cpf="111.444.777-35")
+        with CaptureQueriesContext(connection) as ctx:
+            patient.save()
+        statements = [q["sql"].split()[0] for q in ctx.captured_queries]
+        # O segundo INSERT é o upsert de PatientCounter, no mesmo savepoint
+        self.assertEqual(statements, ["SAVEPOINT", "INSERT", "INSERT", "RELEASE"])
+
+    def test_collision_keeps_masked_value(self):
+        Patient.objects.create(clinic=self.clinic, full_name="Ana", cpf="11144477735")
+        patient = Patient.objects.create(clinic=self.clinic, full_name="Ana 2", cpf="111.444.777-35")
+        patient.refresh_from_db()
+        self.assertEqual(patient.cpf, "111.444.777-35")
+
+    def test_unmasked_duplicate_still_fails_full_clean(self):
+        Patient.objects.create(clinic=self.clinic, full_name="Ana", cpf="11144477735")
+        patient = Patient(clinic=self.clinic, full_name="Ana 2", cpf="111.444.777-35")
+        with self.assertRaisesMessage(Exception, "CPF já cadastrado nesta clínica."):
+            patient.full_clean()
+
+
+class PatientSaveAutocommitTest(TransactionTestCase):
+    def statements(self, ctx):
+        return [q["sql"].split()[0] for q in ctx.captured_queries]
+
+    def test_save_is_one_transaction_without_precheck(self):
+        clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        # INSERT do paciente + upsert dos contadores, na mesma transação
+        with CaptureQueriesContext(connection) as ctx:
+            Patient.objects.create(clinic=clinic, full_name="Ana", cpf="111.444.777-35")
+        self.assertEqual(self.statements(ctx), ["BEGIN", "INSERT", "INSERT", "COMMIT"])
+
+        # Colisão: a tentativa com o CPF limpo é desfeita inteira, depois a gravação mascarada
+        with CaptureQueriesContext(connection) as ctx:
+            Patient.objects.create(clinic=clinic, full_name="Ana 2", cpf="111.444.777-35")
+        self.assertEqual(
+            self.statements(ctx),
+            ["BEGIN", "INSERT", "ROLLBACK", "BEGIN", "INSERT", "INSERT", "COMMIT"],
+        )
+        self.assertEqual(
+            sorted(Patient.objects.values_list("cpf", flat=True)),
+            ["111.444.777-35", "11144477735"],
+        )
+
+
+class BulkUpsertTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+
+    def test_inserts_and_updates_by_normalized_cpf(self):
+        Patient.objects.create(clinic=self.clinic, full_name="Old name", cpf="11144477735")
+        Patient.objects.create(clinic=self.other, full_name="Other clinic", cpf="12345678909")
+
+        rows = [
+            {"full_name": "New name", "cpf": "111.444.777-35", "city": "Santos"},
+            {"full_name": "Bruno", "cpf": "123.456.789-09"},
+            {"full_name": "Sem CPF"},
+        ]
+        # SELECT + INSERT + contadores + UPDATE, mais SAVEPOINT/RELEASE do
+        # atomic() do lote (a clínica a invalidar no cache já é conhecida)
+        with self.assertNumQueries(6):
+            created, updated = Patient.objects.bulk_upsert(rows, clinic=self.clinic)
+        self.assertEqual((created, updated), (2, 1))
+
+        updated_patient = Patient.objects.get(clinic=self.clinic, cpf="11144477735")
+        self.assertEqual(updated_patient.full_name, "New name")
+        self.assertEqual(updated_patient.city, "Santos")
+        self.assertTrue(Patient.objects.filter(clinic=self.clinic, cpf="12345678909").exists())
+        self.assertEqual(Patient.objects.get(clinic=self.other).full_name, "Other clinic")
+
+    def test_masked_legacy_record_is_normalized_unless_it_collides(self):
+        Patient.objects.bulk_create([
+            Patient(clinic=self.clinic, full_name="Legacy", cpf="123.456.789-09"),
+            Patient(clinic=self.clinic, full_name="Legacy dup", cpf="111.444.777-35"),
+            Patient(clinic=self.clinic, full_name="Clean", cpf="11144477735"),
+        ])
+        Patient.objects.bulk_upsert(
+            [{"cpf": "12345678909", "city": "Recife"}, {"cpf": "11144477735", "city": "Natal"}],
+            clinic=self.clinic,
+        )
+        legacy = Patient.objects.get(full_name="Legacy")
+        self.assertEqual((legacy.cpf, legacy.city), ("12345678909", "Recife"))
+        # O registro limpo é o escolhido; o mascarado duplicado fica intacto
+        self.assertEqual(Patient.objects.get(full_name="Clean").city, "Natal")
+        self.assertEqual(Patient.objects.get(full_name="Legacy dup").cpf, "111.444.777-35")
+
+    def test_batches_and_unknown_fields(self):
+        rows = [{"full_name": f"P{i}", "cpf": ""} for i in range(25)]
+        self.assertEqual(Patient.objects.bulk_upsert(rows, clinic=self.clinic, batch_size=10), (25, 0))
+        with self.assertRaises(ValueError):
+            Patient.objects.bulk_upsert([{"nope": 1}], clinic=self.clinic)
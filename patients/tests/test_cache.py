@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.test import TestCase
+from core.models import Clinic
+from patients.models import Patient, patient_cache
+
+
+class PatientCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patient_cache.clear()
+        self.clinic = Clinic.objects.create(name="Default", slug="default")
+        self.other = Clinic.objects.create(name="Outra", slug="outra")
+        self.patient = Patient.objects.create(clinic=self.clinic, full_name="Ana")
+
+    def test_cached_reads_do_not_query(self):
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).full_name, "Ana")
+        with self.assertNumQueries(0):
+            patient = Patient.objects.cached(self.clinic.pk, self.patient.pk)
+        patient.full_name = "Alterada sem salvar"
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).full_name, "Ana")
+
+    def test_scoped_by_clinic(self):
+        self.assertIsNone(Patient.objects.cached(self.other, self.patient.pk))
+
+    def test_save_and_delete_invalidate(self):
+        Patient.objects.cached(self.clinic, self.patient.pk)
+        self.patient.full_name = "Ana Maria"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patient.save()
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).full_name, "Ana Maria")
+
+        self.patient.clinic = self.other
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patient.save()
+        self.assertIsNone(Patient.objects.cached(self.clinic, self.patient.pk))
+        self.assertEqual(Patient.objects.cached(self.other, self.patient.pk).full_name, "Ana Maria")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patient.delete()
+        self.assertIsNone(Patient.objects.cached(self.other, self.patient.pk))
+
+    def test_bulk_paths_invalidate(self):
+        Patient.objects.cached(self.clinic, self.patient.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.filter(clinic=self.clinic).update(city="Santos")
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).city, "Santos")
+
+        self.patient.cpf = "11144477735"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patient.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.bulk_upsert([{"full_name": "Ana B.", "cpf": "111.444.777-35"}], clinic=self.clinic)
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).full_name, "Ana B.")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.filter(pk=self.patient.pk).delete()
+        self.assertIsNone(Patient.objects.cached(self.clinic, self.patient.pk))
+
+    def test_update_invalidation_does_not_query_known_clinics(self):
+        patient = Patient.objects.get(pk=self.patient.pk)
+        patient.city = "Santos"
+        with self.assertNumQueries(1):  # só o UPDATE: a clínica vem das instâncias
+            Patient.objects.bulk_update([patient], ["city"])
+        with self.assertNumQueries(1):
+            Patient.objects.for_clinic(self.clinic).filter(city="Santos").update(city="Campinas")
+        with self.assertNumQueries(2):  # sem filtro de clínica: descobre as afetadas
+            Patient.objects.filter(city="Campinas").update(city="Sorocaba")
+
+        Patient.objects.cached(self.clinic, self.patient.pk)
+        patient.city = "Jundiaí"
+        with self.captureOnCommitCallbacks(execute=True):
+            Patient.objects.bulk_update([patient], ["city"])
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).city, "Jundiaí")
+
+    def test_invalidates_only_after_commit(self):
+        Patient.objects.cached(self.clinic, self.patient.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.patient.full_name = "Ana Maria"
+            self.patient.save()
+        # Antes do commit o cache ainda tem a versão confirmada
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).full_name, "Ana")
+        for callback in callbacks:
+            callback()
+        self.assertEqual(Patient.objects.cached(self.clinic, self.patient.pk).full_name, "Ana Maria")
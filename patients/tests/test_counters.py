@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.bulk import bulk_insert
+from core.models import Clinic
+from core.tenancy import clinic_cache
+from patients.models import Patient, PatientCounter
+
+
+class PatientCounterTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+
+    def summary(self, clinic=None):
+        return PatientCounter.objects.summary(clinic or self.clinic)
+
+    def test_create_update_and_delete(self):
+        ana = Patient.objects.create(clinic=self.clinic, full_name="Ana", gender="female", state="SP")
+        Patient.objects.create(clinic=self.clinic, full_name="Bruno", gender="male", insurance_name="Unimed")
+        Patient.objects.create(clinic=self.other, full_name="Carla")
+        counts = self.summary()
+        self.assertEqual(counts["total"], 2)
+        self.assertEqual(counts["gender"], {"female": 1, "male": 1})
+        self.assertEqual(counts["insurance_name"], {"Particular": 1, "Unimed": 1})
+        self.assertEqual(self.summary(self.other)["total"], 1)
+
+        ana.state = "RJ"
+        ana.save()
+        ana = Patient.objects.get(pk=ana.pk)
+        ana.insurance_name = "Unimed"
+        ana.save(update_fields=["insurance_name"])
+        counts = self.summary()
+        self.assertEqual(counts["state"], {"RJ": 1, "": 1})
+        self.assertEqual(counts["insurance_name"], {"Unimed": 2})
+
+        ana.delete()
+        self.assertEqual(self.summary()["total"], 1)
+
+    def test_unrelated_update_does_not_touch_counters(self):
+        ana = Patient.objects.create(clinic=self.clinic, full_name="Ana")
+        ana = Patient.objects.get(pk=ana.pk)
+        ana.full_name = "Ana Souza"
+        with self.assertNumQueries(1):
+            ana.save()
+
+    def test_bulk_paths(self):
+        Patient.objects.bulk_create([
+            Patient(clinic=self.clinic, full_name=f"P{i}", gender="female") for i in range(3)
+        ])
+        bulk_insert(Patient, [Patient(clinic=self.clinic, full_name="Q", cpf="") for _ in range(2)])
+        Patient.objects.bulk_upsert(
+            [{"full_name": "R", "cpf": "111.444.777-35", "state": "BA"}], clinic=self.clinic,
+        )
+        Patient.objects.bulk_upsert([{"cpf": "11144477735", "state": "PE"}], clinic=self.clinic)
+        counts = self.summary()
+        self.assertEqual(counts["total"], 6)
+        self.assertEqual(counts["gender"], {"female": 3, "": 3})
+        self.assertEqual(counts["state"], {"": 5, "PE": 1})
+
+        # Um GROUP BY antes do DELETE, em vez de um delete() por instância
+        Patient.objects.filter(clinic=self.clinic, gender="female").delete()
+        counts = self.summary()
+        self.assertEqual(counts["total"], 3)
+        self.assertEqual(counts["gender"], {"": 3})
+
+    def test_apply_upserts_in_key_order(self):
+        deltas = [((self.other.pk, "male", "Unimed", "SP"), 1), ((self.clinic.pk, "female", "Bradesco", "RJ"), 1)]
+        with CaptureQueriesContext(connection) as ctx:
+            PatientCounter.objects.apply(deltas, batch_size=1)
+        # Um upsert por chave; em ordem, os lotes de transações concorrentes não se cruzam
+        keys = [query["sql"].split("VALUES (")[1].split(")")[0].replace("'", "").split(", ")[:3] for query in ctx]
+        self.assertEqual(len(keys), 8)
+        self.assertEqual(keys, sorted(keys, key=lambda k: (int(k[0]), k[1], k[2])))
+
+    def test_reconcile_fixes_drift(self):
+        Patient.objects.create(clinic=self.clinic, full_name="Ana", gender="female")
+        Patient.objects.create(clinic=self.clinic, full_name="Bruno")
+        # QuerySet.update() não passa pelos contadores
+        Patient.objects.filter(full_name="Bruno").update(gender="male")
+        PatientCounter.objects.filter(clinic=self.clinic, dimension="").update(count=10)
+
+        out = StringIO()
+        call_command("reconcile_patient_counters", stdout=out)
+        self.assertIn("3 counters corrected", out.getvalue())
+        counts = self.summary()
+        self.assertEqual(counts["total"], 2)
+        self.assertEqual(counts["gender"], {"female": 1, "male": 1})
+        self.assertFalse(PatientCounter.objects.filter(dimension="gender", value="").exists())
+
+        self.assertEqual(PatientCounter.objects.reconcile(self.clinic), 0)
+
+
+@override_settings(TENANT_DEFAULT_SLUG="clinic-a")
+class HomeCountersTest(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        Patient.objects.create(clinic=self.clinic, full_name="Ana", insurance_name="Unimed")
+
+    def test_home_reads_counters_not_patients(self):
+        self.client.get(reverse("home"))  # aquece o cache de clínicas e a sessão
+        with self.assertNumQueries(1) as ctx:
+            response = self.client.get(reverse("home"))
+        self.assertNotIn('"patients_patient"', ctx.captured_queries[0]["sql"])
+        self.assertEqual(response.context["patients_count"], 1)
+        self.assertContains(response, "Unimed")
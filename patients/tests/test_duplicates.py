@@ -0,0 +1,106 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core.models import Clinic
+from patients.duplicates import _exact_tasks, find_duplicates, name_similarity, score_pair
+from patients.models import DuplicateCandidate, Patient
+
+
+def row(pk, cpf="", phone="", email="", name="", birth=None):
+    return (pk, cpf, phone, "", email, name, birth)
+
+
+class ScorePairTest(TestCase):
+    def test_evidence_and_conflicts(self):
+        score, reasons = score_pair(row(1, cpf="1", name="ana souza"), row(2, cpf="1", name="ana souza"))
+        self.assertEqual((score, reasons), (1.0, ["cpf", "nome"]))
+
+        # Mesmo nome, nascimentos diferentes: homônimos, não duplicata
+        score, _ = score_pair(row(1, name="jose silva", birth=1), row(2, name="jose silva", birth=2))
+        self.assertLess(score, 0.7)
+
+        score, reasons = score_pair(row(1, phone="+5511988887777", name="maria"), row(2, phone="+5511988887777", name="mariana"))
+        self.assertEqual(reasons, ["telefone"])
+        self.assertEqual(score_pair(row(1), row(2)), (0.0, []))
+
+    def test_name_similarity(self):
+        self.assertEqual(name_similarity("joao pereira", "joao pereira"), 1.0)
+        self.assertGreater(name_similarity("joao pereira", "joao pereria"), 0.85)
+        self.assertEqual(name_similarity("joao pereira", "carla"), 0.0)
+        self.assertEqual(name_similarity("", "carla"), 0.0)
+
+
+class FindDuplicatesTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+
+        def create(clinic=self.clinic, **kwargs):
+            return Patient.objects.create(clinic=clinic, **kwargs)
+
+        born = date(1980, 5, 17)
+        self.ana = create(full_name="Ana Souza", cpf="529.982.247-25", birth_date=born)
+        self.ana2 = create(full_name="Ana Sousa", birth_date=born)
+        # Legado com CPF mascarado: a constraint (sobre cpf) não pega, cpf_digits sim
+        Patient.objects.filter(pk=self.ana2.pk).update(cpf="529.982.247-25", cpf_digits="52998224725")
+        # Nome com erro de digitação e mesmo nascimento, sem CPF: só a janela acha
+        self.joao = create(full_name="João Pereira", birth_date=born)
+        self.joao2 = create(full_name="Joao Pereria", birth_date=born)
+        self.maria = create(full_name="Maria Lima", whatsapp_phone="(11) 98888-7777", email="maria@x.com")
+        self.maria2 = create(full_name="Maria F. Lima", extra_phone="+55 11 98888-7777", email="MARIA@x.com")
+        # Homônimo com outro nascimento
+        create(full_name="Ana Souza", birth_date=date(1999, 1, 1))
+        # Mesma pessoa em outra clínica não conta
+        create(clinic=other, full_name="Ana Souza", cpf="529.982.247-25", birth_date=born)
+        for i in range(30):
+            create(full_name=f"Paciente {i:03d}", birth_date=date(1990, 1, 1 + i % 28))
+
+    def pairs(self):
+        return {
+            (c.patient_a_id, c.patient_b_id): c.reasons
+            for c in DuplicateCandidate.objects.filter(clinic=self.clinic)
+        }
+
+    def test_finds_expected_pairs(self):
+        stats = find_duplicates(self.clinic, workers=1)
+        pairs = self.pairs()
+        self.assertEqual(stats["pairs"], 3)
+        self.assertEqual(set(pairs), {
+            (self.ana.pk, self.ana2.pk), (self.joao.pk, self.joao2.pk), (self.maria.pk, self.maria2.pk),
+        })
+        self.assertEqual(pairs[(self.ana.pk, self.ana2.pk)], "cpf,nascimento,nome")
+        self.assertEqual(pairs[(self.maria.pk, self.maria2.pk)], "telefone,email,nome")
+
+    def test_rerun_replaces_candidates(self):
+        find_duplicates(self.clinic, workers=1)
+        self.joao2.delete()
+        find_duplicates(self.clinic, workers=1)
+        self.assertEqual(len(self.pairs()), 2)
+
+    def test_large_blocks_are_skipped(self):
+        # Telefone da recepção em várias fichas: não diz nada sobre a pessoa
+        for name in ("Bruno", "Carla", "Davi"):
+            Patient.objects.create(clinic=self.clinic, full_name=name, whatsapp_phone="(11) 3333-4444")
+        base = Patient.objects.for_clinic(self.clinic)
+        blocks = [len(b) for batch in _exact_tasks(base, "whatsapp_e164", max_block=3) for b in batch]
+        self.assertEqual(blocks, [3])
+        blocks = [len(b) for batch in _exact_tasks(base, "whatsapp_e164", max_block=2) for b in batch]
+        self.assertEqual(blocks, [])
+
+    def test_process_pool_matches_inline(self):
+        find_duplicates(self.clinic, workers=1)
+        inline = self.pairs()
+        find_duplicates(self.clinic, workers=2)
+        self.assertEqual(self.pairs(), inline)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("find_duplicate_patients", clinic=["clinic-a"], workers=1, stdout=out)
+        self.assertIn("Found 3 candidate pairs", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("find_duplicate_patients", clinic=["nope"], stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("find_duplicate_patients", threshold=2, stdout=StringIO())
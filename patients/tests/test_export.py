@@ -0,0 +1,119 @@
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from core.models import Clinic
+from core.tenancy import clinic_cache
+from patients.export import export_queryset, iter_rows
+from patients.models import Patient
+
+
+def read_csv(text):
+    return list(csv.reader(io.StringIO(text.lstrip("\ufeff"))))
+
+
+class ExportCommandTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+        Patient.objects.create(clinic=self.clinic, full_name="Ana", gender="female", state="SP", whatsapp_phone="+55 11 98888-7777")
+        Patient.objects.create(clinic=self.clinic, full_name="=HYPERLINK(\"x\")", gender="male", city="Santos")
+        Patient.objects.create(clinic=other, full_name="Outra")
+
+    def export(self, **options):
+        out = StringIO()
+        call_command("export_patients", clinic="clinic-a", stdout=out, stderr=StringIO(), **options)
+        return read_csv(out.getvalue())
+
+    def test_csv_with_fields_and_filters(self):
+        rows = self.export(fields="full_name,gender,whatsapp_phone")
+        self.assertEqual(rows[0], ["full_name", "gender", "whatsapp_phone"])
+        self.assertEqual(rows[1], ["Ana", "female", "+55 11 98888-7777"])
+        # Fórmulas não chegam à planilha como fórmula
+        self.assertEqual(rows[2][0], "'=HYPERLINK(\"x\")")
+        self.assertEqual(len(rows), 3)
+
+        self.assertEqual(self.export(fields="full_name", gender="female"), [["full_name"], ["Ana"]])
+        self.assertEqual(self.export(fields="full_name", city="santos")[1:], [['\'=HYPERLINK("x")']])
+
+    def test_default_fields_match_import(self):
+        header = self.export()[0]
+        self.assertIn("cpf", header)
+        self.assertNotIn("cpf_digits", header)
+        self.assertNotIn("clinic", header)
+
+    def test_invalid_options(self):
+        with self.assertRaisesMessage(CommandError, "Campos desconhecidos: senha"):
+            self.export(fields="full_name,senha")
+        with self.assertRaises(CommandError):
+            self.export(created_after="ontem")
+        with self.assertRaisesMessage(CommandError, "XLSX needs --output"):
+            self.export(format="xlsx")
+
+    def test_xlsx_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "pacientes.xlsx")
+        call_command("export_patients", clinic="clinic-a", output=path, fields="id,full_name", stdout=StringIO())
+        with zipfile.ZipFile(path) as archive:
+            self.assertIn("xl/workbook.xml", archive.namelist())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 3)
+        # Texto inline: nunca vira fórmula no XLSX, então vai sem o apóstrofo
+        self.assertIn('>=HYPERLINK("x")<', sheet)
+        self.assertIn(">Ana<", sheet)
+
+    def test_keyset_batches_without_server_side_cursors(self):
+        Patient.objects.bulk_create([Patient(clinic=self.clinic, full_name=f"P{i}") for i in range(5)])
+        qs = export_queryset(self.clinic, ["full_name"])
+        expected = list(qs)
+        with patch.dict(connection.settings_dict, {"DISABLE_SERVER_SIDE_CURSORS": True}):
+            with self.assertNumQueries(4):  # 7 linhas em lotes de 2
+                self.assertEqual(list(iter_rows(qs, chunk_size=2)), expected)
+
+
+class ExportViewTest(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.clinic = clinic = Clinic.objects.create(name="Default", slug="default")
+        Patient.objects.create(clinic=clinic, full_name="Ana")
+        self.url = reverse("patient_export")
+
+    def test_staff_only_streaming_download(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        staff.clinics.add(self.clinic)
+        self.client.force_login(staff)
+
+        response = self.client.get(self.url, {"fields": "full_name"})
+        self.assertTrue(response.streaming)
+        self.assertIn('filename="pacientes-default-', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(read_csv(content), [["full_name"], ["Ana"]])
+
+        response = self.client.get(self.url, {"format": "xlsx"})
+        self.assertTrue(zipfile.is_zipfile(io.BytesIO(b"".join(response.streaming_content))))
+
+        self.assertEqual(self.client.get(self.url, {"format": "pdf"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"fields": "senha"}).status_code, 400)
+
+    async def test_streams_under_asgi(self):
+        staff = await get_user_model().objects.acreate(username="staff", is_staff=True)
+        await staff.clinics.aadd(self.clinic)
+        await self.async_client.aforce_login(staff)
+        response = await self.async_client.get(self.url, {"fields": "full_name"})
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(read_csv(content), [["full_name"], ["Ana"]])
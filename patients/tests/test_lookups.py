@@ -0,0 +1,190 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from core.models import Clinic
+from core.tenancy import clinic_cache
+from patients.models import Patient
+
+
+class CpfDigitsTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+
+    def test_populated_on_every_write_path(self):
+        clean = Patient.objects.create(clinic=self.clinic, full_name="Clean", cpf="11144477735")
+        # Colisão: cpf fica mascarado, mas cpf_digits é sempre só dígitos
+        masked = Patient.objects.create(clinic=self.clinic, full_name="Masked", cpf="111.444.777-35")
+        bulk, = Patient.objects.bulk_create([
+            Patient(clinic=self.clinic, full_name="Bulk", cpf="123.456.789-09"),
+        ])
+        for patient in (clean, masked, bulk):
+            patient.refresh_from_db()
+        self.assertEqual(masked.cpf, "111.444.777-35")
+        self.assertEqual(
+            [clean.cpf_digits, masked.cpf_digits, bulk.cpf_digits],
+            ["11144477735", "11144477735", "12345678909"],
+        )
+
+        bulk.cpf = ""
+        bulk.save(update_fields=["cpf"])
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.cpf_digits, "")
+
+    def test_lookup_matches_any_format(self):
+        Patient.objects.create(clinic=self.clinic, full_name="Clean", cpf="11144477735")
+        Patient.objects.create(clinic=self.clinic, full_name="Masked", cpf="111.444.777-35")
+        other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+        Patient.objects.create(clinic=other, full_name="Other", cpf="11144477735")
+
+        for typed in ("111.444.777-35", "11144477735", " 111 444 777 35"):
+            with self.assertNumQueries(1):
+                names = sorted(Patient.objects.by_cpf(self.clinic, typed).values_list("full_name", flat=True))
+            self.assertEqual(names, ["Clean", "Masked"])
+
+        self.assertEqual(Patient.objects.get_by_cpf(self.clinic, "111.444.777-35").full_name, "Clean")
+        self.assertIsNone(Patient.objects.get_by_cpf(self.clinic, ""))
+        self.assertIsNone(Patient.objects.get_by_cpf(self.clinic, "12345678909"))
+
+    def test_clean_detects_masked_legacy_duplicate(self):
+        Patient.objects.bulk_create([Patient(clinic=self.clinic, full_name="Legacy", cpf="111.444.777-35")])
+        patient = Patient(clinic=self.clinic, full_name="New", cpf="11144477735")
+        with self.assertRaisesMessage(Exception, "CPF já cadastrado nesta clínica."):
+            patient.clean()
+
+    def test_backfill_command(self):
+        Patient.objects.create(clinic=self.clinic, full_name="A", cpf="111.444.777-35")
+        Patient.objects.create(clinic=self.clinic, full_name="B", cpf="")
+        Patient.objects.create(clinic=self.clinic, full_name="C", cpf="12345678909", whatsapp_phone="11 98888-7777")
+        # Simula linhas anteriores às colunas
+        Patient.objects.update(cpf_digits="", search_name="", whatsapp_e164="")
+
+        out = StringIO()
+        call_command("backfill_patient_lookups", chunk_size=2, stdout=out)
+        self.assertIn("3 patients scanned, 3 updated", out.getvalue())
+        self.assertEqual(
+            sorted(Patient.objects.values_list("cpf_digits", flat=True)),
+            ["", "11144477735", "12345678909"],
+        )
+        self.assertEqual(Patient.objects.get(full_name="C").whatsapp_e164, "+5511988887777")
+        self.assertEqual(Patient.objects.get(full_name="B").search_name, "b")
+
+
+class CpfDigitsMigrationTest(TransactionTestCase):
+    """A migration preenche cpf_digits das linhas existentes (sem depender do backfill manual)."""
+
+    before = [("patients", "0002_normalize_cpfs")]
+    after = [("patients", "0003_patient_cpf_digits")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_rows_are_backfilled(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        clinic = apps.get_model("core", "Clinic").objects.create(name="Clinic A", slug="clinic-a")
+        apps.get_model("patients", "Patient").objects.create(clinic=clinic, full_name="Legacy", cpf="111.444.777-35")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        apps = executor.loader.project_state(self.after).apps
+        patient = apps.get_model("patients", "Patient").objects.get()
+        self.assertEqual(patient.cpf_digits, "11144477735")
+
+
+class ContactLookupTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.ana = Patient.objects.create(
+            clinic=self.clinic, full_name="Ana",
+            whatsapp_phone="(11) 98888-7777", email=" Ana.Souza@Example.COM ",
+        )
+        self.bia = Patient.objects.create(
+            clinic=self.clinic, full_name="Bia",
+            extra_phone="+55 21 3333-4444", emergency_contact_phone="11 98888-7777",
+        )
+        other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+        Patient.objects.create(clinic=other, full_name="Other", whatsapp_phone="11988887777")
+
+    def test_normalized_columns(self):
+        self.assertEqual(self.ana.whatsapp_e164, "+5511988887777")
+        self.assertEqual(self.ana.email_normalized, "ana.souza@example.com")
+        self.assertEqual(self.bia.extra_phone_e164, "+552133334444")
+        self.assertEqual(self.bia.emergency_contact_phone_e164, "+5511988887777")
+
+    def test_find_by_contact_any_format(self):
+        for typed in ("+55 11 988887777", "11988887777", "011 98888-7777", "5511988887777",
+                      "+55 11 8888-7777"):  # WhatsApp sem o nono dígito
+            with self.assertNumQueries(1):
+                found = list(Patient.objects.find_by_contact(self.clinic, typed))
+            self.assertEqual(found, [self.ana], typed)
+
+        self.assertEqual(list(Patient.objects.find_by_contact(self.clinic, "ANA.SOUZA@example.com")), [self.ana])
+        self.assertEqual(list(Patient.objects.find_by_contact(self.clinic, "(21) 3333-4444")), [self.bia])
+        self.assertEqual(
+            sorted(p.full_name for p in Patient.objects.find_by_contact(
+                self.clinic, "11988887777", include_emergency=True)),
+            ["Ana", "Bia"],
+        )
+        self.assertEqual(list(Patient.objects.find_by_contact(self.clinic, "")), [])
+
+    def test_search_routes_contacts(self):
+        from patients.search import search_patients
+        self.assertEqual(search_patients(self.clinic, "(11) 98888-7777"), [self.ana])
+        self.assertEqual(search_patients(self.clinic, "ana.souza@example.com"), [self.ana])
+
+
+class PatientQuerySetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.clinic = Clinic.objects.create(name="Clínica A", slug="clinica-a")
+        cls.other = Clinic.objects.create(name="Clínica B", slug="clinica-b")
+        cls.patient = Patient.objects.create(
+            clinic=cls.clinic, full_name="Ana Souza", cpf="529.982.247-25",
+            whatsapp_phone="(11) 98888-7777", notes="não deve ser carregado",
+        )
+        Patient.objects.create(clinic=cls.other, full_name="Bruno Lima")
+
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+
+    def test_for_clinic_accepts_instance_or_id(self):
+        self.assertEqual(list(Patient.objects.for_clinic(self.clinic)), [self.patient])
+        self.assertEqual(list(Patient.objects.for_clinic(self.clinic.pk)), [self.patient])
+        with self.assertRaises(ValueError):
+            Patient.objects.for_clinic(None)
+
+    def test_for_clinic_chains_with_lookups(self):
+        qs = Patient.objects.for_clinic(self.other).by_cpf(self.clinic, "52998224725")
+        self.assertFalse(qs.exists())
+
+    def test_projections_fetch_only_their_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(Patient.objects.for_clinic(self.clinic).summary())
+        self.assertEqual(len(rows), 1)
+        row = rows[0]
+        self.assertEqual(row._fields, ("id", "full_name", "cpf", "whatsapp_phone"))
+        self.assertEqual(row.full_name, "Ana Souza")
+        self.assertFalse(hasattr(row, "__dict__"))
+        self.assertNotIn("notes", ctx.captured_queries[0]["sql"])
+
+        contact = Patient.objects.for_clinic(self.clinic).contacts().get()
+        self.assertEqual(contact.whatsapp_phone, "(11) 98888-7777")
+        with self.assertRaises(ValueError):
+            Patient.objects.projection("tudo")
+
+    def test_str_does_not_query_per_patient(self):
+        patients = list(Patient.objects.order_by("pk"))
+        str(patients[0])  # aquece o cache de clínicas
+        with self.assertNumQueries(1):
+            names = [str(p) for p in patients]
+        self.assertEqual(names[0], "Ana Souza (Clínica A)")
+        with self.assertNumQueries(0):
+            str(patients[0])
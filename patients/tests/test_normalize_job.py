@@ -0,0 +1,67 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from core.models import Clinic, JobCheckpoint
+from patients.management.commands.normalize_patient_cpfs import JOB_NAME, normalize_clinic
+from patients.models import Patient
+
+
+class NormalizePatientCpfsTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+        # bulk_create não passa por save(): simula dados legados mascarados
+        Patient.objects.bulk_create([
+            Patient(clinic=self.clinic, full_name="Masked", cpf="123.456.789-09"),
+            Patient(clinic=self.clinic, full_name="Clean", cpf="11144477735"),
+            Patient(clinic=self.clinic, full_name="Collides", cpf="111.444.777-35"),
+            Patient(clinic=self.clinic, full_name="Twin 1", cpf="529.982.247-25"),
+            Patient(clinic=self.clinic, full_name="Twin 2", cpf="529 982 247 25"),
+            Patient(clinic=self.clinic, full_name="Blank", cpf=""),
+            Patient(clinic=self.other, full_name="Other", cpf="111.444.777-35"),
+        ])
+
+    def cpfs(self):
+        return dict(Patient.objects.values_list("full_name", "cpf"))
+
+    def test_normalizes_and_keeps_collision_skip_semantics(self):
+        out = StringIO()
+        call_command("normalize_patient_cpfs", chunk_size=2, stdout=out)
+
+        self.assertEqual(self.cpfs(), {
+            "Masked": "12345678909",
+            "Clean": "11144477735",
+            "Collides": "111.444.777-35",
+            "Twin 1": "52998224725",
+            "Twin 2": "529 982 247 25",
+            "Blank": "",
+            "Other": "11144477735",
+        })
+        self.assertIn("3 CPFs normalized, 2 left as-is", out.getvalue())
+        self.assertFalse(JobCheckpoint.objects.filter(job=JOB_NAME, done=False).exists())
+
+    def test_chunk_progress_goes_to_stdout_with_verbosity_2(self):
+        out = StringIO()
+        call_command("normalize_patient_cpfs", chunk_size=2, verbosity=2, stdout=out)
+        self.assertIn(f"  clinic {self.clinic.pk}: up to id", out.getvalue())
+        out = StringIO()
+        call_command("normalize_patient_cpfs", restart=True, chunk_size=2, stdout=out)
+        self.assertNotIn("up to id", out.getvalue())
+
+    def test_resumes_from_checkpoint(self):
+        first_pk = Patient.objects.filter(clinic=self.clinic).order_by("pk").values_list("pk", flat=True)[0]
+        # Interrompido depois do primeiro paciente: ele não é reprocessado
+        JobCheckpoint.objects.create(job=JOB_NAME, scope=str(self.clinic.pk), last_pk=first_pk, processed=1)
+        _, processed, changed, _ = normalize_clinic(self.clinic.pk, chunk_size=100)
+
+        self.assertEqual(processed, 6)
+        self.assertEqual(changed, 1)  # só o Twin 1
+        self.assertEqual(self.cpfs()["Masked"], "123.456.789-09")
+
+        # Já concluído: uma nova execução não faz nada
+        out = StringIO()
+        call_command("normalize_patient_cpfs", clinic=["clinic-a"], stdout=out)
+        self.assertEqual(self.cpfs()["Masked"], "123.456.789-09")
+        call_command("normalize_patient_cpfs", clinic=["clinic-a"], restart=True, stdout=out)
+        self.assertEqual(self.cpfs()["Masked"], "12345678909")
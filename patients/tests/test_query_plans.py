@@ -0,0 +1,80 @@
+from unittest import SkipTest
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+
+from core.bulk import bulk_insert
+from core.models import Clinic
+from core.testing import QueryPlanMixin, analyze, plan_nodes
+from patients.models import DuplicateCandidate, Patient
+
+CLINICS = 50
+PER_CLINIC = 200
+
+
+class PatientQueryPlanTest(QueryPlanMixin, TestCase):
+    """
+    As queries críticas de Patient usam os índices de (clinic, ...). Com o
+    banco de teste no PostgreSQL estes testes pinam os planos de produção.
+
+    Com USE_SQLITE=1 eles verificam só os planos do SQLite; as asserções
+    exclusivas do PostgreSQL (BitmapOr em find_by_contact) só rodam contra
+    um PostgreSQL: `python manage.py test patients.tests.test_query_plans`
+    sem USE_SQLITE, com POSTGRES_HOST apontando para o banco.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        clinics = Clinic.objects.bulk_create(Clinic(name=f"C{i}", slug=f"c{i}") for i in range(CLINICS))
+        bulk_insert(Patient, (
+            Patient(
+                clinic=clinic,
+                full_name=f"Paciente {c:02d} {i:04d}",
+                cpf=f"{c:03d}{i:08d}",
+                whatsapp_phone=f"11 9{c:02d}{i:06d}",
+                email=f"p{c}-{i}@example.com",
+            )
+            for c, clinic in enumerate(clinics)
+            for i in range(PER_CLINIC)
+        ), batch_size=2000)
+        analyze(Clinic, Patient, DuplicateCandidate)
+        cls.clinic = clinics[7]
+
+    def test_list_page(self):
+        qs = Patient.objects.for_clinic(self.clinic).list_rows().order_by("full_name", "id")[:25]
+        self.assertUsesIndex(qs, ("clinic", "full_name"))
+        self.assertNoSeqScan(qs)
+
+    def test_cpf_lookup(self):
+        qs = Patient.objects.by_cpf(self.clinic, "007.000.000-42")
+        self.assertUsesIndex(qs, ("clinic", "cpf_digits"))
+        self.assertNoSeqScan(qs)
+
+    def test_contact_lookup(self):
+        qs = Patient.objects.find_by_contact(self.clinic, "(11) 90700-0042")
+        self.assertNoSeqScan(qs)
+        if connection.vendor == "postgresql":
+            # BitmapOr dos dois índices; o SQLite não combina OR de listas IN
+            # entre índices e percorre a faixa da clínica em (clinic, full_name)
+            self.assertUsesIndex(qs, ("clinic", "whatsapp_e164"))
+            self.assertUsesIndex(qs, ("clinic", "extra_phone_e164"))
+
+        qs = Patient.objects.find_by_contact(self.clinic, "P7-42@example.com")
+        self.assertUsesIndex(qs, ("clinic", "email_normalized"))
+
+    def test_duplicate_candidates_by_score(self):
+        qs = DuplicateCandidate.objects.filter(clinic=self.clinic).order_by("-score")[:50]
+        self.assertUsesIndex(qs, ("clinic", "-score"))
+
+    def test_seq_scan_is_reported(self):
+        # Sem filtro por clínica: sem índice que sirva, a asserção tem que falhar
+        qs = Patient.objects.filter(notes__contains="x")
+        with self.assertRaisesMessage(AssertionError, "Leitura sequencial de patients_patient"):
+            self.assertNoSeqScan(qs)
+        with self.assertRaisesMessage(AssertionError, "não usa o índice"):
+            self.assertUsesIndex(qs, ("clinic", "full_name"))
+
+    def test_unknown_vendor_is_skipped(self):
+        with patch.object(connection, "vendor", "oracle"), self.assertRaises(SkipTest):
+            plan_nodes(Patient.objects.all())
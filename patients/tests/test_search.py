@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.models import Clinic
+from patients.models import Patient
+from patients.normalizers import search_key
+from patients.search import asearch_patients, filter_patients, search_patients
+
+
+class SearchKeyTest(TestCase):
+    def test_folds_accents_case_and_spaces(self):
+        self.assertEqual(search_key("  João  da SILVA "), "joao da silva")
+        self.assertEqual(search_key("Conceição Araújo"), "conceicao araujo")
+        self.assertEqual(search_key(""), "")
+
+    def test_search_name_is_maintained(self):
+        clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        patient = Patient.objects.create(clinic=clinic, full_name="Ângela Muñoz")
+        self.assertEqual(patient.search_name, "angela munoz")
+        patient.full_name = "Ângela Souza"
+        patient.save(update_fields=["full_name"])
+        patient.refresh_from_db()
+        self.assertEqual(patient.search_name, "angela souza")
+
+
+class SearchPatientsTest(TestCase):
+    def setUp(self):
+        self.clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.other = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+        for name in ("João da Silva", "Joana Prado", "Maria Joaquina", "Pedro Álvares"):
+            Patient.objects.create(clinic=self.clinic, full_name=name)
+        Patient.objects.create(clinic=self.clinic, full_name="Carlos", cpf="111.444.777-35")
+        Patient.objects.create(clinic=self.other, full_name="João Outro")
+
+    def names(self, query):
+        return [p.full_name for p in search_patients(self.clinic, query)]
+
+    def test_accent_insensitive_and_scoped_by_clinic(self):
+        self.assertEqual(self.names("Joao")[0], "João da Silva")
+        self.assertNotIn("João Outro", self.names("joao"))
+        self.assertEqual(self.names("ALVARES"), ["Pedro Álvares"])
+
+    def test_tolerates_typos_and_ranks_by_similarity(self):
+        self.assertEqual(self.names("Joaa da Silva")[0], "João da Silva")
+        self.assertEqual(self.names("Pedro Alvarez"), ["Pedro Álvares"])
+
+    async def test_best_match_wins_regardless_of_insertion_order(self):
+        # Muitos candidatos fracos antes (pk menor) do melhor: a nota decide, não o pk
+        await Patient.objects.abulk_create(
+            Patient(clinic=self.clinic, full_name=f"Pedra Alvorada {i}") for i in range(600)
+        )
+        await Patient.objects.acreate(clinic=self.clinic, full_name="Pedro Alvares Cabral")
+        with patch("patients.search.FALLBACK_CHUNK", 200):
+            results = await asearch_patients(self.clinic, "Pedro Alvares Cabral", limit=1)
+            self.assertEqual([p.full_name for p in results], ["Pedro Alvares Cabral"])
+            results = await sync_to_async(search_patients)(self.clinic, "Pedro Alvares Cabral", limit=1)
+            self.assertEqual([p.full_name for p in results], ["Pedro Alvares Cabral"])
+
+    def test_cpf_in_any_format(self):
+        self.assertEqual(self.names("111.444.777-35"), ["Carlos"])
+        self.assertEqual(self.names("11144477735"), ["Carlos"])
+
+    def test_empty_query(self):
+        self.assertEqual(self.names("   "), [])
+
+    def test_word_similar_falls_back_to_contains(self):
+        # Sem PostgreSQL o lookup vira LIKE em vez de 500
+        names = Patient.objects.filter(clinic=self.clinic, search_name__word_similar="joa").values_list(
+            "full_name", flat=True,
+        )
+        self.assertEqual(sorted(names), ["Joana Prado", "João da Silva", "Maria Joaquina"])
+
+    def test_filter_patients_for_admin(self):
+        qs = filter_patients(Patient.objects.filter(clinic=self.clinic), "joao silva")
+        self.assertEqual([p.full_name for p in qs], ["João da Silva"])
+
+
+class PatientAdminSearchTest(TestCase):
+    def test_changelist_search_uses_search_service(self):
+        clinic = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        Patient.objects.create(clinic=clinic, full_name="João da Silva")
+        Patient.objects.create(clinic=clinic, full_name="Maria")
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "pw")
+        self.client.force_login(admin)
+
+        response = self.client.get("/admin/patients/patient/", {"q": "joao"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "João da Silva")
+        self.assertNotContains(response, ">Maria<")
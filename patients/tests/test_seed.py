@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from core.bulk import copy_rows
+from core.models import Clinic
+from patients.models import Patient, PatientCounter
+from patients.normalizers import normalize_phone
+from patients.synthetic import CITIES, clinic_sizes, generate_chunk
+from patients.validators import validate_cpf
+
+FIELDS = ("full_name", "cpf", "birth_date", "whatsapp_phone", "email", "cep", "city", "state", "insurance_name")
+
+
+def values(patients):
+    return [tuple(getattr(p, name) for name in FIELDS) for p in patients]
+
+
+class SyntheticDataTest(TestCase):
+    def test_clinic_sizes(self):
+        sizes = clinic_sizes(10_000, 20, seed=3)
+        self.assertEqual(sum(sizes), 10_000)
+        self.assertGreater(max(sizes), 10 * min(sizes))
+        self.assertEqual(sizes, clinic_sizes(10_000, 20, seed=3))
+        self.assertEqual(clinic_sizes(100, 4, skew=0), [25, 25, 25, 25])
+
+    def test_deterministic_per_chunk(self):
+        patients, _ = generate_chunk(5, 1, "SP", 0, 300)
+        self.assertEqual(values(patients), values(generate_chunk(5, 1, "SP", 0, 300)[0]))
+        self.assertNotEqual(values(patients), values(generate_chunk(6, 1, "SP", 0, 300)[0]))
+        # Um bloco não depende dos anteriores: dá para gerar em qualquer processo
+        self.assertEqual(values(patients[:100]), values(generate_chunk(5, 1, "SP", 0, 100)[0]))
+
+    def test_realistic_fields(self):
+        patients, _ = generate_chunk(1, 1, "RJ", 0, 2000)
+        cpfs = [p.cpf for p in patients if p.cpf]
+        self.assertGreater(len(cpfs), 1800)
+        self.assertEqual(len(set(cpfs)), len(cpfs))
+        for cpf in cpfs[:200]:
+            validate_cpf(cpf)
+        self.assertGreater(sum(p.state == "RJ" for p in patients), 1700)
+        for p in patients:
+            city, ddd, cep_from, cep_to = next(c for c in CITIES[p.state] if c[0] == p.city)
+            self.assertTrue(cep_from <= int(p.cep[:5]) <= cep_to, p.cep)
+            self.assertTrue(normalize_phone(p.whatsapp_phone).startswith(f"+55{ddd}9"), p.whatsapp_phone)
+            if p.birth_date.year > 2007:  # menores têm responsável
+                self.assertTrue(p.guardian_name)
+                self.assertNotEqual(p.guardian_cpf, p.cpf)
+
+    def test_copy_payload_and_counter_deltas(self):
+        text, deltas = generate_chunk(1, 1, "SP", 0, 50, "default")
+        self.assertEqual(len(text.splitlines()), 50)
+        self.assertEqual(sum(n for _, n in deltas), 50)
+        self.assertTrue(all(row[0] == 1 for row, _ in deltas))
+
+    def test_copy_rows_escapes_special_characters(self):
+        clinic = Clinic(name="Tab\there\nand \\ slash", slug="x")
+        row = copy_rows(Clinic, [clinic], connection).split("\t")
+        self.assertEqual(row[0], "Tab\\there\\nand \\\\ slash")
+
+
+class SeedDataCommandTest(TestCase):
+    def seed(self, *args):
+        out = StringIO()
+        call_command("seed_data", "--workers", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_creates_clinics_patients_and_counters(self):
+        output = self.seed("--clinics", "4", "--patients", "600", "--seed", "2")
+        self.assertIn("Created 4 clinics and 600 patients", output)
+        clinics = Clinic.objects.filter(slug__startswith="seed-")
+        self.assertEqual(clinics.count(), 4)
+        self.assertEqual(Patient.objects.count(), 600)
+        sizes = list(Patient.objects.values("clinic").annotate(n=Count("pk")).values_list("n", flat=True))
+        self.assertEqual(len(set(sizes)), 4)  # tamanhos desiguais
+        self.assertEqual(sum(PatientCounter.objects.filter(dimension="").values_list("count", flat=True)), 600)
+
+    def test_existing_prefix_needs_reset(self):
+        self.seed("--clinics", "2", "--patients", "50", "--seed", "9")
+        names = list(Patient.objects.order_by("pk").values_list("full_name", "cpf"))
+        with self.assertRaisesMessage(CommandError, "already exist"):
+            self.seed("--clinics", "2", "--patients", "50")
+        self.seed("--clinics", "2", "--patients", "50", "--seed", "9", "--reset")
+        self.assertEqual(list(Patient.objects.order_by("pk").values_list("full_name", "cpf")), names)
+        self.assertEqual(Clinic.objects.count(), 2)
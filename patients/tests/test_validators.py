@@ -1,6 +1,11 @@
+import random
+import re
+from unittest import skipUnless
+
 from django.test import SimpleTestCase
 from django.core.exceptions import ValidationError
-from patients.validators import validate_cpf
+from validate_docbr import CPF
+from patients.validators import cpf_from_number, normalize_cpf, normalize_cpfs, np, validate_cpf, validate_cpfs
 
 class TestCPFValidator(SimpleTestCase):
     def test_valid_cpf_no_mask(self):
@@ -60,3 +65,66 @@ class TestCPFValidator(SimpleTestCase):
         # 111444777-35 is valid, so 111444777-36 should be invalid
         with self.assertRaisesRegex(ValidationError, "CPF inválido."):
             validate_cpf("11144477736")
+
+
+def _reference_error(value):
+    """Comportamento original de validate_cpf (re.sub + validate-docbr)."""
+    if value is None:
+        return None
+    digits = re.sub(r"\D", "", value)
+    if digits == "":
+        return None
+    if len(digits) != 11:
+        return "CPF deve ter 11 dígitos."
+    if not CPF().validate(digits):
+        return "CPF inválido."
+    return None
+
+
+class TestBatchCPFValidation(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        generator = CPF()
+        self.values = [None, "", "   ", "111.111.111-11", "123.456.789-09", "1234567890", "abc"]
+        for _ in range(2000):
+            cpf = generator.generate(mask=rng.random() < 0.5)
+            kind = rng.random()
+            if kind < 0.3:
+                # troca um dígito ao acaso
+                pos = rng.choice([i for i, c in enumerate(cpf) if c.isdigit()])
+                cpf = cpf[:pos] + str((int(cpf[pos]) + rng.randint(1, 9)) % 10) + cpf[pos + 1:]
+            elif kind < 0.35:
+                cpf = cpf[:-1]
+            self.values.append(cpf)
+
+    def test_matches_single_value_validator(self):
+        expected = [_reference_error(v) for v in self.values]
+        self.assertEqual(validate_cpfs(self.values, vectorized=False), expected)
+        for value, error in zip(self.values, expected):
+            if error is None:
+                validate_cpf(value)
+            else:
+                with self.assertRaisesMessage(ValidationError, error):
+                    validate_cpf(value)
+
+    @skipUnless(np is not None, "numpy not installed")
+    def test_vectorized_path_matches(self):
+        self.assertEqual(
+            validate_cpfs(self.values, vectorized=True),
+            validate_cpfs(self.values, vectorized=False),
+        )
+
+    def test_normalize_cpfs(self):
+        self.assertEqual(
+            list(normalize_cpfs(["111.444.777-35", "11144477735", None, ""])),
+            ["11144477735", "11144477735", "", ""],
+        )
+        self.assertEqual(normalize_cpf(" 111 444 777 35 "), "11144477735")
+
+    def test_cpf_from_number(self):
+        self.assertEqual(cpf_from_number(111444777), "11144477735")
+        cpfs = [cpf_from_number(n) for n in range(1, 2000)]
+        self.assertEqual(len(set(cpfs)), len(cpfs))
+        self.assertTrue(all(CPF().validate(cpf) for cpf in cpfs))
+        with self.assertRaises(ValueError):
+            cpf_from_number(0)
@@ -1,29 +1,131 @@
 import re
+from operator import mul
+
 from django.core.exceptions import ValidationError
 from validate_docbr import CPF
 
+try:  # opcional: só acelera lotes grandes em validate_cpfs()
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+CPF_LENGTH_MESSAGE = "CPF deve ter 11 dígitos."
+CPF_INVALID_MESSAGE = "CPF inválido."
+
+# A partir deste tamanho validate_cpfs() usa NumPy (se instalado)
+VECTORIZE_THRESHOLD = 10_000
+
+_NON_DIGIT = re.compile(r"\D")
+_W1 = (10, 9, 8, 7, 6, 5, 4, 3, 2)
+_W2 = (11, 10, 9, 8, 7, 6, 5, 4, 3, 2)
+# Trabalhamos sobre os bytes ASCII; descontamos ord("0") * peso de uma vez só
+_OFFSET1 = ord("0") * sum(_W1)
+_OFFSET2 = ord("0") * sum(_W2)
+
+
+def normalize_cpf(value) -> str:
+    """Retorna só os dígitos do CPF ("" para vazio/None)."""
+    if not value:
+        return ""
+    if value.isdecimal():
+        return value
+    return _NON_DIGIT.sub("", value)
+
+
+def normalize_cpfs(values):
+    """Versão em lote de normalize_cpf(). Gera os valores sob demanda."""
+    sub = _NON_DIGIT.sub
+    for value in values:
+        if not value:
+            yield ""
+        elif value.isdecimal():
+            yield value
+        else:
+            yield sub("", value)
+
+
+def _digits_are_valid(digits: str) -> bool:
+    """Confere os dígitos verificadores de um CPF com exatamente 11 dígitos."""
+    if not digits.isascii():
+        # Dígitos Unicode (ex.: árabe-índicos): deixa o validate-docbr decidir
+        return CPF().validate(digits)
+    if digits == digits[0] * 11:
+        return False
+    raw = digits.encode("ascii")
+    if (sum(map(mul, raw, _W1)) - _OFFSET1) * 10 % 11 % 10 != raw[9] - 48:
+        return False
+    return (sum(map(mul, raw, _W2)) - _OFFSET2) * 10 % 11 % 10 == raw[10] - 48
+
+
+def cpf_error(digits: str):
+    """Mensagem de erro para um CPF já normalizado, ou None se for aceito."""
+    if digits == "":
+        return None
+    if len(digits) != 11:
+        return CPF_LENGTH_MESSAGE
+    if not _digits_are_valid(digits):
+        return CPF_INVALID_MESSAGE
+    return None
+
+
+def cpf_from_number(number: int) -> str:
+    """
+    CPF válido cujos 9 primeiros dígitos são `number` (dados sintéticos:
+    benchmarks, seed). Números diferentes dão CPFs diferentes.
+    """
+    base = f"{number:09d}"
+    if len(base) != 9 or base == base[0] * 9:
+        raise ValueError(f"Sem CPF válido para {number}.")
+    d1 = sum(int(c) * w for c, w in zip(base, _W1)) * 10 % 11 % 10
+    d2 = sum(int(c) * w for c, w in zip(f"{base}{d1}", _W2)) * 10 % 11 % 10
+    return f"{base}{d1}{d2}"
+
 
 def validate_cpf(value: str) -> None:
     """
     Valida CPF (Brasil). Aceita com ou sem máscara.
     - Permite vazio (para não obrigar o campo).
     - Rejeita CPFs com todos os dígitos iguais.
-    - Valida dígitos verificadores usando validate-docbr.
+    - Valida dígitos verificadores (mesmo algoritmo do validate-docbr).
     """
     if value is None:
         return
 
-    # Remove caracteres não numéricos
-    cpf_digits = re.sub(r"\D", "", value)
+    message = cpf_error(normalize_cpf(value))
+    if message:
+        raise ValidationError(message)
 
-    # Se o campo estiver vazio, não valida (campo opcional)
-    if cpf_digits == "":
-        return
 
-    if len(cpf_digits) != 11:
-        raise ValidationError("CPF deve ter 11 dígitos.")
+def _vectorized_errors(digits_list):
+    errors = [cpf_error(d) if len(d) != 11 or not d.isascii() else None for d in digits_list]
+    positions = [i for i, d in enumerate(digits_list) if len(d) == 11 and d.isascii()]
+    if not positions:
+        return errors
 
-    validator = CPF()
-    # validate-docbr retorna True se for válido, False caso contrário
-    if not validator.validate(cpf_digits):
-        raise ValidationError("CPF inválido.")
+    buf = "".join(digits_list[i] for i in positions).encode("ascii")
+    arr = np.frombuffer(buf, dtype=np.uint8).reshape(-1, 11).astype(np.int64) - 48
+    first = (arr[:, :9] @ np.array(_W1)) * 10 % 11 % 10
+    second = (arr[:, :10] @ np.array(_W2)) * 10 % 11 % 10
+    ok = (first == arr[:, 9]) & (second == arr[:, 10]) & ~(arr == arr[:, :1]).all(axis=1)
+
+    for i in np.flatnonzero(~ok).tolist():
+        errors[positions[i]] = CPF_INVALID_MESSAGE
+    return errors
+
+
+def validate_cpfs(values, *, vectorized=None) -> list:
+    """
+    Valida muitos CPFs de uma vez, com o mesmo resultado de validate_cpf().
+
+    Retorna uma lista alinhada com `values`: None para CPFs aceitos (inclusive
+    vazios) ou a mensagem de erro. `vectorized=None` usa NumPy automaticamente
+    em lotes grandes quando disponível.
+    """
+    digits_list = list(normalize_cpfs(values))
+    if vectorized is None:
+        vectorized = np is not None and len(digits_list) >= VECTORIZE_THRESHOLD
+    if vectorized:
+        if np is None:
+            raise ImportError("validate_cpfs(vectorized=True) requer numpy.")
+        return _vectorized_errors(digits_list)
+    return [cpf_error(d) for d in digits_list]
@@ -1,8 +1,22 @@
-from django.test import SimpleTestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
 from django.urls import reverse, resolve
+from core.models import Clinic
+from core.pagination import encode_cursor
+from core.tenancy import clinic_cache
+from patients.models import Patient
 from . import views
 
-class UrlsTests(SimpleTestCase):
+
+def login_staff(client, *clinics):
+    user = get_user_model().objects.create_user("equipe", password="x", is_staff=True)
+    user.clinics.add(*clinics)
+    client.force_login(user)
+    return user
+
+
+class UrlsTests(TestCase):
     def test_home_url_resolves(self):
         url = reverse('home')
         self.assertEqual(url, '/')
@@ -12,3 +26,157 @@ class UrlsTests(SimpleTestCase):
     def test_home_view_status(self):
         response = self.client.get(reverse('home'))
         self.assertEqual(response.status_code, 200)
+
+
+class PatientSearchViewTests(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.clinic = Clinic.objects.create(name="Default", slug="default")
+        Patient.objects.create(clinic=self.clinic, full_name="João da Silva")
+        login_staff(self.client, self.clinic)
+
+    def test_search_renders_results(self):
+        response = self.client.get(reverse('patient_search'), {"q": "joao"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "João da Silva")
+
+    def test_unknown_clinic_is_404(self):
+        response = self.client.get("/c/nope/pacientes/busca/", {"q": "joao"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_staff(self):
+        self.client.logout()
+        response = self.client.get("/c/default/pacientes/busca/", {"q": "joao"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+        # Usuário comum (sem is_staff) também não vê
+        self.client.force_login(get_user_model().objects.create_user("comum", password="x"))
+        response = self.client.get("/c/default/pacientes/busca/", {"q": "joao"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_path_prefix_selects_clinic_and_prefixes_links(self):
+        other = Clinic.objects.create(name="Outra", slug="outra")
+        Patient.objects.create(clinic=other, full_name="João Outro")
+        get_user_model().objects.get(username="equipe").clinics.add(other)
+        response = self.client.get("/c/outra/pacientes/busca/", {"q": "joao"})
+        self.assertContains(response, "João Outro")
+        self.assertNotContains(response, "João da Silva")
+        self.assertContains(response, 'href="/c/outra/pacientes/"')
+
+
+class ClinicMembershipTests(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.clinic_a = Clinic.objects.create(name="Clinic A", slug="clinic-a")
+        self.clinic_b = Clinic.objects.create(name="Clinic B", slug="clinic-b")
+        Patient.objects.create(clinic=self.clinic_b, full_name="Bruna", cpf="111.444.777-35")
+        self.user = login_staff(self.client, self.clinic_a)
+
+    def test_staff_from_another_clinic_gets_404(self):
+        urls = [
+            ("/c/clinic-b/pacientes/", {"format": "json"}),
+            ("/c/clinic-b/pacientes/busca/", {"q": "bruna"}),
+            ("/c/clinic-b/pacientes/lookup/", {"cpf": "11144477735"}),
+            ("/c/clinic-b/pacientes/exportar/", {}),
+        ]
+        for url, params in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, params).status_code, 404)
+        # Na própria clínica o acesso continua
+        self.assertEqual(self.client.get("/c/clinic-a/pacientes/", {"format": "json"}).status_code, 200)
+
+        # A clínica da sessão também não dá acesso
+        session = self.client.session
+        session["clinic_id"] = self.clinic_b.pk
+        session.save()
+        self.assertEqual(self.client.get(reverse("patient_lookup"), {"cpf": "11144477735"}).status_code, 404)
+
+    def test_members_and_superusers_are_allowed(self):
+        self.user.clinics.add(self.clinic_b)
+        response = self.client.get("/c/clinic-b/pacientes/lookup/", {"cpf": "11144477735"})
+        self.assertEqual([r["full_name"] for r in response.json()["results"]], ["Bruna"])
+
+        admin = get_user_model().objects.create_superuser("root", "root@example.com", "x")
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get("/c/clinic-b/pacientes/busca/", {"q": "bruna"}).status_code, 200)
+
+
+class PatientListViewTests(TestCase):
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.clinic = Clinic.objects.create(name="Default", slug="default")
+        Patient.objects.bulk_create([
+            Patient(clinic=self.clinic, full_name=f"Paciente {i:03d}") for i in range(60)
+        ])
+        login_staff(self.client, self.clinic)
+
+    def test_pages_by_cursor(self):
+        response = self.client.get(reverse('patient_list'))
+        self.assertContains(response, "Paciente 049")
+        self.assertNotContains(response, "Paciente 050")
+        page = response.context["page"]
+        self.assertFalse(page.has_previous)
+
+        response = self.client.get(reverse('patient_list'), {"cursor": page.next_cursor, "format": "json"})
+        data = response.json()
+        self.assertEqual([r["full_name"] for r in data["results"]], [f"Paciente {i:03d}" for i in range(50, 60)])
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+
+    def test_letter_jump_and_invalid_cursor(self):
+        Patient.objects.create(clinic=self.clinic, full_name="Zélia")
+        response = self.client.get(reverse('patient_list'), {"letra": "z"})
+        self.assertEqual([p.full_name for p in response.context["page"]], ["Zélia"])
+        response = self.client.get(reverse('patient_list'), {"cursor": "xyz"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('patient_list'), {"cursor": encode_cursor("n", None, 1), "format": "json"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_staff(self):
+        self.client.logout()
+        response = self.client.get("/c/default/pacientes/", {"format": "json"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+
+
+class AsyncViewTests(TestCase):
+    """As views rodando no caminho ASGI (AsyncClient, middlewares em modo async)."""
+
+    def setUp(self):
+        clinic_cache.clear()
+        cache.clear()
+        self.clinic = Clinic.objects.create(name="Default", slug="default")
+        Patient.objects.create(
+            clinic=self.clinic, full_name="João da Silva", cpf="529.982.247-25", whatsapp_phone="(11) 98888-7777",
+        )
+        login_staff(self.async_client, self.clinic)
+
+    async def test_home_and_search(self):
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.context["patients_count"], 1)
+        response = await self.async_client.get(reverse('patient_search'), {"q": "joao"})
+        self.assertContains(response, "João da Silva")
+
+    async def test_lookup_by_cpf_and_contact(self):
+        response = await self.async_client.get(reverse('patient_lookup'), {"cpf": "52998224725"})
+        self.assertEqual([r["full_name"] for r in response.json()["results"]], ["João da Silva"])
+        response = await self.async_client.get(reverse('patient_lookup'), {"contato": "+55 11 8888-7777"})
+        self.assertEqual(len(response.json()["results"]), 1)
+        response = await self.async_client.get(reverse('patient_lookup'))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_lookup_requires_staff(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get("/c/default/pacientes/lookup/", {"cpf": "52998224725"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+        self.assertNotContains(response, "João", status_code=302)
+
+    async def test_html_is_gzipped(self):
+        response = await self.async_client.get(reverse('home'), headers={"accept-encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        response = await self.async_client.get(reverse('home'))
+        self.assertFalse(response.has_header("Content-Encoding"))
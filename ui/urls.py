@@ -3,4 +3,8 @@ from . import views
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path("pacientes/", views.patient_list, name="patient_list"),
+    path("pacientes/busca/", views.patient_search, name="patient_search"),
+    path("pacientes/lookup/", views.patient_lookup, name="patient_lookup"),
+    path("pacientes/exportar/", views.patient_export, name="patient_export"),
 ]
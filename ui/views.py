@@ -1,10 +1,148 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
-from patients.models import Patient
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+from core.export import streaming_response
+from core.pagination import InvalidCursor, KeysetPaginator
+from core.tenancy import ais_member, is_member
+from patients.export import CONTENT_TYPES, export_chunks, parse_filters
+from patients.models import UF_CHOICES, Patient, PatientCounter
+from patients.search import asearch_patients
 
-def home(request):
-    # MVP: contar todos os pacientes (mais tarde vamos filtrar por clinic/tenant)
-    patients_count = Patient.objects.count()
+
+def current_clinic(request):
+    # Resolvida pelo core.tenancy.TenantMiddleware. Quem não é membro recebe
+    # 404, como se a clínica não existisse.
+    if request.clinic is None or not is_member(request.user, request.clinic):
+        raise Http404("Clínica não encontrada.")
+    return request.clinic
+
+
+async def acurrent_clinic(request):
+    """current_clinic() para as views async."""
+    if request.clinic is None or not await ais_member(await request.auser(), request.clinic):
+        raise Http404("Clínica não encontrada.")
+    return request.clinic
+
+
+def _top_counts(counts, labels=None, limit=5):
+    """[(rótulo, quantidade), ...] dos maiores valores de uma dimensão."""
+    labels = labels or {}
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(labels.get(value) or value or "Não informado", n) for value, n in ranked]
+
+
+# As views são async: sob ASGI (uvicorn) não prendem um worker esperando o
+# banco; sob WSGI o Django as executa normalmente (com um pequeno custo extra).
+# O HTML sai comprimido (gzip_page) para quem aceita gzip.
+
+
+@gzip_page
+async def home(request):
+    # Contadores mantidos por PatientCounter: uma query pequena, sem COUNT(*) em patients
+    counts = await PatientCounter.objects.asummary(request.clinic)
 
     return render(request, "ui/home.html", {
-        "patients_count": patients_count,
-    })
\ No newline at end of file
+        "patients_count": counts["total"],
+        "by_gender": _top_counts(counts["gender"], dict(Patient._meta.get_field("gender").choices)),
+        "by_insurance": _top_counts(counts["insurance_name"]),
+        "by_state": _top_counts(counts["state"], dict(UF_CHOICES)),
+    })
+
+
+PATIENTS_PER_PAGE = 50
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+@staff_member_required
+@gzip_page
+async def patient_list(request):
+    """
+    Lista de pacientes da clínica por nome, com paginação por keyset sobre o
+    índice (clinic, full_name): qualquer página custa o mesmo que a primeira.
+    ?cursor= vem dos links de próxima/anterior; ?letra=M salta para os nomes
+    a partir de M; ?format=json devolve as linhas e os cursores.
+    """
+    clinic = await acurrent_clinic(request)
+    letter = request.GET.get("letra", "").strip().upper()[:1]
+    if letter not in LETTERS:
+        letter = ""
+    paginator = KeysetPaginator(Patient.objects.for_clinic(clinic).list_rows(), "full_name", PATIENTS_PER_PAGE)
+    try:
+        page = await paginator.apage(request.GET.get("cursor"), start=letter)
+    except InvalidCursor:
+        return HttpResponseBadRequest("Cursor inválido.")
+
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "results": [row._asdict() for row in page],
+            "next": page.next_cursor,
+            "previous": page.previous_cursor,
+        })
+    return render(request, "ui/patient_list.html", {
+        "clinic": clinic,
+        "page": page,
+        "letter": letter,
+        "letters": LETTERS,
+    })
+
+
+@staff_member_required
+@gzip_page
+async def patient_search(request):
+    clinic = await acurrent_clinic(request)
+    query = request.GET.get("q", "").strip()
+    results = await asearch_patients(clinic, query) if query else []
+
+    return render(request, "ui/patient_search.html", {
+        "clinic": clinic,
+        "query": query,
+        "results": results,
+    })
+
+
+LOOKUP_LIMIT = 20
+
+
+@staff_member_required
+async def patient_lookup(request):
+    """
+    JSON para integrações (ex.: WhatsApp): pacientes da clínica por
+    ?cpf= ou ?contato= (telefone ou email), em qualquer formato. Só para a
+    equipe (staff), como o export: devolve dados pessoais.
+    """
+    clinic = await acurrent_clinic(request)
+    if request.GET.get("cpf"):
+        qs = Patient.objects.by_cpf(clinic, request.GET["cpf"])
+    elif request.GET.get("contato"):
+        qs = Patient.objects.find_by_contact(clinic, request.GET["contato"])
+    else:
+        return HttpResponseBadRequest("Informe ?cpf= ou ?contato=.")
+
+    rows = qs.order_by("pk").summary()[:LOOKUP_LIMIT]
+    return JsonResponse({"results": [row._asdict() async for row in rows]})
+
+
+@staff_member_required
+def patient_export(request):
+    """
+    Download de todos os pacientes da clínica (?format=csv|xlsx), com
+    ?fields=full_name,cpf,... e filtros (?gender=, ?state=, ?insurance=,
+    ?city=, ?created_after=AAAA-MM-DD, ?created_before=). Transmitido em
+    streaming: a memória não cresce com o tamanho da clínica.
+    """
+    clinic = current_clinic(request)
+    fmt = request.GET.get("format", "csv")
+    if fmt not in CONTENT_TYPES:
+        return HttpResponseBadRequest("Formato inválido (csv ou xlsx).")
+    try:
+        chunks = export_chunks(clinic, fmt, request.GET.get("fields"), parse_filters(request.GET))
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    except ValidationError as exc:
+        return HttpResponseBadRequest("; ".join(exc.messages))
+
+    filename = f"pacientes-{clinic.slug}-{timezone.localdate():%Y%m%d}.{fmt}"
+    return streaming_response(request, chunks, CONTENT_TYPES[fmt], filename)